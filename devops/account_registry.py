@@ -0,0 +1,105 @@
+"""Account registry: the environments the dashboard covers and their account ids.
+
+The registry is loaded from a file instead of being hard-coded:
+
+* JSON or YAML mapping, either ``{"Production": "813627167089", ...}`` or
+  nested under an ``accounts`` key.
+* An AWS Organizations export (``aws organizations list-accounts > file``),
+  i.e. ``{"Accounts": [{"Id": ..., "Name": ..., "Status": ...}]}``. Only
+  ACTIVE accounts are kept, ordered by name.
+
+Environment names are kept for display; dashboard, alarm and stack names use
+their ``environment_slug``, which must be unique and non-empty.
+
+Parsed registries are cached on disk keyed by the SHA-256 of the file
+content, its format and ``REGISTRY_SCHEMA_VERSION``, so repeated synths skip
+parsing; cached registries are validated again on every load. YAML support
+needs PyYAML, which is only imported for ``.yaml``/``.yml`` files.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Any, Dict, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_REGISTRY_PATH = os.path.join(HERE, "accounts.json")
+DEFAULT_CACHE_DIR = os.path.join(HERE, ".cache", "accounts")
+# Bump when normalize_registry changes what it returns, to retire older cache entries
+REGISTRY_SCHEMA_VERSION = 1
+
+ACCOUNT_ID = re.compile(r"^\d{12}$")
+SLUG_SEPARATORS = re.compile(r"[^A-Za-z0-9]+")
+
+
+def environment_slug(environment: str) -> str:
+    """``environment`` as used in resource names and construct ids, e.g. ``Acme-Production``."""
+    return SLUG_SEPARATORS.sub("-", environment).strip("-")
+
+
+def _is_yaml(path: str) -> bool:
+    return path.endswith((".yaml", ".yml"))
+
+
+def _parse(path: str, content: bytes) -> Any:
+    if _is_yaml(path):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError(f"PyYAML is required to read {path}; install it or use a JSON registry") from None
+        return yaml.safe_load(content)
+    return json.loads(content)
+
+
+def normalize_registry(data: Any) -> Dict[str, str]:
+    """Turn any supported registry document into ``{environment: account_id}``."""
+    if isinstance(data, dict) and "Accounts" in data:
+        active = [account for account in data["Accounts"] if account.get("Status", "ACTIVE") == "ACTIVE"]
+        accounts = {account["Name"]: str(account["Id"]) for account in sorted(active, key=lambda a: a["Name"])}
+    elif isinstance(data, dict):
+        accounts = {str(name): str(account_id) for name, account_id in data.get("accounts", data).items()}
+    else:
+        raise ValueError("Account registry must be a mapping or an Organizations list-accounts export")
+
+    if not accounts:
+        raise ValueError("Account registry is empty")
+    slugs: Dict[str, str] = {}
+    for name, account_id in accounts.items():
+        slug = environment_slug(name)
+        if not slug:
+            raise ValueError(f"Environment name {name!r} has no letters or digits")
+        if slug in slugs:
+            raise ValueError(f"Environment names {slugs[slug]!r} and {name!r} both become {slug!r} in resource names")
+        slugs[slug] = name
+        # YAML reads unquoted ids as integers, dropping leading zeros
+        if account_id.isdigit():
+            account_id = accounts[name] = account_id.zfill(12)
+        if not ACCOUNT_ID.match(account_id):
+            raise ValueError(f"Invalid account id {account_id!r} for {name!r}")
+    return accounts
+
+
+def load_accounts(path: str = DEFAULT_REGISTRY_PATH, cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> Dict[str, str]:
+    """Load the registry at ``path``, reusing the on-disk cache when the file is unchanged."""
+    with open(path, "rb") as f:
+        content = f.read()
+
+    cache_path = None
+    if cache_dir:
+        digest = hashlib.sha256(f"v{REGISTRY_SCHEMA_VERSION}:{'yaml' if _is_yaml(path) else 'json'}:".encode())
+        digest.update(content)
+        cache_path = os.path.join(cache_dir, digest.hexdigest() + ".json")
+        if os.path.exists(cache_path):
+            with open(cache_path) as f:
+                return normalize_registry(json.load(f))
+
+    accounts = normalize_registry(_parse(path, content))
+
+    if cache_path:
+        # Written under a temporary name and renamed, so concurrent synths never read half an entry
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=cache_dir, suffix=".tmp", delete=False) as f:
+            json.dump(accounts, f)
+        os.replace(f.name, cache_path)
+    return accounts
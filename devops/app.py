@@ -1,1015 +1,361 @@
+import json
 import os
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
 from aws_cdk import (
     Stack,
     App,
-    Duration,
+    Aws,
+    Environment,
+    Token,
     aws_cloudwatch as cloudwatch,
 )
 from constructs import Construct
 
+from account_registry import DEFAULT_REGISTRY_PATH, load_accounts
+from dashboard_alarms import environment_alarms
+from dashboard_budget import (
+    DEFAULT_EXPECTED_INSTANCES_PER_ACCOUNT,
+    BudgetValidation,
+    DashboardBudget,
+    measure_construct,
+)
+from dashboard_body import DashboardBody
+from dashboard_generator import DASHBOARD_NAME, dashboard_views, render_dashboard, render_shards
+from dashboard_widgets import AUTO_PERIOD, PER_ACCOUNT_LAYOUT, PRIMARY_STATISTIC, RenderOptions
+from dashboard_shards import SHARD_BY_ACCOUNT, SHARD_BY_REGION, SHARD_BY_SECTION
+from metric_catalog import ALARMS, DERIVED, METRICS, SECTIONS, MetricDefinition
+from metric_stream import MetricStreamRollupStack
+from metric_stream_aggregator import JSON_FORMAT
+from observability import observability_stacks
+from query_backends import SEARCH_BACKEND
+from synth_cache import DEFAULT_CACHE_DIR, SynthCache, cache_key
+
 IMAGE_TAG = os.environ.get("IMAGE_TAG", "0001")
 
+FAIL_ON_BUDGET = "fail"
+SPLIT_ON_BUDGET = "split"
+BUDGET_HINTS = {
+    FAIL_ON_BUDGET: "set -c onBudgetExceeded=split to shard the dashboard per account or section",
+    SPLIT_ON_BUDGET: (
+        "shard per account with -c dashboardShardBy=account, "
+        "or lower -c expectedInstancesPerAccount if accounts run fewer instances"
+    ),
+}
+
+
 class RdsDashboardStack(Stack):
-    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        layout: Optional[str] = None,
+        period_policy: Optional[str] = None,
+        resolution_pair: Optional[bool] = None,
+        budget: Optional[DashboardBudget] = None,
+        on_budget_exceeded: Optional[str] = None,
+        shard_by: Optional[str] = None,
+        instance_prefixes: Optional[Sequence[str]] = None,
+        top_n: Optional[int] = None,
+        bands: Optional[Sequence[str]] = None,
+        backend: Optional[str] = None,
+        section_backends: Optional[Dict[str, str]] = None,
+        statistics_view: Optional[str] = None,
+        anomaly_bands: Optional[int] = None,
+        vcpus: Optional[Dict[str, float]] = None,
+        log_groups: Optional[Dict[str, Sequence[str]]] = None,
+        rollups: Optional[bool] = None,
+        forecast_days: Optional[float] = None,
+        derived_metrics: Optional[bool] = None,
+        accounts: Optional[Dict[str, str]] = None,
+        regions: Optional[Sequence[str]] = None,
+        dashboard_name: str = DASHBOARD_NAME,
+        metrics: Tuple[MetricDefinition, ...] = METRICS,
+        alarms: Optional[bool] = None,
+        alarm_thresholds: Optional[Dict[str, float]] = None,
+        synth_cache: Optional[SynthCache] = None,
+        **kwargs,
+    ) -> None:
         super().__init__(scope, construct_id, **kwargs)
-        account = Stack.of(self).account
         region = Stack.of(self).region
 
-        # Account mapping - update these with your actual account IDs
-        accounts = {
-            "Production": "813627167089",
-            "QA": "417848721801",
-            "Dev": "957939121582",
-            "Staging": "048136415067"
+        # Account mapping - maintained in accounts.json, or point
+        # `-c accountRegistry=<file>` at a YAML/JSON map or an Organizations export
+        if accounts is None:
+            accounts = load_accounts(self.node.try_get_context("accountRegistry") or DEFAULT_REGISTRY_PATH)
+        self.accounts = accounts
+        self.metrics = metrics
+
+        # Rendering can be switched per synth, e.g. `cdk synth -c dashboardLayout=shared-query`
+        layout = layout or self.node.try_get_context("dashboardLayout") or PER_ACCOUNT_LAYOUT
+        period_policy = period_policy or self.node.try_get_context("dashboardPeriodPolicy") or AUTO_PERIOD
+        if resolution_pair is None:
+            resolution_pair = str(self.node.try_get_context("dashboardResolutionPair")).lower() == "true"
+
+        # Top-N detail panels, e.g. `-c dashboardTopN=10 -c dashboardBands=AVG,MAX`
+        if top_n is None and self.node.try_get_context("dashboardTopN"):
+            top_n = int(self.node.try_get_context("dashboardTopN"))
+        if bands is None:
+            bands = [band.upper() for band in self._context_list("dashboardBands")]
+
+        # Query backend, e.g. `-c dashboardQueryBackend=metrics-insights`, or per
+        # section with `-c dashboardSectionBackends=io_performance=metrics-insights`;
+        # range-scaled views open on a week, past the 3 hours Metrics Insights covers, and keep SEARCH
+        backend = backend or self.node.try_get_context("dashboardQueryBackend") or SEARCH_BACKEND
+        if section_backends is None:
+            section_backends = dict(pair.split("=", 1) for pair in self._context_list("dashboardSectionBackends"))
+        # Extra statistics (p90/p99/...) on comparison graphs, one more query each:
+        # `-c dashboardStatisticsView=series` per account or `=worst` for the worst environment
+        statistics_view = statistics_view or self.node.try_get_context("dashboardStatisticsView") or PRIMARY_STATISTIC
+        # Anomaly detection bands on comparison graphs, at most N per graph: `-c dashboardAnomalyBands=4`
+        if anomaly_bands is None:
+            anomaly_bands = int(self.node.try_get_context("dashboardAnomalyBands") or 0)
+        # vCPUs per environment for "DB Load per vCPU": `-c dashboardVcpus=Production=64,QA=8`
+        if vcpus is None:
+            vcpus = {
+                environment: float(count)
+                for environment, count in (pair.split("=", 1) for pair in self._context_list("dashboardVcpus"))
+            }
+        # Log groups of the slow-statement tables, by environment; in cdk.json or as JSON:
+        # `-c 'dashboardLogGroups={"Production": ["/aws/rds/instance/orders-1/slowquery"]}'`
+        if log_groups is None:
+            log_groups = self.node.try_get_context("dashboardLogGroups") or {}
+            if isinstance(log_groups, str):
+                log_groups = json.loads(log_groups)
+        # Comparison graphs read the metric stream rollups (see metric_stream.py): `-c metricStreamRollups=true`
+        if rollups is None:
+            rollups = str(self.node.try_get_context("metricStreamRollups")).lower() == "true"
+        # Horizon of the "instances under N days" capacity count: `-c dashboardForecastDays=30`
+        if forecast_days is None and self.node.try_get_context("dashboardForecastDays"):
+            forecast_days = float(self.node.try_get_context("dashboardForecastDays"))
+        # Derived efficiency section, one SEARCH per derived input per account: `-c dashboardDerivedMetrics=true`
+        if derived_metrics is None:
+            derived_metrics = str(self.node.try_get_context("dashboardDerivedMetrics")).lower() == "true"
+        series_options = {
+            "top_n": top_n,
+            "bands": tuple(bands),
+            "backend": backend,
+            "section_backends": dict(section_backends),
+            "statistics_view": statistics_view,
+            "anomaly_bands": anomaly_bands,
+            "account_constants": {"vcpus": dict(vcpus)},
+            "log_groups": {environment: tuple(names) for environment, names in log_groups.items()},
+            "rollups": rollups,
+            "forecast_days": forecast_days,
+            "derived_metrics": derived_metrics,
         }
-        
-        # Create the RDS dashboard
-        dashboard = cloudwatch.Dashboard(
-            self, "RDS-All-Environments",
-            dashboard_name="RDS-All-Environments",
-        )
-        
-        # ===================================================================
-        # SECTION 1: RESOURCE UTILIZATION
-        # ===================================================================
-        dashboard.add_widgets(
-            cloudwatch.TextWidget(
-                markdown="# Resource Utilization",
-                width=24,
-                height=1
-            )
-        )
-        
-        # CPU Utilization - Overview
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="CPU Utilization - Environment Comparison",
-                width=24,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression="SEARCH('{AWS/RDS,DBInstanceIdentifier} CPUUtilization', 'Average') GROUP BY aws.AccountId",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Percent"),
-                legend_position=cloudwatch.LegendPosition.RIGHT,
-            )
-        )
-        
-        # CPU Utilization - Detail per environment
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Production",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} CPUUtilization AND aws.AccountId=\"{accounts['Production']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Percent"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="QA",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} CPUUtilization AND aws.AccountId=\"{accounts['QA']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Percent"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Dev",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} CPUUtilization AND aws.AccountId=\"{accounts['Dev']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Percent"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Staging",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} CPUUtilization AND aws.AccountId=\"{accounts['Staging']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Percent"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            )
-        )
-        
-        # Database Connections - Overview
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Database Connections - Environment Comparison",
-                width=24,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression="SEARCH('{AWS/RDS,DBInstanceIdentifier} DatabaseConnections', 'Average') GROUP BY aws.AccountId",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count"),
-                legend_position=cloudwatch.LegendPosition.RIGHT,
-            )
-        )
-        
-        # Database Connections - Detail per environment
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Production",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} DatabaseConnections AND aws.AccountId=\"{accounts['Production']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="QA",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} DatabaseConnections AND aws.AccountId=\"{accounts['QA']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Dev",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} DatabaseConnections AND aws.AccountId=\"{accounts['Dev']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Staging",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} DatabaseConnections AND aws.AccountId=\"{accounts['Staging']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            )
-        )
-        
-        # Freeable Memory - Overview
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Freeable Memory - Environment Comparison",
-                width=24,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression="SEARCH('{AWS/RDS,DBInstanceIdentifier} FreeableMemory', 'Average') GROUP BY aws.AccountId",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes"),
-                legend_position=cloudwatch.LegendPosition.RIGHT,
-            )
-        )
-        
-        # Freeable Memory - Detail per environment
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Production",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} FreeableMemory AND aws.AccountId=\"{accounts['Production']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="QA",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} FreeableMemory AND aws.AccountId=\"{accounts['QA']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Dev",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} FreeableMemory AND aws.AccountId=\"{accounts['Dev']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Staging",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} FreeableMemory AND aws.AccountId=\"{accounts['Staging']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            )
-        )
-        
-        # Free Storage Space - Overview
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Free Storage Space - Environment Comparison",
-                width=24,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression="SEARCH('{AWS/RDS,DBInstanceIdentifier} FreeStorageSpace', 'Average') GROUP BY aws.AccountId",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes"),
-                legend_position=cloudwatch.LegendPosition.RIGHT,
-            )
-        )
-        
-        # Free Storage Space - Detail per environment
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Production",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} FreeStorageSpace AND aws.AccountId=\"{accounts['Production']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="QA",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} FreeStorageSpace AND aws.AccountId=\"{accounts['QA']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Dev",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} FreeStorageSpace AND aws.AccountId=\"{accounts['Dev']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Staging",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} FreeStorageSpace AND aws.AccountId=\"{accounts['Staging']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            )
-        )
-        
-        # ===================================================================
-        # SECTION 2: I/O PERFORMANCE
-        # ===================================================================
-        dashboard.add_widgets(
-            cloudwatch.TextWidget(
-                markdown="# I/O Performance",
-                width=24,
-                height=1
-            )
-        )
-        
-        # Read IOPS - Overview
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Read IOPS - Environment Comparison",
-                width=24,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression="SEARCH('{AWS/RDS,DBInstanceIdentifier} ReadIOPS', 'Average') GROUP BY aws.AccountId",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count/Second"),
-                legend_position=cloudwatch.LegendPosition.RIGHT,
-            )
-        )
-        
-        # Read IOPS - Detail per environment
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Production",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ReadIOPS AND aws.AccountId=\"{accounts['Production']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="QA",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ReadIOPS AND aws.AccountId=\"{accounts['QA']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Dev",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ReadIOPS AND aws.AccountId=\"{accounts['Dev']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Staging",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ReadIOPS AND aws.AccountId=\"{accounts['Staging']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            )
-        )
-        
-        # Write IOPS - Overview
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Write IOPS - Environment Comparison",
-                width=24,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression="SEARCH('{AWS/RDS,DBInstanceIdentifier} WriteIOPS', 'Average') GROUP BY aws.AccountId",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count/Second"),
-                legend_position=cloudwatch.LegendPosition.RIGHT,
-            )
-        )
-        
-        # Write IOPS - Detail per environment
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Production",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} WriteIOPS AND aws.AccountId=\"{accounts['Production']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="QA",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} WriteIOPS AND aws.AccountId=\"{accounts['QA']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Dev",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} WriteIOPS AND aws.AccountId=\"{accounts['Dev']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Staging",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} WriteIOPS AND aws.AccountId=\"{accounts['Staging']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            )
-        )
-        
-        # Read Latency - Overview
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Read Latency - Environment Comparison",
-                width=24,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression="SEARCH('{AWS/RDS,DBInstanceIdentifier} ReadLatency', 'Average') GROUP BY aws.AccountId",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Seconds"),
-                legend_position=cloudwatch.LegendPosition.RIGHT,
-            )
-        )
-        
-        # Read Latency - Detail per environment
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Production",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ReadLatency AND aws.AccountId=\"{accounts['Production']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Seconds"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="QA",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ReadLatency AND aws.AccountId=\"{accounts['QA']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Seconds"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Dev",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ReadLatency AND aws.AccountId=\"{accounts['Dev']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Seconds"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Staging",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ReadLatency AND aws.AccountId=\"{accounts['Staging']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Seconds"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            )
-        )
-        
-        # Write Latency - Overview
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Write Latency - Environment Comparison",
-                width=24,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression="SEARCH('{AWS/RDS,DBInstanceIdentifier} WriteLatency', 'Average') GROUP BY aws.AccountId",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Seconds"),
-                legend_position=cloudwatch.LegendPosition.RIGHT,
-            )
-        )
-        
-        # Write Latency - Detail per environment
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Production",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} WriteLatency AND aws.AccountId=\"{accounts['Production']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Seconds"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="QA",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} WriteLatency AND aws.AccountId=\"{accounts['QA']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Seconds"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Dev",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} WriteLatency AND aws.AccountId=\"{accounts['Dev']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Seconds"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Staging",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} WriteLatency AND aws.AccountId=\"{accounts['Staging']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Seconds"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            )
-        )
-        
-        # ===================================================================
-        # SECTION 3: NETWORK THROUGHPUT
-        # ===================================================================
-        dashboard.add_widgets(
-            cloudwatch.TextWidget(
-                markdown="# Network Throughput",
-                width=24,
-                height=1
-            )
-        )
-        
-        # Network Receive Throughput - Overview
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Network Receive Throughput - Environment Comparison",
-                width=24,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression="SEARCH('{AWS/RDS,DBInstanceIdentifier} NetworkReceiveThroughput', 'Average') GROUP BY aws.AccountId",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes/Second"),
-                legend_position=cloudwatch.LegendPosition.RIGHT,
-            )
-        )
-        
-        # Network Receive Throughput - Detail per environment
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Production",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} NetworkReceiveThroughput AND aws.AccountId=\"{accounts['Production']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="QA",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} NetworkReceiveThroughput AND aws.AccountId=\"{accounts['QA']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Dev",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} NetworkReceiveThroughput AND aws.AccountId=\"{accounts['Dev']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Staging",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} NetworkReceiveThroughput AND aws.AccountId=\"{accounts['Staging']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            )
+
+        # Quota budget: a dashboard that grows too large is sharded per account or section,
+        # so a registry of more than a few accounts still synthesizes; `-c onBudgetExceeded=fail`
+        # fails the synth instead
+        expected_instances = self.node.try_get_context("expectedInstancesPerAccount")
+        self.budget = budget or DashboardBudget(
+            default_instances_per_account=int(expected_instances or DEFAULT_EXPECTED_INSTANCES_PER_ACCOUNT)
         )
-        
-        # Network Transmit Throughput - Overview
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Network Transmit Throughput - Environment Comparison",
-                width=24,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression="SEARCH('{AWS/RDS,DBInstanceIdentifier} NetworkTransmitThroughput', 'Average') GROUP BY aws.AccountId",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes/Second"),
-                legend_position=cloudwatch.LegendPosition.RIGHT,
-            )
+        self.on_budget_exceeded = on_budget_exceeded or self.node.try_get_context("onBudgetExceeded") or SPLIT_ON_BUDGET
+        if self.on_budget_exceeded not in (FAIL_ON_BUDGET, SPLIT_ON_BUDGET):
+            raise ValueError(f"Unknown onBudgetExceeded {self.on_budget_exceeded!r}")
+        self.dashboards: List[cloudwatch.CfnDashboard] = []
+
+        # Per-account alarms rolled up per environment, shown on every dashboard;
+        # `-c dashboardAlarms=false` turns them off, `-c alarmThresholds=CPUUtilization=90`
+        # overrides the thresholds declared in metric_catalog.py
+        if alarms is None:
+            alarms = str(self.node.try_get_context("dashboardAlarms")).lower() != "false"
+        if alarm_thresholds is None:
+            alarm_thresholds = {
+                name: float(value)
+                for name, value in (pair.split("=", 1) for pair in self._context_list("alarmThresholds"))
+            }
+        self.composite_alarms = (
+            environment_alarms(self, dashboard_name, self.accounts, self.metrics, thresholds=alarm_thresholds)
+            if alarms
+            else {}
         )
-        
-        # Network Transmit Throughput - Detail per environment
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Production",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} NetworkTransmitThroughput AND aws.AccountId=\"{accounts['Production']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="QA",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} NetworkTransmitThroughput AND aws.AccountId=\"{accounts['QA']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Dev",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} NetworkTransmitThroughput AND aws.AccountId=\"{accounts['Dev']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Staging",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} NetworkTransmitThroughput AND aws.AccountId=\"{accounts['Staging']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
+
+        # Sharding: e.g. `-c dashboardShardBy=prefix -c dashboardShardPrefixes=orders,billing`
+        self.shard_by = shard_by or self.node.try_get_context("dashboardShardBy")
+        if instance_prefixes is None:
+            instance_prefixes = self._context_list("dashboardShardPrefixes")
+        self.instance_prefixes = list(instance_prefixes)
+
+        # Regions owning the data, e.g. `-c dashboardRegions=us-east-1,eu-west-1`.
+        # Several regions render one region-scoped dashboard each behind an index.
+        if regions is None:
+            regions = self._context_list("dashboardRegions")
+        self.regions = list(regions)
+        if len(self.regions) > 1:
+            if self.shard_by not in (None, SHARD_BY_REGION):
+                raise ValueError(f"Multiple regions cannot be combined with sharding by {self.shard_by}")
+            self.shard_by = SHARD_BY_REGION
+        elif self.regions:
+            series_options["region"] = self.regions[0]
+
+        # Incremental synth: `-c synthCache=true` re-creates the dashboards an earlier
+        # synth rendered from identical inputs instead of rendering their widgets again
+        if synth_cache is None and str(self.node.try_get_context("synthCache")).lower() == "true":
+            synth_cache = SynthCache(self.node.try_get_context("synthCacheDir") or DEFAULT_CACHE_DIR)
+        if synth_cache:
+            key = cache_key(
+                metrics=self.metrics,
+                sections=SECTIONS,
+                derived=DERIVED,
+                alarms=ALARMS,
+                accounts=self.accounts,
+                image_tag=IMAGE_TAG,
+                settings=[
+                    dashboard_name, layout, period_policy, resolution_pair, series_options, self.budget,
+                    self.on_budget_exceeded, self.shard_by, self.instance_prefixes, self.regions,
+                    alarms, alarm_thresholds, None if Token.is_unresolved(region) else region,
                 ],
-                left_y_axis=cloudwatch.YAxisProps(label="Bytes/Second"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            )
-        )
-        
-        # ===================================================================
-        # SECTION 4: AURORA SERVERLESS V2 (Optional - comment out if not needed)
-        # ===================================================================
-        dashboard.add_widgets(
-            cloudwatch.TextWidget(
-                markdown="# Aurora Serverless v2 Metrics (if applicable)",
-                width=24,
-                height=1
             )
+            cached = synth_cache.get(key)
+            if cached is not None:
+                self._add_cached_dashboards(cached)
+                return
+
+        # Dashboard bodies come from dashboard_generator, which renders the same JSON without CDK;
+        # sections and metrics are declared in metric_catalog.py
+        self.alarm_arns = {environment: alarm.alarm_arn for environment, alarm in self.composite_alarms.items()}
+        for view_name, options, body_props in dashboard_views(
+            dashboard_name, layout, period_policy, resolution_pair, series_options
+        ):
+            self._add_dashboard(view_name, replace(options, region=options.region or Aws.REGION), **body_props)
+
+        if synth_cache:
+            entries = self._cache_entries()
+            if entries is not None:
+                synth_cache.put(key, entries)
+
+    def _context_list(self, key: str) -> List[str]:
+        """Comma-separated context value as a list, e.g. `-c key=a,b`."""
+        return [item.strip() for item in (self.node.try_get_context(key) or "").split(",") if item.strip()]
+
+    def _add_dashboard(self, dashboard_name: str, options: RenderOptions, **body_props) -> None:
+        """Render the catalog as one dashboard, or as shards behind an index dashboard."""
+        if self.shard_by:
+            self._add_shards(dashboard_name, options, self.shard_by, **body_props)
+            return
+
+        body = render_dashboard(options, self.accounts, SECTIONS, self.metrics, self.alarm_arns, **body_props)
+        dashboard = self._cfn_dashboard(dashboard_name, body)
+        if self.on_budget_exceeded == SPLIT_ON_BUDGET:
+            report = measure_construct(dashboard, list(self.accounts.values()), self.budget)
+            # Section shards are smaller, but only account shards scope every SEARCH to one account
+            if report.worst_search_series > self.budget.max_search_series:
+                self.node.try_remove_child(dashboard_name)
+                self._add_shards(dashboard_name, options, SHARD_BY_ACCOUNT, **body_props)
+                return
+            if report.body_bytes > self.budget.max_body_bytes or report.widgets > self.budget.max_widgets:
+                self.node.try_remove_child(dashboard_name)
+                self._add_shards(dashboard_name, options, SHARD_BY_SECTION, **body_props)
+                return
+        self._guard(dashboard)
+
+    def _add_shards(self, dashboard_name: str, options: RenderOptions, shard_by: str, **body_props) -> None:
+        """Render one dashboard per shard and an index dashboard linking them."""
+        dashboards = render_shards(
+            dashboard_name, options, shard_by, self.accounts, self.metrics,
+            self.instance_prefixes, self.regions, self.alarm_arns, **body_props,
         )
-        
-        # ACU Utilization - Overview
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="ACU Utilization - Environment Comparison",
-                width=24,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression="SEARCH('{AWS/RDS,DBInstanceIdentifier} ACUUtilization', 'Average') GROUP BY aws.AccountId",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Percent"),
-                legend_position=cloudwatch.LegendPosition.RIGHT,
-            )
+        for name, body in dashboards.items():
+            dashboard = self._cfn_dashboard(name, body)
+            if name == dashboard_name:
+                self.dashboards.append(dashboard)
+            else:
+                self._guard(dashboard)
+
+    def _cfn_dashboard(self, dashboard_name: str, body: DashboardBody) -> cloudwatch.CfnDashboard:
+        """Dashboard resource at the construct path ``cloudwatch.Dashboard`` would use, keeping logical ids."""
+        return cloudwatch.CfnDashboard(
+            Construct(self, dashboard_name),
+            "Resource",
+            dashboard_name=dashboard_name,
+            dashboard_body=self.to_json_string(body.to_json()),
         )
-        
-        # ACU Utilization - Detail per environment
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Production",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ACUUtilization AND aws.AccountId=\"{accounts['Production']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Percent"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="QA",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ACUUtilization AND aws.AccountId=\"{accounts['QA']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Percent"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Dev",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ACUUtilization AND aws.AccountId=\"{accounts['Dev']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Percent"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Staging",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ACUUtilization AND aws.AccountId=\"{accounts['Staging']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Percent"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
+
+    def _cache_entries(self) -> Optional[List[Dict[str, Any]]]:
+        """Name and resolved body of every dashboard, or None if one breaks the budget."""
+        entries = []
+        for dashboard in self.dashboards:
+            if measure_construct(dashboard, list(self.accounts.values()), self.budget).violations:
+                return None
+            entries.append(
+                {
+                    "id": dashboard.node.scope.node.id,
+                    "name": self.resolve(dashboard.dashboard_name),
+                    "body": self.resolve(dashboard.dashboard_body),
+                }
             )
-        )
-        
-        # Serverless Database Capacity - Overview
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Serverless Database Capacity (ACUs) - Environment Comparison",
-                width=24,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression="SEARCH('{AWS/RDS,DBInstanceIdentifier} ServerlessDatabaseCapacity', 'Average') GROUP BY aws.AccountId",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count"),
-                legend_position=cloudwatch.LegendPosition.RIGHT,
+        return entries
+
+    def _add_cached_dashboards(self, entries: List[Dict[str, Any]]) -> None:
+        """Re-create cached dashboards at their original construct paths, keeping logical ids."""
+        for entry in entries:
+            # Bodies referencing the region or alarm ARNs were stored as Fn::Join objects
+            self.dashboards.append(
+                cloudwatch.CfnDashboard(
+                    Construct(self, entry["id"]),
+                    "Resource",
+                    dashboard_name=entry["name"],
+                    dashboard_body=Token.as_string(entry["body"]),
+                )
             )
+
+    def _guard(self, dashboard: cloudwatch.CfnDashboard) -> None:
+        """Fail the synth if ``dashboard`` breaks the quota budget."""
+        hint = BUDGET_HINTS[self.on_budget_exceeded if not self.shard_by else SPLIT_ON_BUDGET]
+        dashboard.node.add_validation(
+            BudgetValidation(dashboard, list(self.accounts.values()), self.budget, hint=hint)
         )
-        
-        # Serverless Database Capacity - Detail per environment
-        dashboard.add_widgets(
-            cloudwatch.GraphWidget(
-                title="Production",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ServerlessDatabaseCapacity AND aws.AccountId=\"{accounts['Production']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="QA",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ServerlessDatabaseCapacity AND aws.AccountId=\"{accounts['QA']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Dev",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ServerlessDatabaseCapacity AND aws.AccountId=\"{accounts['Dev']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
-            ),
-            cloudwatch.GraphWidget(
-                title="Staging",
-                width=6,
-                height=6,
-                left=[
-                    cloudwatch.MathExpression(
-                        expression=f"SEARCH('{{AWS/RDS,DBInstanceIdentifier}} ServerlessDatabaseCapacity AND aws.AccountId=\"{accounts['Staging']}\"', 'Average')",
-                        label="",
-                        period=Duration.minutes(1),
-                    )
-                ],
-                left_y_axis=cloudwatch.YAxisProps(label="Count"),
-                legend_position=cloudwatch.LegendPosition.BOTTOM,
+        self.dashboards.append(dashboard)
+
+
+if __name__ == "__main__":
+    app = App()
+
+    # One stack per region, each deployed to and querying its own region:
+    # `cdk synth -c dashboardRegions=us-east-1,eu-west-1 -c dashboardStackPerRegion=true`
+    stack_regions = [
+        region.strip() for region in (app.node.try_get_context("dashboardRegions") or "").split(",") if region.strip()
+    ]
+    if stack_regions and str(app.node.try_get_context("dashboardStackPerRegion")).lower() == "true":
+        for stack_region in stack_regions:
+            RdsDashboardStack(
+                app, f"RdsDashboardStack-{stack_region}",
+                regions=[stack_region],
+                dashboard_name=f"{DASHBOARD_NAME}-{stack_region}",
+                env=Environment(region=stack_region),
             )
+    else:
+        RdsDashboardStack(app, "RdsDashboardStack")
+
+    # OAM sink in the monitoring account and a link in every registered account:
+    # `cdk synth -c observabilityStacks=true -c monitoringAccount=123456789012`. Once the sink
+    # is deployed, `-c observabilitySinkArn=<SinkArn output>`, or `region=<arn>,...` per region
+    if str(app.node.try_get_context("observabilityStacks")).lower() == "true":
+        sink_arns = [
+            arn.strip() for arn in (app.node.try_get_context("observabilitySinkArn") or "").split(",") if arn.strip()
+        ]
+        observability_stacks(
+            app,
+            load_accounts(app.node.try_get_context("accountRegistry") or DEFAULT_REGISTRY_PATH),
+            monitoring_account=app.node.try_get_context("monitoringAccount"),
+            regions=stack_regions,
+            sink_arns=dict(arn.split("=", 1) if "=" in arn else ("", arn) for arn in sink_arns),
         )
 
+    # Metric stream rolling the fleet up per account, in the monitoring account and every region read:
+    # `cdk synth -c metricStreamRollups=true [-c metricStreamFormat=opentelemetry0.7]`
+    if str(app.node.try_get_context("metricStreamRollups")).lower() == "true":
+        for stream_region in stack_regions or [None]:
+            MetricStreamRollupStack(
+                app,
+                f"RdsMetricStreamRollups-{stream_region}" if stream_region else "RdsMetricStreamRollups",
+                load_accounts(app.node.try_get_context("accountRegistry") or DEFAULT_REGISTRY_PATH),
+                output_format=app.node.try_get_context("metricStreamFormat") or JSON_FORMAT,
+                env=Environment(account=app.node.try_get_context("monitoringAccount"), region=stream_region),
+            )
 
-app = App()
-RdsDashboardStack(app, "RdsDashboardStack")
-app.synth()
\ No newline at end of file
+    app.synth()
@@ -0,0 +1,156 @@
+"""Synth scaling benchmark for RdsDashboardStack.
+
+Runs every (accounts, metrics) scenario in a fresh worker process so each
+one pays the real ``aws_cdk`` import and jsii start-up cost, and records:
+
+* ``import_s`` - wall time of ``import aws_cdk``
+* ``construct_s`` - ``App()`` plus ``RdsDashboardStack`` instantiation
+* ``synth_s`` - ``app.synth()``
+* ``peak_rss_kb`` - peak RSS of the worker and its jsii node process
+
+Accounts and metrics are synthetic (the real catalog, padded with generated
+metrics), and quota checks are relaxed, so no AWS credentials or registry
+are needed. Results are written as JSON; pass ``--baseline`` with an earlier
+result file to print the relative change of every scenario.
+
+    python bench_suite.py
+    python bench_suite.py --accounts 4 64 --metrics 11 100 --baseline bench_results/old.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(HERE, "bench_results")
+DEFAULT_ACCOUNTS = (4, 16, 64)
+DEFAULT_METRICS = (11, 50, 100)
+TIMED_FIELDS = ("import_s", "construct_s", "synth_s", "peak_rss_kb")
+
+
+def synthetic_accounts(count: int) -> Dict[str, str]:
+    return {f"Env{index:03d}": f"{100000000000 + index}" for index in range(count)}
+
+
+def synthetic_metrics(count: int):
+    """The catalog metrics, padded with generated ones spread over its sections."""
+    from metric_catalog import DERIVED_METRICS, METRICS, SECTIONS, MetricDefinition
+
+    sections = [section.key for section in SECTIONS if section.key != DERIVED_METRICS]
+    metrics = list(METRICS[:count])
+    for index in range(len(metrics), count):
+        section = sections[index % len(sections)]
+        metrics.append(MetricDefinition(f"SyntheticMetric{index}", f"Synthetic Metric {index}", "Count", section))
+    return tuple(metrics)
+
+
+def worker(accounts: int, metrics: int) -> Dict[str, Any]:
+    """Measure one scenario inside this process."""
+    start = time.perf_counter()
+    import aws_cdk
+    imported = time.perf_counter()
+
+    sys.path.insert(0, HERE)
+    from app import RdsDashboardStack
+    from dashboard_budget import DashboardBudget
+
+    # Scaled-up scenarios deliberately exceed the real quotas
+    budget = DashboardBudget(
+        max_body_bytes=sys.maxsize,
+        max_widgets=sys.maxsize,
+        max_search_series=sys.maxsize,
+        max_insights_series=sys.maxsize,
+    )
+    app_metrics = synthetic_metrics(metrics)
+    app_accounts = synthetic_accounts(accounts)
+
+    constructing = time.perf_counter()
+    app = aws_cdk.App(outdir=os.path.join(RESULTS_DIR, ".cdk.out", f"{accounts}x{metrics}"))
+    RdsDashboardStack(app, "RdsDashboardStack", accounts=app_accounts, metrics=app_metrics, budget=budget)
+    constructed = time.perf_counter()
+    app.synth()
+    synthed = time.perf_counter()
+
+    return {
+        "import_s": imported - start,
+        "construct_s": constructed - constructing,
+        "synth_s": synthed - constructed,
+    }
+
+
+def run_scenario(accounts: int, metrics: int) -> Dict[str, Any]:
+    """Run a worker process and add its peak memory, node child included."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--worker", str(accounts), str(metrics)],
+        stdout=subprocess.PIPE,
+        env={**os.environ, "JSII_SILENCE_WARNING_DEPRECATED_NODE_VERSION": "1"},
+    )
+    output = process.stdout.read()
+    process.stdout.close()
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"Scenario {accounts} accounts x {metrics} metrics failed ({process.returncode})")
+    result = json.loads(output)
+    result.update(accounts=accounts, metrics=metrics, peak_rss_kb=usage.ru_maxrss)
+    return result
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]]) -> None:
+    previous = {(entry["accounts"], entry["metrics"]): entry for entry in baseline}
+    for entry in results:
+        before = previous.get((entry["accounts"], entry["metrics"]))
+        if not before:
+            continue
+        changes = "  ".join(
+            f"{field} {(entry[field] - before[field]) / before[field] * 100:+6.1f}%"
+            for field in TIMED_FIELDS
+            if before.get(field)
+        )
+        print(f"{entry['accounts']:>4} accounts x {entry['metrics']:>4} metrics: {changes}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, nargs="+", default=DEFAULT_ACCOUNTS)
+    parser.add_argument("--metrics", type=int, nargs="+", default=DEFAULT_METRICS)
+    parser.add_argument("--output", help="result file (default: bench_results/synth-<timestamp>.json)")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--worker", type=int, nargs=2, metavar=("ACCOUNTS", "METRICS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(*args.worker)))
+        return 0
+
+    results = []
+    for accounts in args.accounts:
+        for metrics in args.metrics:
+            result = run_scenario(accounts, metrics)
+            results.append(result)
+            print(
+                f"{accounts:>4} accounts x {metrics:>4} metrics: "
+                f"import {result['import_s']:6.2f}s  construct {result['construct_s']:6.2f}s  "
+                f"synth {result['synth_s']:6.2f}s  peak {result['peak_rss_kb'] / 1024:7.1f} MiB"
+            )
+
+    output: Optional[str] = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, time.strftime("synth-%Y%m%d-%H%M%S.json"))
+    with open(output, "w") as f:
+        json.dump({"python": platform.python_version(), "results": results}, f, indent=1)
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f)["results"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
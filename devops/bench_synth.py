@@ -0,0 +1,154 @@
+"""Synth-time benchmark for RdsDashboardStack.
+
+Times construct instantiation and ``app.synth()`` for the catalog-driven
+stack, after one untimed warm-up run that pays for starting the jsii
+runtime, and checks the rendered dashboard body is byte-for-byte identical
+to the committed snapshot. The snapshot was first captured from the
+hand-written dashboard; refresh it with ``--update-snapshot`` when the
+rendered output changes on purpose.
+
+    python bench_synth.py
+    python bench_synth.py --baseline-app /tmp/legacy_app.py
+    python bench_synth.py --update-snapshot
+
+``--baseline-app`` loads an older app.py (for example
+``git show 9890823:devops/app.py > /tmp/legacy_app.py``) and times it
+side by side, comparing both dashboard bodies. Bodies only match when both
+apps render with the same defaults.
+
+The CDK-free ``dashboard_generator`` is timed as well and its body must
+match the synthesized one key for key. Alarm ARNs are tokens in the
+template, so it is handed the ARNs of the synthesized alarm status row.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Tuple
+
+from aws_cdk import App
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots", "rds_dashboard_body.json")
+STACK_ID = "RdsDashboardStack"
+
+
+def _load_stack_class(path: str) -> type:
+    spec = importlib.util.spec_from_file_location(f"bench_app_{abs(hash(path))}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.RdsDashboardStack
+
+
+def dashboard_body(template: Dict[str, Any]) -> str:
+    """Return the canonical JSON of the only dashboard's DashboardBody."""
+    bodies = [
+        resource["Properties"]["DashboardBody"]
+        for resource in template["Resources"].values()
+        if resource["Type"] == "AWS::CloudWatch::Dashboard"
+    ]
+    if len(bodies) != 1:
+        raise ValueError(f"Expected exactly one dashboard, found {len(bodies)}")
+    return json.dumps(bodies[0], indent=1, sort_keys=True)
+
+
+def run_once(stack_class: type) -> Tuple[float, float, str]:
+    """Build and synth one app; return (construct seconds, synth seconds, body)."""
+    with tempfile.TemporaryDirectory() as outdir:
+        start = time.perf_counter()
+        app = App(outdir=outdir)
+        stack_class(app, STACK_ID)
+        built = time.perf_counter()
+        assembly = app.synth()
+        synthed = time.perf_counter()
+        template = assembly.get_stack_by_name(STACK_ID).template
+    return built - start, synthed - built, dashboard_body(template)
+
+
+def benchmark(stack_class: type, iterations: int) -> Tuple[Dict[str, float], str]:
+    # Untimed warm-up: the first synth also pays for starting the jsii runtime
+    run_once(stack_class)
+    construct_times, synth_times, body = [], [], ""
+    for _ in range(iterations):
+        construct_s, synth_s, body = run_once(stack_class)
+        construct_times.append(construct_s)
+        synth_times.append(synth_s)
+    stats = {
+        "construct_min_s": min(construct_times),
+        "synth_min_s": min(synth_times),
+        "total_min_s": min(c + s for c, s in zip(construct_times, synth_times)),
+    }
+    return stats, body
+
+
+def benchmark_generator(body: str, iterations: int) -> Tuple[Dict[str, float], bool]:
+    """Time ``render_dashboards`` and check it reproduces the synthesized ``body``."""
+    from account_registry import load_accounts
+    from dashboard_generator import DASHBOARD_NAME, render_dashboards
+    from query_estimate import resolve_dashboard_body
+
+    expected = resolve_dashboard_body(json.loads(body))
+    alarm_rows = [widget for widget in expected["widgets"] if widget["type"] == "alarm"]
+    accounts = load_accounts()
+    alarm_arns = dict(zip(accounts, alarm_rows[0]["properties"]["alarms"] if alarm_rows else []))
+
+    times, rendered = [], {}
+    for _ in range(iterations):
+        start = time.perf_counter()
+        rendered = render_dashboards(accounts, alarm_arns=alarm_arns)[DASHBOARD_NAME]
+        times.append(time.perf_counter() - start)
+    stats = {"construct_min_s": min(times), "synth_min_s": 0.0, "total_min_s": min(times)}
+    return stats, json.dumps(rendered) == json.dumps(expected)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--baseline-app", help="path to a legacy app.py to compare against")
+    parser.add_argument("--update-snapshot", action="store_true", help="rewrite the committed dashboard snapshot")
+    args = parser.parse_args()
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    from app import RdsDashboardStack
+
+    results = {}
+    results["catalog"], body = benchmark(RdsDashboardStack, args.iterations)
+
+    if args.update_snapshot:
+        os.makedirs(os.path.dirname(SNAPSHOT_PATH), exist_ok=True)
+        with open(SNAPSHOT_PATH, "w") as f:
+            f.write(body + "\n")
+        print(f"Snapshot written to {SNAPSHOT_PATH}")
+
+    identical = True
+    with open(SNAPSHOT_PATH) as f:
+        if f.read() != body + "\n":
+            identical = False
+            print("MISMATCH: catalog dashboard body differs from snapshot", file=sys.stderr)
+
+    results["generator"], generator_identical = benchmark_generator(body, args.iterations)
+    if not generator_identical:
+        identical = False
+        print("MISMATCH: dashboard_generator body differs from the synthesized one", file=sys.stderr)
+
+    if args.baseline_app:
+        results["baseline"], baseline_body = benchmark(_load_stack_class(args.baseline_app), args.iterations)
+        if baseline_body != body:
+            identical = False
+            print("MISMATCH: catalog dashboard body differs from baseline app", file=sys.stderr)
+
+    for name, stats in results.items():
+        print(
+            f"{name:>9}: construct {stats['construct_min_s'] * 1000:8.1f} ms  "
+            f"synth {stats['synth_min_s'] * 1000:8.1f} ms  "
+            f"total {stats['total_min_s'] * 1000:8.1f} ms"
+        )
+    print("dashboard body: " + ("identical" if identical else "DIFFERENT"))
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
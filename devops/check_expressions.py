@@ -0,0 +1,79 @@
+"""Golden-file check of the query expressions each backend synthesizes.
+
+Synthesizes RdsDashboardStack once per query backend, with and without
+top-N panels, extra statistics and the derived metric section, and compares
+every widget's expressions against the files in ``snapshots/``. Exits non-zero on any difference.
+
+    python check_expressions.py
+    python check_expressions.py --update
+"""
+import argparse
+import difflib
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+from aws_cdk import App
+
+from app import RdsDashboardStack
+from query_backends import BACKENDS
+from query_estimate import dashboard_bodies, metric_expressions
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+VARIANTS = {
+    "default": {},
+    "top-n": {"top_n": 10, "bands": ["AVG"]},
+    "series-statistics": {"statistics_view": "series"},
+    "worst-statistics": {"statistics_view": "worst"},
+    "derived": {"derived_metrics": True, "vcpus": {"Production": 64, "QA": 8}},
+}
+
+
+def synthesized_expressions(backend: str, **stack_props) -> List[Dict[str, Any]]:
+    """Title and expressions of every metric widget, in dashboard order."""
+    app = App()
+    stack = RdsDashboardStack(app, "RdsDashboardStack", backend=backend, **stack_props)
+    template = app.synth().get_stack_by_name(stack.stack_name).template
+    return [
+        {"title": widget["properties"].get("title", ""), "expressions": list(metric_expressions(widget))}
+        for body in dashboard_bodies(template).values()
+        for widget in body["widgets"]
+        if widget["type"] == "metric"
+    ]
+
+
+def golden_path(backend: str, variant: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"expressions_{backend}_{variant}.json")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--update", action="store_true", help="rewrite the golden files")
+    args = parser.parse_args()
+
+    failed = False
+    for backend in BACKENDS:
+        for variant, stack_props in VARIANTS.items():
+            path = golden_path(backend, variant)
+            rendered = json.dumps(synthesized_expressions(backend, **stack_props), indent=1) + "\n"
+            if args.update:
+                with open(path, "w") as f:
+                    f.write(rendered)
+                print(f"updated {os.path.relpath(path)}")
+                continue
+            with open(path) as f:
+                golden = f.read()
+            if golden == rendered:
+                print(f"ok      {os.path.relpath(path)}")
+                continue
+            failed = True
+            print(f"FAILED  {os.path.relpath(path)}")
+            sys.stdout.writelines(
+                difflib.unified_diff(golden.splitlines(True), rendered.splitlines(True), "golden", "synthesized")
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
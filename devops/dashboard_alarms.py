@@ -0,0 +1,106 @@
+"""Per-account alarms and per-environment composite alarms from the catalog.
+
+Each ``ALARMS`` entry becomes one alarm per account instead of one per
+instance: a Metrics Insights query reduces every instance of the account to
+its worst value (``MAX``, or ``MIN`` for headroom metrics), and the alarm
+evaluates that single series. SEARCH expressions cannot back an alarm, so
+alarms always use Metrics Insights whatever backend the dashboard graphs
+use. The alarms of an environment roll up into one composite alarm, which
+is what the dashboard's alarm status row (``dashboard_body.alarm_status_widget``)
+and any notification hang off.
+
+Alarms always watch instances, even for metrics the dashboard graphs per
+Aurora cluster: a cluster aggregate can hide one saturated instance.
+
+Alarms evaluate in the stack's own region; multi-region fleets get their
+alarms from one stack per region.
+"""
+from dataclasses import replace
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from aws_cdk import Duration, aws_cloudwatch as cloudwatch
+from constructs import Construct
+
+from account_registry import environment_slug
+from metric_catalog import ALARMS, INSTANCE_DIMENSIONS, AlarmDefinition, MetricDefinition
+from query_backends import MetricsInsightsBackend
+
+_insights = MetricsInsightsBackend()
+
+
+def _alarm_metric(metric: MetricDefinition, alarm: AlarmDefinition, account_id: str) -> cloudwatch.MathExpression:
+    statistic = "Maximum" if metric.higher_is_worse else "Minimum"
+    return cloudwatch.MathExpression(
+        expression=_insights.aggregate(metric, [account_id], statistic),
+        label=f"{metric.title} ({statistic.lower()} over instances)",
+        period=Duration.seconds(alarm.period_seconds),
+    )
+
+
+def account_alarms(
+    scope: Construct,
+    name_prefix: str,
+    environment: str,
+    account_id: str,
+    metrics: Sequence[MetricDefinition],
+    alarms: Sequence[AlarmDefinition] = ALARMS,
+    thresholds: Optional[Mapping[str, float]] = None,
+) -> List[cloudwatch.Alarm]:
+    """One alarm per catalog alarm whose metric is rendered, for one account.
+
+    ``thresholds`` overrides ``AlarmDefinition.threshold`` by metric name.
+    """
+    by_name: Dict[str, MetricDefinition] = {}
+    for metric in metrics:
+        # First catalog entry of a metric names the alarm; it always evaluates per instance
+        by_name.setdefault(metric.metric_name, replace(metric, dimensions=INSTANCE_DIMENSIONS, role=None))
+    slug = environment_slug(environment)
+    created = []
+    for alarm in alarms:
+        metric = by_name.get(alarm.metric_name)
+        if metric is None:
+            continue
+        created.append(
+            cloudwatch.Alarm(
+                scope,
+                f"{slug}{alarm.metric_name}Alarm",
+                alarm_name=f"{name_prefix}-{slug}-{alarm.metric_name}",
+                metric=_alarm_metric(metric, alarm, account_id),
+                threshold=(thresholds or {}).get(alarm.metric_name, alarm.threshold),
+                comparison_operator=(
+                    cloudwatch.ComparisonOperator.GREATER_THAN_THRESHOLD
+                    if metric.higher_is_worse
+                    else cloudwatch.ComparisonOperator.LESS_THAN_THRESHOLD
+                ),
+                evaluation_periods=alarm.evaluation_periods,
+                datapoints_to_alarm=alarm.datapoints_to_alarm,
+                # Accounts without e.g. Serverless v2 instances report nothing
+                treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING,
+            )
+        )
+    return created
+
+
+def environment_alarms(
+    scope: Construct,
+    name_prefix: str,
+    accounts: Dict[str, str],
+    metrics: Sequence[MetricDefinition],
+    alarms: Sequence[AlarmDefinition] = ALARMS,
+    thresholds: Optional[Mapping[str, float]] = None,
+) -> Dict[str, cloudwatch.CompositeAlarm]:
+    """Per-account alarms rolled up into one composite alarm per environment."""
+    composites = {}
+    for environment, account_id in accounts.items():
+        children = account_alarms(scope, name_prefix, environment, account_id, metrics, alarms, thresholds)
+        if not children:
+            continue
+        composites[environment] = cloudwatch.CompositeAlarm(
+            scope,
+            f"{environment_slug(environment)}CompositeAlarm",
+            composite_alarm_name=f"{name_prefix}-{environment_slug(environment)}",
+            alarm_description=f"Any RDS alarm in {environment} ({account_id})",
+            alarm_rule=cloudwatch.AlarmRule.any_of(*children),
+        )
+    return composites
+
@@ -0,0 +1,235 @@
+"""CloudWatch dashboard JSON without ``aws_cdk``.
+
+The building blocks the widget generator renders to: metric math
+expressions, graph, single value, Logs Insights, text and alarm status
+widgets, and a dashboard body that lays rows out on the 24-column grid.
+They produce the same JSON as ``aws_cloudwatch.Dashboard`` does for the
+same widgets, key order included:
+
+* a graph lists every expression once, followed by the expressions it
+  references by id, which are hidden (``visible: false``);
+* ``period`` is only written when it is not the 300 second default, and an
+  empty label is left out on visible series;
+* each ``add_widgets`` call starts a new row, wrapping onto another line
+  when its widgets exceed the grid width.
+
+Importing this module (and ``dashboard_widgets``) does not start the jsii
+runtime. The stack passes CDK tokens for the region and alarm ARNs and
+wraps the body in a ``CfnDashboard``; tooling uses the ``${AWS::Region}``
+placeholder that ``query_estimate.resolve_dashboard_body`` also renders.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+GRID_WIDTH = 24
+DEFAULT_PERIOD_SECONDS = 300
+
+HOME_REGION = "${AWS::Region}"
+
+LEGEND_RIGHT = "right"
+LEGEND_BOTTOM = "bottom"
+
+PERIOD_OVERRIDE_INHERIT = "inherit"
+
+ALARM_STATUS_TITLE = "Alarm Status"
+ALARM_STATUS_HEIGHT = 3
+
+Widget = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class Expression:
+    """Metric math expression; ``using_metrics`` are the expressions it references by id."""
+
+    expression: str
+    label: str = ""
+    period_seconds: Optional[int] = None
+    using_metrics: Dict[str, "Expression"] = field(default_factory=dict)
+
+    def key(self) -> Tuple[Any, ...]:
+        """Identity of the query; label and period do not make two expressions different."""
+        using = tuple((metric_id, self.using_metrics[metric_id].key()) for metric_id in sorted(self.using_metrics))
+        return (self.expression, using)
+
+
+@dataclass
+class _Entry:
+    metric: Expression
+    visible: bool
+    id: Optional[str] = None
+
+
+def _add_entry(
+    entries: List[_Entry],
+    by_key: Dict[Tuple[Any, ...], _Entry],
+    by_id: Dict[str, _Entry],
+    metric: Expression,
+    visible: bool,
+    metric_id: Optional[str] = None,
+) -> None:
+    key = metric.key()
+    entry = by_id.get(metric_id) if metric_id else None
+    if entry is not None and entry.metric.key() != key:
+        raise ValueError(f"Two different expressions share the id {metric_id!r} in one graph")
+    if entry is None:
+        entry = by_key.get(key)
+        if entry is not None and entry.id and metric_id:
+            entry = None
+    if entry is None:
+        entry = _Entry(metric, visible)
+        entries.append(entry)
+        by_key[key] = entry
+    if not entry.id and metric_id:
+        entry.id = metric_id
+        by_id[metric_id] = entry
+    entry.visible = entry.visible or visible
+    for sub_id, sub_metric in metric.using_metrics.items():
+        _add_entry(entries, by_key, by_id, sub_metric, False, sub_id)
+
+
+def metric_rows(metrics: Sequence[Expression]) -> List[List[Dict[str, Any]]]:
+    """``metrics`` array of a graph: each expression once, referenced ones hidden after their user."""
+    entries: List[_Entry] = []
+    by_key: Dict[Tuple[Any, ...], _Entry] = {}
+    by_id: Dict[str, _Entry] = {}
+    for metric in metrics:
+        _add_entry(entries, by_key, by_id, metric, True)
+
+    rows = []
+    for entry in entries:
+        options: Dict[str, Any] = {}
+        if entry.metric.label or not entry.visible:
+            options["label"] = entry.metric.label
+        options["expression"] = entry.metric.expression
+        period = entry.metric.period_seconds
+        if period and period != DEFAULT_PERIOD_SECONDS:
+            options["period"] = period
+        if not entry.visible:
+            options["visible"] = False
+        if entry.id:
+            options["id"] = entry.id
+        rows.append([options])
+    return rows
+
+
+def graph_widget(
+    title: str,
+    left: Sequence[Expression],
+    width: int,
+    height: int,
+    left_label: str,
+    legend_position: str,
+    region: str = HOME_REGION,
+    start: Optional[str] = None,
+    period_seconds: Optional[int] = None,
+    left_min: Optional[float] = None,
+) -> Widget:
+    properties: Dict[str, Any] = {"view": "timeSeries", "title": title, "region": region}
+    rows = metric_rows(left)
+    if rows:
+        properties["metrics"] = rows
+    properties["yAxis"] = {"left": {"label": left_label}}
+    if left_min is not None:
+        properties["yAxis"]["left"]["min"] = left_min
+    properties["legend"] = {"position": legend_position}
+    if period_seconds is not None:
+        properties["period"] = period_seconds
+    if start is not None:
+        properties["start"] = start
+    return {"type": "metric", "width": width, "height": height, "properties": properties}
+
+
+def single_value_widget(
+    title: str,
+    metrics: Sequence[Expression],
+    width: int,
+    height: int,
+    region: str = HOME_REGION,
+    start: Optional[str] = None,
+    period_seconds: Optional[int] = None,
+) -> Widget:
+    """Latest value of each visible expression, as ``aws_cloudwatch.SingleValueWidget`` renders it."""
+    properties: Dict[str, Any] = {"view": "singleValue", "title": title, "region": region}
+    rows = metric_rows(metrics)
+    if rows:
+        properties["metrics"] = rows
+    if period_seconds is not None:
+        properties["period"] = period_seconds
+    if start is not None:
+        properties["start"] = start
+    return {"type": "metric", "width": width, "height": height, "properties": properties}
+
+
+def log_widget(
+    title: str,
+    log_group_names: Sequence[str],
+    query_lines: Sequence[str],
+    width: int,
+    height: int,
+    region: str = HOME_REGION,
+) -> Widget:
+    """Logs Insights table over exactly ``log_group_names``."""
+    sources = " | ".join(f"SOURCE '{name}'" for name in log_group_names)
+    query = "\n| ".join(query_lines)
+    properties = {"view": "table", "title": title, "region": region, "query": f"{sources} | {query}"}
+    return {"type": "log", "width": width, "height": height, "properties": properties}
+
+
+def text_widget(markdown: str, width: int, height: int) -> Widget:
+    return {"type": "text", "width": width, "height": height, "properties": {"markdown": markdown}}
+
+
+def alarm_status_widget(alarm_arns: Sequence[str]) -> Widget:
+    """Full-width status row, firing alarms first."""
+    return {
+        "type": "alarm",
+        "width": GRID_WIDTH,
+        "height": ALARM_STATUS_HEIGHT,
+        "properties": {"title": ALARM_STATUS_TITLE, "alarms": list(alarm_arns), "sortBy": "stateUpdatedTimestamp"},
+    }
+
+
+def _positioned(widget: Widget, x: int, y: int) -> Widget:
+    return {
+        "type": widget["type"],
+        "width": widget["width"],
+        "height": widget["height"],
+        "x": x,
+        "y": y,
+        "properties": widget["properties"],
+    }
+
+
+class DashboardBody:
+    """Rows of widgets, rendered to the ``DashboardBody`` JSON document."""
+
+    def __init__(self, start: Optional[str] = None, period_override: Optional[str] = None) -> None:
+        self.start = start
+        self.period_override = period_override
+        self.rows: List[List[Widget]] = []
+
+    def add_widgets(self, *widgets: Widget) -> None:
+        """Add one row; widgets beyond the grid width wrap onto the next line."""
+        if widgets:
+            self.rows.append(list(widgets))
+
+    def to_json(self) -> Dict[str, Any]:
+        widgets = []
+        row_y = 0
+        for row in self.rows:
+            x, y, row_height = 0, 0, 0
+            for widget in row:
+                if x + widget["width"] > GRID_WIDTH:
+                    x, y = 0, row_height
+                widgets.append(_positioned(widget, x, row_y + y))
+                row_height = max(row_height, y + widget["height"])
+                x += widget["width"]
+            row_y += row_height
+
+        body: Dict[str, Any] = {}
+        if self.start is not None:
+            body["start"] = self.start
+        if self.period_override is not None:
+            body["periodOverride"] = self.period_override
+        body["widgets"] = widgets
+        return body
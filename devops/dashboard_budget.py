@@ -0,0 +1,172 @@
+"""Synth-time budget checks for CloudWatch dashboard quotas.
+
+A dashboard that exceeds a CloudWatch quota either fails to deploy or,
+worse, deploys and silently drops series once a SEARCH matches more than
+its result cap. ``measure_dashboard`` computes the rendered body size, the
+widget count, the metrics per graph and the worst-case series count of
+every SEARCH and Metrics Insights query for an expected fleet size. ``BudgetValidation`` runs it when
+the app is synthesized and fails the synth on any violation.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import jsii
+from aws_cdk import Stack, aws_cloudwatch as cloudwatch
+from constructs import IValidation
+
+from query_estimate import (
+    ACCOUNT_ID_PATTERN,
+    DEFAULT_EXPECTED_INSTANCES_PER_ACCOUNT,
+    INSIGHTS_PATTERN,
+    ROLLUP_ACCOUNT_PATTERN,
+    SEARCH_PATTERN,
+    metric_expressions,
+    resolve_dashboard_body,
+)
+from metric_stream_aggregator import ROLLUP_NAMESPACE
+
+# Service quotas; override per stack if AWS raises them
+MAX_DASHBOARD_BODY_BYTES = 1_048_576
+MAX_WIDGETS_PER_DASHBOARD = 500
+MAX_METRICS_PER_GRAPH = 500
+MAX_SEARCH_SERIES = 100
+MAX_INSIGHTS_SERIES = 500
+
+LIMIT_PATTERN = re.compile(r"\bLIMIT\s+(\d+)")
+
+
+@dataclass(frozen=True)
+class DashboardBudget:
+    """Quota limits and the fleet size they are checked against.
+
+    ``expected_instances`` maps account id to expected RDS instance count;
+    accounts missing from it use ``default_instances_per_account``.
+    """
+
+    max_body_bytes: int = MAX_DASHBOARD_BODY_BYTES
+    max_widgets: int = MAX_WIDGETS_PER_DASHBOARD
+    max_metrics_per_graph: int = MAX_METRICS_PER_GRAPH
+    max_search_series: int = MAX_SEARCH_SERIES
+    max_insights_series: int = MAX_INSIGHTS_SERIES
+    expected_instances: Dict[str, int] = field(default_factory=dict)
+    default_instances_per_account: int = DEFAULT_EXPECTED_INSTANCES_PER_ACCOUNT
+
+    def instances(self, account_id: str) -> int:
+        return self.expected_instances.get(account_id, self.default_instances_per_account)
+
+
+@dataclass
+class BudgetReport:
+    """Measured size of one dashboard and any quota it breaks."""
+
+    body_bytes: int
+    widgets: int
+    max_metrics_per_graph: int
+    worst_search_series: int
+    violations: List[str] = field(default_factory=list)
+
+
+def search_series(expression: str, account_ids: List[str], budget: DashboardBudget) -> int:
+    """Worst-case number of instance series one SEARCH expression matches.
+
+    A SEARCH scoped with ``aws.AccountId="..."`` terms matches the instances
+    of those accounts only; an unscoped one (including ``GROUP BY
+    aws.AccountId``) has to read every instance in the fleet. A metric
+    stream rollup has one series per account.
+    """
+    if ROLLUP_NAMESPACE in expression:
+        return len(ROLLUP_ACCOUNT_PATTERN.findall(expression) or account_ids)
+    scoped = ACCOUNT_ID_PATTERN.findall(expression)
+    return sum(budget.instances(account_id) for account_id in (scoped or account_ids))
+
+
+def insights_series(query: str, account_ids: List[str], budget: DashboardBudget) -> int:
+    """Worst-case number of series one Metrics Insights query returns.
+
+    Grouping by account returns one series per account; otherwise one per
+    matched instance, capped by any ``LIMIT``.
+    """
+    scoped = ACCOUNT_ID_PATTERN.findall(query) or account_ids
+    if "GROUP BY AWS.AccountId" in query:
+        series = len(scoped)
+    else:
+        series = sum(budget.instances(account_id) for account_id in scoped)
+    limit = LIMIT_PATTERN.search(query)
+    return min(series, int(limit.group(1))) if limit else series
+
+
+def measure_dashboard(body: Dict[str, Any], account_ids: List[str], budget: DashboardBudget) -> BudgetReport:
+    """Check a parsed dashboard body against ``budget``."""
+    widgets = body.get("widgets", [])
+    report = BudgetReport(
+        body_bytes=len(json.dumps(body, separators=(",", ":")).encode("utf-8")),
+        widgets=len(widgets),
+        max_metrics_per_graph=0,
+        worst_search_series=0,
+    )
+
+    if report.body_bytes > budget.max_body_bytes:
+        report.violations.append(f"dashboard body is {report.body_bytes} bytes, limit {budget.max_body_bytes}")
+    if report.widgets > budget.max_widgets:
+        report.violations.append(f"dashboard has {report.widgets} widgets, limit {budget.max_widgets}")
+
+    for widget in widgets:
+        if widget.get("type") != "metric":
+            continue
+        title = widget["properties"].get("title", "<untitled>")
+        metric_rows = len(widget["properties"].get("metrics", []))
+        report.max_metrics_per_graph = max(report.max_metrics_per_graph, metric_rows)
+        if metric_rows > budget.max_metrics_per_graph:
+            report.violations.append(
+                f"widget {title!r} has {metric_rows} metrics, limit {budget.max_metrics_per_graph}"
+            )
+        for expression in metric_expressions(widget):
+            if SEARCH_PATTERN.search(expression):
+                series = search_series(expression, account_ids, budget)
+                report.worst_search_series = max(report.worst_search_series, series)
+                if series > budget.max_search_series:
+                    report.violations.append(
+                        f"widget {title!r} SEARCH can match {series} series, limit {budget.max_search_series}"
+                    )
+            elif INSIGHTS_PATTERN.search(expression):
+                series = insights_series(expression, account_ids, budget)
+                if series > budget.max_insights_series:
+                    report.violations.append(
+                        f"widget {title!r} Metrics Insights query can return {series} series, "
+                        f"limit {budget.max_insights_series}"
+                    )
+    return report
+
+
+def measure_construct(dashboard: cloudwatch.CfnDashboard, account_ids: List[str], budget: DashboardBudget) -> BudgetReport:
+    """Resolve a dashboard resource's body and measure it."""
+    body = Stack.of(dashboard).resolve(dashboard.dashboard_body)
+    return measure_dashboard(resolve_dashboard_body(body), account_ids, budget)
+
+
+@jsii.implements(IValidation)
+class BudgetValidation:
+    """Fails ``cdk synth`` when a dashboard breaks its budget.
+
+    ``hint``, e.g. the option that would keep the dashboard within budget, follows the violations.
+    """
+
+    def __init__(
+        self,
+        dashboard: cloudwatch.CfnDashboard,
+        account_ids: List[str],
+        budget: Optional[DashboardBudget] = None,
+        hint: Optional[str] = None,
+    ):
+        self._dashboard = dashboard
+        self._account_ids = account_ids
+        self._budget = budget or DashboardBudget()
+        self._hint = hint
+
+    def validate(self) -> List[str]:
+        violations = measure_construct(self._dashboard, self._account_ids, self._budget).violations
+        if violations and self._hint:
+            violations.append(self._hint)
+        return violations
@@ -0,0 +1,289 @@
+"""Widget-level diff between two renderings of the dashboards.
+
+A CloudFormation diff shows a changed dashboard as one escaped
+``DashboardBody`` string. This parses both sides and reports, per
+dashboard, the widgets that were added, removed or changed, named by
+section (the markdown header above them) and title. Per-account panels are
+named after the full-width graph they sit under, e.g.
+``Resource Utilization / CPU Utilization - Environment Comparison / QA``.
+Positions are ignored, so inserting a row does not mark everything below
+it as changed.
+
+Each dashboard also gets the change in SEARCH expressions, Metrics Insights
+queries, GetMetricData requests and the estimated cost per refresh, from
+the worst-case metrics every query reads for the registered accounts at
+``--instances-per-account`` instances each.
+
+Either side can be a synthesized template, a single dashboard body, or the
+``{name: body}`` output of ``dashboard_generator``; the new side defaults
+to rendering the current tree:
+
+    python dashboard_diff.py base.template.json
+    python dashboard_diff.py base.template.json cdk.out/RdsDashboardStack.template.json --max-cost-increase 0
+"""
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from dashboard_body import GRID_WIDTH
+from dashboard_generator import alarm_arn, render_dashboards
+from query_estimate import (
+    DEFAULT_EXPECTED_INSTANCES_PER_ACCOUNT,
+    estimated_cost_usd,
+    metric_expressions,
+    query_stats,
+    resolve_dashboard_body,
+    scanned_metrics,
+)
+
+
+@dataclass(frozen=True)
+class LoadStats:
+    """Per-refresh query load of one dashboard body."""
+
+    search_expressions: int
+    insights_queries: int
+    get_metric_data_requests: int
+    metrics: int
+
+    @property
+    def estimated_cost_usd(self) -> float:
+        return estimated_cost_usd(self.metrics)
+
+
+@dataclass
+class DashboardDiff:
+    """Widget changes and load change of one dashboard; ``None`` stats mean it does not exist on that side."""
+
+    name: str
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: Dict[str, List[str]] = field(default_factory=dict)
+    old: Optional[LoadStats] = None
+    new: Optional[LoadStats] = None
+
+    @property
+    def cost_delta_usd(self) -> float:
+        return (self.new.estimated_cost_usd if self.new else 0.0) - (self.old.estimated_cost_usd if self.old else 0.0)
+
+    @property
+    def unchanged(self) -> bool:
+        return not (self.added or self.removed or self.changed) and self.old == self.new
+
+
+def load_bodies(path: str) -> Dict[str, Dict[str, Any]]:
+    """Dashboard bodies by dashboard name from a template, a body or a ``{name: body}`` map."""
+    with open(path) as f:
+        document = json.load(f)
+    if "Resources" in document:
+        # Alarm ARNs resolve to ${LogicalId.Arn}; spell them out as dashboard_generator does
+        arns = {
+            "${" + logical_id + ".Arn}": alarm_arn(
+                resource["Properties"].get("AlarmName") or resource["Properties"].get("CompositeAlarmName") or logical_id
+            )
+            for logical_id, resource in document["Resources"].items()
+            if resource["Type"] in ("AWS::CloudWatch::Alarm", "AWS::CloudWatch::CompositeAlarm")
+        }
+        bodies = {}
+        for resource in document["Resources"].values():
+            if resource["Type"] != "AWS::CloudWatch::Dashboard":
+                continue
+            body = json.dumps(resolve_dashboard_body(resource["Properties"]["DashboardBody"]))
+            for placeholder, arn in arns.items():
+                body = body.replace(placeholder, arn)
+            bodies[resource["Properties"]["DashboardName"]] = json.loads(body)
+        return bodies
+    if "widgets" in document:
+        return {os.path.splitext(os.path.basename(path))[0]: document}
+    return document
+
+
+def _widget_title(widget: Dict[str, Any]) -> str:
+    properties = widget.get("properties", {})
+    if widget.get("type") == "text":
+        return properties.get("markdown", "").splitlines()[0] if properties.get("markdown") else "<text>"
+    return properties.get("title", f"<untitled {widget.get('type')}>")
+
+
+def named_widgets(body: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Widgets of a body keyed by ``section / [graph /] title``, in dashboard order."""
+    named: Dict[str, Dict[str, Any]] = {}
+    section, group = "", ""
+    for widget in body.get("widgets", []):
+        title = _widget_title(widget)
+        if widget.get("type") == "text" and title.startswith("# "):
+            section, group = title[2:], ""
+            name = f"{section} (header)"
+        elif widget.get("width", 0) < GRID_WIDTH and group and widget.get("type") == "metric":
+            name = f"{section} / {group} / {title}"
+        else:
+            is_graph = widget.get("type") == "metric" and widget.get("properties", {}).get("view") != "singleValue"
+            group = title if is_graph and widget.get("width") == GRID_WIDTH else ""
+            name = f"{section} / {title}" if section else title
+        unique, index = name, 2
+        while unique in named:
+            unique, index = f"{name} #{index}", index + 1
+        named[unique] = widget
+    return named
+
+
+def _format(value: Any) -> str:
+    return "(unset)" if value is None else json.dumps(value, sort_keys=True)
+
+
+def _metric_changes(old: List[List[Any]], new: List[List[Any]]) -> List[str]:
+    def by_expression(rows: List[List[Any]]) -> Dict[str, Dict[str, Any]]:
+        return {
+            row[-1]["expression"]: row[-1]
+            for row in rows
+            if row and isinstance(row[-1], dict) and "expression" in row[-1]
+        }
+
+    before, after = by_expression(old), by_expression(new)
+    changes = [f"+ {expression}" for expression in after if expression not in before]
+    changes += [f"- {expression}" for expression in before if expression not in after]
+    for expression in after:
+        if expression not in before:
+            continue
+        old_options, new_options = before[expression], after[expression]
+        for key in sorted(old_options.keys() | new_options.keys()):
+            if old_options.get(key) != new_options.get(key):
+                changes.append(f"{expression}: {key} {_format(old_options.get(key))} -> {_format(new_options.get(key))}")
+    if not changes and old != new:
+        changes.append("series reordered")
+    return changes
+
+
+def widget_changes(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """Human-readable differences between two versions of one widget, ignoring its position."""
+    changes = []
+    for key in ("type", "width", "height"):
+        if old.get(key) != new.get(key):
+            changes.append(f"{key} {old.get(key)} -> {new.get(key)}")
+    old_properties, new_properties = old.get("properties", {}), new.get("properties", {})
+    for key in sorted(old_properties.keys() | new_properties.keys()):
+        if old_properties.get(key) == new_properties.get(key):
+            continue
+        if key == "metrics":
+            metric_changes = _metric_changes(old_properties.get(key, []), new_properties.get(key, []))
+            changes += [f"metrics: {change}" for change in metric_changes]
+        else:
+            changes.append(f"{key}: {_format(old_properties.get(key))} -> {_format(new_properties.get(key))}")
+    return changes
+
+
+def load_stats(body: Dict[str, Any], account_ids: Sequence[str], instances_per_account: int) -> LoadStats:
+    stats = query_stats(body)
+    metrics = sum(
+        scanned_metrics(expression, account_ids, lambda account_id: instances_per_account)
+        for widget in body.get("widgets", [])
+        if widget.get("type") == "metric"
+        for expression in metric_expressions(widget)
+    )
+    return LoadStats(
+        search_expressions=stats.search_expressions,
+        insights_queries=stats.insights_queries,
+        get_metric_data_requests=stats.get_metric_data_requests,
+        metrics=metrics,
+    )
+
+
+def diff_dashboards(
+    old: Dict[str, Dict[str, Any]],
+    new: Dict[str, Dict[str, Any]],
+    account_ids: Sequence[str],
+    instances_per_account: int = DEFAULT_EXPECTED_INSTANCES_PER_ACCOUNT,
+) -> List[DashboardDiff]:
+    """Compare two ``{name: body}`` maps dashboard by dashboard."""
+    diffs = []
+    for name in dict.fromkeys([*old, *new]):
+        old_widgets = named_widgets(old[name]) if name in old else {}
+        new_widgets = named_widgets(new[name]) if name in new else {}
+        diff = DashboardDiff(
+            name=name,
+            added=[title for title in new_widgets if title not in old_widgets],
+            removed=[title for title in old_widgets if title not in new_widgets],
+            old=load_stats(old[name], account_ids, instances_per_account) if name in old else None,
+            new=load_stats(new[name], account_ids, instances_per_account) if name in new else None,
+        )
+        for title, widget in new_widgets.items():
+            changes = widget_changes(old_widgets[title], widget) if title in old_widgets else []
+            if changes:
+                diff.changed[title] = changes
+        diffs.append(diff)
+    return diffs
+
+
+def _delta(label: str, old: Optional[LoadStats], new: Optional[LoadStats], attribute: str, fmt: str = "d") -> str:
+    before = getattr(old, attribute) if old else 0
+    after = getattr(new, attribute) if new else 0
+    return f"{label} {before:{fmt}} -> {after:{fmt}} ({after - before:+{fmt}})"
+
+
+def print_report(diffs: List[DashboardDiff]) -> None:
+    for diff in diffs:
+        state = " (added)" if diff.old is None else " (removed)" if diff.new is None else ""
+        print(f"{diff.name}{state}")
+        if diff.unchanged:
+            print("  no changes")
+            continue
+        for title in diff.added:
+            print(f"  + {title}")
+        for title in diff.removed:
+            print(f"  - {title}")
+        for title, changes in diff.changed.items():
+            print(f"  ~ {title}")
+            for change in changes:
+                print(f"      {change}")
+        print("  " + _delta("SEARCH", diff.old, diff.new, "search_expressions"))
+        print("  " + _delta("Metrics Insights", diff.old, diff.new, "insights_queries"))
+        print("  " + _delta("GetMetricData requests", diff.old, diff.new, "get_metric_data_requests"))
+        print("  " + _delta("metrics per refresh", diff.old, diff.new, "metrics"))
+        print("  " + _delta("est. cost per refresh $", diff.old, diff.new, "estimated_cost_usd", ".5f"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("old", help="template, dashboard body or {name: body} file")
+    parser.add_argument("new", nargs="?", help="same formats (default: render the current tree)")
+    parser.add_argument("--registry", help="account registry used to scope the cost estimate (default: accounts.json)")
+    parser.add_argument("--instances-per-account", type=int, default=DEFAULT_EXPECTED_INSTANCES_PER_ACCOUNT)
+    parser.add_argument(
+        "--max-cost-increase", type=float, metavar="USD",
+        help="exit 1 if the estimated cost per refresh of all dashboards rises by more than USD",
+    )
+    parser.add_argument("--json", action="store_true", help="print the diff as JSON")
+    args = parser.parse_args()
+
+    from account_registry import DEFAULT_REGISTRY_PATH, load_accounts
+
+    accounts = load_accounts(args.registry or DEFAULT_REGISTRY_PATH)
+    old = load_bodies(args.old)
+    new = load_bodies(args.new) if args.new else render_dashboards(accounts)
+    diffs = diff_dashboards(old, new, list(accounts.values()), args.instances_per_account)
+    # Rounded so float noise never fails --max-cost-increase 0
+    cost_delta = round(sum(diff.cost_delta_usd for diff in diffs), 9) + 0.0
+
+    if args.json:
+        print(json.dumps(
+            [dict(asdict(diff), cost_delta_usd=diff.cost_delta_usd) for diff in diffs],
+            indent=1,
+        ))
+    else:
+        print_report(diffs)
+        print(f"Estimated cost per refresh changes by ${cost_delta:+.5f}")
+
+    if args.max_cost_increase is not None and cost_delta > args.max_cost_increase:
+        print(
+            f"Estimated cost per refresh rises by ${cost_delta:.5f}, more than ${args.max_cost_increase:.5f}",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""Whole dashboards from the catalog, without ``aws_cdk``.
+
+Plans and renders the same dashboards ``RdsDashboardStack`` deploys - the
+resolution pair, shards behind an index dashboard, the alarm status row -
+as plain ``DashboardBody`` documents. The stack wraps each one in a
+``CfnDashboard``; previewers, linters and diff tools call
+``render_dashboards`` directly and get the JSON in milliseconds, with no
+jsii/Node process.
+
+Only the quota budget is left to the stack: splitting an oversized
+dashboard per section and failing the synth both happen at synth time.
+Alarm ARNs are CDK tokens in the stack; here they are built from the alarm
+names ``dashboard_alarms`` gives the composite alarms.
+
+    python dashboard_generator.py > body.json
+    python dashboard_generator.py --shard-by account --top-n 10 --bands AVG,MAX
+"""
+import argparse
+import json
+import sys
+import time
+from dataclasses import replace
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from account_registry import environment_slug
+from dashboard_body import HOME_REGION, PERIOD_OVERRIDE_INHERIT, DashboardBody, alarm_status_widget
+from dashboard_shards import SHARD_BY_REGION, SHARD_MODES, plan_shards
+from dashboard_widgets import (
+    AUTO_PERIOD,
+    FIXED_PERIOD,
+    LAYOUTS,
+    LIVE_ROW_START,
+    PER_ACCOUNT_LAYOUT,
+    PERIOD_POLICIES,
+    RANGE_SCALED_PERIOD,
+    STATISTICS_VIEWS,
+    RenderOptions,
+    add_catalog_widgets,
+    catalog_sections,
+    index_widget,
+)
+from metric_catalog import ALARMS, METRICS, SECTIONS, AlarmDefinition, MetricDefinition, Section
+from query_backends import BACKENDS, SEARCH_BACKEND
+
+DASHBOARD_NAME = "RDS-All-Environments"
+
+# View name, render options and dashboard-level properties
+View = Tuple[str, RenderOptions, Dict[str, Any]]
+
+
+def dashboard_views(
+    dashboard_name: str, layout: str, period_policy: str, resolution_pair: bool, series_options: Dict[str, Any]
+) -> List[View]:
+    """The dashboard, or its low-res/high-res pair."""
+    if not resolution_pair:
+        options = RenderOptions(layout=layout, period_policy=period_policy, **series_options)
+        # Range-scaled periods only fit the range they were scaled for
+        body_props = _range_props(options) if period_policy == RANGE_SCALED_PERIOD else {}
+        return [(dashboard_name, options, body_props)]
+
+    # Low-res view: range-scaled periods over a week, no 1-minute row
+    low_res = RenderOptions(layout=layout, period_policy=RANGE_SCALED_PERIOD, live_row=False, **series_options)
+    # High-res view: 1-minute periods over the last 3 hours
+    high_res = RenderOptions(
+        layout=layout, period_policy=FIXED_PERIOD, time_range_seconds=3 * 3600, live_row=False, **series_options
+    )
+    return [
+        (dashboard_name, low_res, _range_props(low_res)),
+        (
+            f"{dashboard_name}-HighRes",
+            high_res,
+            {"start": LIVE_ROW_START, "period_override": PERIOD_OVERRIDE_INHERIT},
+        ),
+    ]
+
+
+def _range_props(options: RenderOptions) -> Dict[str, Any]:
+    """Dashboard properties opening it on ``options.time_range_seconds`` with the widgets' own periods."""
+    return {"start": f"-PT{options.time_range_seconds // 3600}H", "period_override": PERIOD_OVERRIDE_INHERIT}
+
+
+def _add_alarm_status(dashboard: DashboardBody, accounts: Dict[str, str], alarm_arns: Mapping[str, str]) -> None:
+    """Status row of the composite alarms of the environments ``dashboard`` shows."""
+    arns = [alarm_arns[environment] for environment in accounts if environment in alarm_arns]
+    if arns:
+        dashboard.add_widgets(alarm_status_widget(arns))
+
+
+def render_dashboard(
+    options: RenderOptions,
+    accounts: Dict[str, str],
+    sections: Tuple[Section, ...] = SECTIONS,
+    metrics: Tuple[MetricDefinition, ...] = METRICS,
+    alarm_arns: Optional[Mapping[str, str]] = None,
+    **body_props,
+) -> DashboardBody:
+    """One dashboard: the alarm status row, then every catalog section."""
+    dashboard = DashboardBody(**body_props)
+    _add_alarm_status(dashboard, accounts, alarm_arns or {})
+    add_catalog_widgets(dashboard, accounts, options, sections=sections, metrics=metrics)
+    return dashboard
+
+
+def render_shards(
+    dashboard_name: str,
+    options: RenderOptions,
+    shard_by: str,
+    accounts: Dict[str, str],
+    metrics: Tuple[MetricDefinition, ...] = METRICS,
+    instance_prefixes: Sequence[str] = (),
+    regions: Sequence[str] = (),
+    alarm_arns: Optional[Mapping[str, str]] = None,
+    **body_props,
+) -> Dict[str, DashboardBody]:
+    """Shard dashboards by name, then the index dashboard named ``dashboard_name``."""
+    dashboards, links = {}, []
+    for shard in plan_shards(shard_by, accounts, catalog_sections(options), instance_prefixes, regions):
+        shard_name = f"{dashboard_name}-{shard.suffix}"
+        shard_options = replace(
+            options,
+            live_row=options.live_row and shard.live_row,
+            comparison_account_ids=shard.comparison_account_ids,
+            instance_token=shard.instance_token,
+            region=shard.region or options.region,
+        )
+        dashboards[shard_name] = render_dashboard(
+            shard_options, shard.accounts, shard.sections, metrics, alarm_arns, **body_props
+        )
+        links.append((shard.title, shard_name))
+
+    index = DashboardBody()
+    _add_alarm_status(index, accounts, alarm_arns or {})
+    index.add_widgets(index_widget(f"{dashboard_name} dashboards", links))
+    dashboards[dashboard_name] = index
+    return dashboards
+
+
+def alarm_arn(alarm_name: str, region: str = HOME_REGION, account: str = "${AWS::AccountId}") -> str:
+    return f"arn:aws:cloudwatch:{region}:{account}:alarm:{alarm_name}"
+
+
+def composite_alarm_arns(
+    dashboard_name: str,
+    accounts: Dict[str, str],
+    metrics: Tuple[MetricDefinition, ...] = METRICS,
+    alarms: Sequence[AlarmDefinition] = ALARMS,
+    region: str = HOME_REGION,
+    account: str = "${AWS::AccountId}",
+) -> Dict[str, str]:
+    """ARN of every environment's composite alarm, as ``dashboard_alarms`` names them."""
+    metric_names = {metric.metric_name for metric in metrics}
+    if not any(alarm.metric_name in metric_names for alarm in alarms):
+        return {}
+    return {
+        environment: alarm_arn(f"{dashboard_name}-{environment_slug(environment)}", region, account)
+        for environment in accounts
+    }
+
+
+def render_dashboards(
+    accounts: Dict[str, str],
+    dashboard_name: str = DASHBOARD_NAME,
+    layout: str = PER_ACCOUNT_LAYOUT,
+    period_policy: str = AUTO_PERIOD,
+    resolution_pair: bool = False,
+    shard_by: Optional[str] = None,
+    instance_prefixes: Sequence[str] = (),
+    regions: Sequence[str] = (),
+    metrics: Tuple[MetricDefinition, ...] = METRICS,
+    alarm_arns: Optional[Mapping[str, str]] = None,
+    **series_options,
+) -> Dict[str, Dict[str, Any]]:
+    """Every dashboard body the stack would deploy, by dashboard name.
+
+    ``series_options`` are the remaining ``RenderOptions`` fields (``top_n``,
+    ``backend``, ...). ``alarm_arns`` maps environment to composite alarm
+    ARN and defaults to ``composite_alarm_arns``; pass ``{}`` for no alarms.
+    """
+    if alarm_arns is None:
+        alarm_arns = composite_alarm_arns(dashboard_name, accounts, metrics)
+    if len(regions) > 1:
+        if shard_by not in (None, SHARD_BY_REGION):
+            raise ValueError(f"Multiple regions cannot be combined with sharding by {shard_by}")
+        shard_by = SHARD_BY_REGION
+    elif regions:
+        series_options["region"] = regions[0]
+
+    bodies = {}
+    views = dashboard_views(dashboard_name, layout, period_policy, resolution_pair, series_options)
+    for name, options, body_props in views:
+        if shard_by:
+            dashboards = render_shards(
+                name, options, shard_by, accounts, metrics, instance_prefixes, regions, alarm_arns, **body_props
+            )
+        else:
+            dashboards = {name: render_dashboard(options, accounts, SECTIONS, metrics, alarm_arns, **body_props)}
+        bodies.update((dashboard, body.to_json()) for dashboard, body in dashboards.items())
+    return bodies
+
+
+def _list(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registry", help="account registry (default: accounts.json)")
+    parser.add_argument("--name", default=DASHBOARD_NAME)
+    parser.add_argument("--layout", choices=LAYOUTS, default=PER_ACCOUNT_LAYOUT)
+    parser.add_argument("--period-policy", choices=PERIOD_POLICIES, default=AUTO_PERIOD)
+    parser.add_argument("--resolution-pair", action="store_true")
+    parser.add_argument("--shard-by", choices=SHARD_MODES)
+    parser.add_argument("--prefixes", help="comma-separated instance identifier prefixes")
+    parser.add_argument("--regions", help="comma-separated regions owning the data")
+    parser.add_argument("--top-n", type=int)
+    parser.add_argument("--bands", help="comma-separated band functions, e.g. AVG,MAX")
+    parser.add_argument("--backend", choices=BACKENDS, default=SEARCH_BACKEND)
+    parser.add_argument("--section-backend", action="append", default=[], metavar="SECTION=BACKEND")
+    parser.add_argument("--statistics-view", choices=STATISTICS_VIEWS)
+    parser.add_argument("--anomaly-bands", type=int, default=0, help="anomaly detection bands per comparison graph")
+    parser.add_argument("--log-groups", help="JSON file mapping environment to the log groups of the log tables")
+    parser.add_argument("--vcpus", help="comma-separated ENVIRONMENT=COUNT vCPUs for DB Load per vCPU")
+    parser.add_argument("--derived-metrics", action="store_true", help="add the derived efficiency metric section")
+    parser.add_argument("--forecast-days", type=float, help="horizon of the instances-under-N-days capacity count")
+    parser.add_argument("--rollups", action="store_true", help="comparison graphs read the metric stream rollups")
+    parser.add_argument("--no-alarms", action="store_true", help="leave out the alarm status rows")
+    parser.add_argument("--output", help="file to write (default: stdout)")
+    args = parser.parse_args()
+
+    from account_registry import DEFAULT_REGISTRY_PATH, load_accounts
+
+    start = time.perf_counter()
+    series_options: Dict[str, Any] = {
+        "top_n": args.top_n,
+        "bands": tuple(band.upper() for band in _list(args.bands)),
+        "backend": args.backend,
+        "section_backends": dict(pair.split("=", 1) for pair in args.section_backend),
+        "anomaly_bands": args.anomaly_bands,
+        "rollups": args.rollups,
+        "forecast_days": args.forecast_days,
+        "derived_metrics": args.derived_metrics,
+        "account_constants": {"vcpus": {
+            environment: float(count) for environment, count in (pair.split("=", 1) for pair in _list(args.vcpus))
+        }},
+    }
+    if args.log_groups:
+        with open(args.log_groups) as f:
+            series_options["log_groups"] = {environment: tuple(names) for environment, names in json.load(f).items()}
+    if args.statistics_view:
+        series_options["statistics_view"] = args.statistics_view
+    bodies = render_dashboards(
+        load_accounts(args.registry or DEFAULT_REGISTRY_PATH),
+        dashboard_name=args.name,
+        layout=args.layout,
+        period_policy=args.period_policy,
+        resolution_pair=args.resolution_pair,
+        shard_by=args.shard_by,
+        instance_prefixes=_list(args.prefixes),
+        regions=_list(args.regions),
+        alarm_arns={} if args.no_alarms else None,
+        **series_options,
+    )
+    elapsed = time.perf_counter() - start
+
+    rendered = json.dumps(bodies, indent=1)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(rendered + "\n")
+    else:
+        print(rendered)
+    print(f"Rendered {len(bodies)} dashboard(s) in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Split the fleet dashboard into several smaller, linked dashboards.
+
+Once an account runs more than ~100 RDS instances a single SEARCH truncates
+at its result cap, and one dashboard holding every section gets slow to
+load. A shard renders a subset of the dashboard and scopes every SEARCH to
+that subset, so it only loads the series it shows:
+
+* ``account`` - one shard per environment in the account map.
+* ``section`` - one shard per catalog section.
+* ``prefix`` - one shard per DB instance identifier token, e.g. ``orders``
+  for ``orders-db-1``.
+* ``region`` - one shard per region, with every graph querying the region
+  that owns the data instead of the dashboard's home region.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from account_registry import environment_slug
+from metric_catalog import SECTIONS, Section
+
+SHARD_BY_ACCOUNT = "account"
+SHARD_BY_SECTION = "section"
+SHARD_BY_PREFIX = "prefix"
+SHARD_BY_REGION = "region"
+SHARD_MODES = (SHARD_BY_ACCOUNT, SHARD_BY_SECTION, SHARD_BY_PREFIX, SHARD_BY_REGION)
+
+# Characters CloudWatch allows in a dashboard name
+DASHBOARD_NAME_SUFFIX = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+@dataclass(frozen=True)
+class Shard:
+    """The part of the fleet dashboard one shard renders."""
+
+    suffix: str
+    title: str
+    accounts: Dict[str, str]
+    sections: Tuple[Section, ...]
+    comparison_account_ids: Tuple[str, ...] = ()
+    instance_token: Optional[str] = None
+    region: Optional[str] = None
+    live_row: bool = True
+
+
+def plan_shards(
+    shard_by: str,
+    accounts: Dict[str, str],
+    sections: Tuple[Section, ...] = SECTIONS,
+    instance_prefixes: Sequence[str] = (),
+    regions: Sequence[str] = (),
+) -> List[Shard]:
+    """Return the shards for ``shard_by``, in dashboard order."""
+    if shard_by == SHARD_BY_ACCOUNT:
+        return [
+            Shard(
+                suffix=environment_slug(environment),
+                title=environment,
+                accounts={environment: account_id},
+                sections=sections,
+                comparison_account_ids=(account_id,),
+            )
+            for environment, account_id in accounts.items()
+        ]
+    if shard_by == SHARD_BY_SECTION:
+        # The live row spans every section, so it stays on the first shard only
+        return [
+            Shard(
+                suffix=section.key.replace("_", "-"),
+                title=section.title,
+                accounts=accounts,
+                sections=(section,),
+                live_row=index == 0,
+            )
+            for index, section in enumerate(sections)
+        ]
+    if shard_by == SHARD_BY_PREFIX:
+        if not instance_prefixes:
+            raise ValueError("Sharding by prefix needs at least one instance identifier prefix")
+        for prefix in instance_prefixes:
+            if not DASHBOARD_NAME_SUFFIX.match(prefix):
+                raise ValueError(
+                    f"Instance prefix {prefix!r} names a dashboard, so it may only contain letters, digits, '-' and '_'"
+                )
+        return [
+            Shard(
+                suffix=prefix,
+                title=f"Instances matching '{prefix}'",
+                accounts=accounts,
+                sections=sections,
+                instance_token=prefix,
+            )
+            for prefix in instance_prefixes
+        ]
+    if shard_by == SHARD_BY_REGION:
+        if not regions:
+            raise ValueError("Sharding by region needs at least one region")
+        return [
+            Shard(suffix=region, title=region, accounts=accounts, sections=sections, region=region)
+            for region in regions
+        ]
+    raise ValueError(f"Unknown shard mode {shard_by!r}, expected one of {SHARD_MODES}")
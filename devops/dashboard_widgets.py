@@ -0,0 +1,701 @@
+"""Widget generator that turns the metric catalog into a dashboard grid.
+
+Each catalog section renders as a 24-wide markdown header, then for every
+metric one 24-wide "Environment Comparison" graph followed by rows of
+per-account detail graphs. Layouts, period policies, top-N panels, query
+backends and the optional panels are chosen with ``RenderOptions``.
+
+Widgets are plain dicts from ``dashboard_body``, so nothing here needs
+``aws_cdk``; ``dashboard_generator`` assembles them into whole dashboards.
+"""
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dashboard_body import (
+    GRID_WIDTH,
+    HOME_REGION,
+    LEGEND_BOTTOM,
+    LEGEND_RIGHT,
+    DashboardBody,
+    Expression,
+    Widget,
+    graph_widget,
+    log_widget,
+    single_value_widget,
+    text_widget,
+)
+from metric_catalog import (
+    CAPACITY_FORECAST,
+    DERIVED,
+    DERIVED_METRICS,
+    FORECASTS,
+    LOG_QUERIES,
+    METRICS,
+    SECTIONS,
+    DerivedInput,
+    DerivedMetric,
+    ForecastDefinition,
+    LogQueryDefinition,
+    MetricDefinition,
+    Section,
+    metrics_by_section,
+)
+from query_backends import (
+    SEARCH_BACKEND,
+    QueryBackend,
+    get_backend,
+    identifier_dimension,
+    rollup_expression,
+    rollup_name,
+    search_expression,
+)
+
+PER_ACCOUNT_LAYOUT = "per-account"
+SHARED_QUERY_LAYOUT = "shared-query"
+LAYOUTS = (PER_ACCOUNT_LAYOUT, SHARED_QUERY_LAYOUT)
+
+AUTO_PERIOD = "auto"
+RANGE_SCALED_PERIOD = "range-scaled"
+FIXED_PERIOD = "fixed"
+PERIOD_POLICIES = (AUTO_PERIOD, RANGE_SCALED_PERIOD, FIXED_PERIOD)
+
+# Periods CloudWatch offers in the console period picker
+STANDARD_PERIODS_SECONDS = (60, 300, 900, 3600, 21600, 86400)
+MAX_DATAPOINTS_PER_SERIES = 500
+
+BAND_FUNCTIONS = ("AVG", "MAX", "MIN")
+
+PRIMARY_STATISTIC = "primary"
+SERIES_STATISTICS = "series"
+WORST_STATISTICS = "worst"
+STATISTICS_VIEWS = (PRIMARY_STATISTIC, SERIES_STATISTICS, WORST_STATISTICS)
+
+# Narrowest detail panel is 6 columns, i.e. at most 4 panels per row
+MAX_PANELS_PER_ROW = 4
+
+# Logs Insights queries at most 50 log groups; tables need more width than graphs
+MAX_LOG_GROUPS_PER_QUERY = 50
+MAX_LOG_PANELS_PER_ROW = 2
+
+# Width of the expected range in standard deviations
+ANOMALY_BAND_STDDEVS = 2
+
+LIVE_ROW_TITLE = "Live (1-minute, last 3 hours)"
+LIVE_ROW_START = "-PT3H"
+
+FORECAST_START = "-P7D"
+FORECAST_TOP_N = 10
+FORECAST_UNIT_LABEL = "Days"
+SECONDS_PER_DAY = 86400
+
+
+@dataclass(frozen=True)
+class RenderOptions:
+    """How the catalog is turned into widgets."""
+
+    layout: str = PER_ACCOUNT_LAYOUT
+    period_policy: str = AUTO_PERIOD
+    time_range_seconds: int = 7 * 24 * 3600
+    live_row: bool = True
+    # Shard scoping: accounts the comparison graphs cover (empty = whole fleet)
+    # and an instance identifier token every SEARCH is restricted to
+    comparison_account_ids: Tuple[str, ...] = ()
+    instance_token: Optional[str] = None
+    # Region every graph queries; None means the dashboard's own region
+    region: Optional[str] = None
+    # Plot only the N hottest instances per detail panel, plus optional bands
+    top_n: Optional[int] = None
+    bands: Tuple[str, ...] = ()
+    # Query backend for the dashboard, overridable per section key
+    backend: str = SEARCH_BACKEND
+    section_backends: Dict[str, str] = field(default_factory=dict)
+    # How a metric's extra statistics are drawn on its comparison graph; each one
+    # costs one more query per graph, so by default only the primary statistic is
+    statistics_view: str = PRIMARY_STATISTIC
+    # At most this many per-account anomaly detection bands per comparison graph
+    anomaly_bands: int = 0
+    # Values of derived metric constants by constant name, then environment
+    account_constants: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    # Log groups the Logs Insights tables read, by environment
+    log_groups: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    # Comparison graphs read the metric stream rollups where one exists
+    rollups: bool = False
+    # Horizon of the "instances under N days" count; None keeps each forecast's own
+    forecast_days: Optional[float] = None
+    # Derived metric section; costs one SEARCH per derived input per account
+    derived_metrics: bool = False
+
+    def __post_init__(self) -> None:
+        if self.layout not in LAYOUTS:
+            raise ValueError(f"Unknown dashboard layout {self.layout!r}, expected one of {LAYOUTS}")
+        if self.period_policy not in PERIOD_POLICIES:
+            raise ValueError(f"Unknown period policy {self.period_policy!r}, expected one of {PERIOD_POLICIES}")
+        if self.top_n is not None and self.top_n < 1:
+            raise ValueError(f"top_n must be positive, got {self.top_n}")
+        unknown_bands = set(self.bands) - set(BAND_FUNCTIONS)
+        if unknown_bands:
+            raise ValueError(f"Unknown band functions {sorted(unknown_bands)}, expected some of {BAND_FUNCTIONS}")
+        if self.bands and self.top_n is None:
+            raise ValueError("Bands are only rendered together with top_n")
+        if self.statistics_view not in STATISTICS_VIEWS:
+            raise ValueError(f"Unknown statistics view {self.statistics_view!r}, expected one of {STATISTICS_VIEWS}")
+        if self.anomaly_bands < 0:
+            raise ValueError(f"anomaly_bands cannot be negative, got {self.anomaly_bands}")
+        if self.forecast_days is not None and self.forecast_days <= 0:
+            raise ValueError(f"forecast_days must be positive, got {self.forecast_days}")
+        # Constants divide derived metrics, e.g. DB Load by vCPUs
+        for constant, values in self.account_constants.items():
+            for environment, value in values.items():
+                if value <= 0:
+                    raise ValueError(f"{constant} of {environment} must be positive, got {value:g}")
+        for backend in (self.backend, *self.section_backends.values()):
+            get_backend(backend)
+
+    def backend_for(self, metric: MetricDefinition) -> QueryBackend:
+        """Backend of ``metric``'s section; SEARCH where it cannot cover the range the view opens on.
+
+        Metrics Insights only queries the last 3 hours, so on a range-scaled
+        week-long view its graphs would be mostly empty.
+        """
+        backend = get_backend(self.section_backends.get(metric.section, self.backend))
+        if (
+            backend.max_range_seconds is not None
+            and self.period_policy == RANGE_SCALED_PERIOD
+            and self.time_range_seconds > backend.max_range_seconds
+        ):
+            return get_backend(SEARCH_BACKEND)
+        return backend
+
+
+def scaled_period_seconds(time_range_seconds: float, max_datapoints: int = MAX_DATAPOINTS_PER_SERIES) -> int:
+    """Smallest standard period keeping a series under ``max_datapoints``."""
+    for period in STANDARD_PERIODS_SECONDS:
+        if time_range_seconds / period <= max_datapoints:
+            return period
+    return STANDARD_PERIODS_SECONDS[-1]
+
+
+def expression_period(metric: MetricDefinition, options: RenderOptions) -> Optional[int]:
+    """Period in seconds for a metric under the configured policy; ``None`` means auto.
+
+    ``auto`` leaves the period to CloudWatch, which scales it with the range
+    the dashboard is opened at; ``range-scaled`` keeps every series under
+    ``MAX_DATAPOINTS_PER_SERIES`` over ``options.time_range_seconds``;
+    ``fixed`` uses the metric's own ``period_seconds``.
+    """
+    if options.period_policy == FIXED_PERIOD:
+        return metric.period_seconds
+    if options.period_policy == RANGE_SCALED_PERIOD:
+        return scaled_period_seconds(options.time_range_seconds)
+    return None
+
+
+def comparison_expression(metric: MetricDefinition, options: RenderOptions, statistic: Optional[str] = None) -> str:
+    """Per-account aggregate query, scoped to the shard being rendered.
+
+    With ``options.rollups`` it reads the per-account series
+    ``metric_stream_aggregator`` publishes instead of a ``GROUP BY`` over
+    every instance; statistics without a rollup, cluster-level metrics and
+    shards scoped to an instance token keep querying the instances.
+    Statistics the backend cannot compute, such as percentiles on Metrics
+    Insights, fall back to SEARCH.
+    """
+    rollup = rollup_name(metric, statistic) if options.rollups and not options.instance_token else None
+    if rollup:
+        return rollup_expression(metric, rollup, options.comparison_account_ids)
+    backend = options.backend_for(metric)
+    if statistic and not backend.supports(statistic):
+        backend = get_backend(SEARCH_BACKEND)
+    return backend.per_account(metric, options.comparison_account_ids, options.instance_token, statistic)
+
+
+def _expression(
+    expression: str,
+    period: Optional[int],
+    label: str = "",
+    using_metrics: Optional[Dict[str, Expression]] = None,
+) -> Expression:
+    return Expression(expression=expression, label=label, period_seconds=period, using_metrics=using_metrics or {})
+
+
+def _graph(
+    metric: MetricDefinition,
+    options: RenderOptions,
+    title: str,
+    left: List[Expression],
+    width: int,
+    legend_position: str,
+    **widget_props,
+) -> Widget:
+    return graph_widget(
+        title,
+        left,
+        width,
+        6,
+        metric.unit_label,
+        legend_position,
+        region=options.region or HOME_REGION,
+        **widget_props,
+    )
+
+
+def detail_series(
+    metric: MetricDefinition, account_ids: Sequence[str], options: RenderOptions
+) -> List[Expression]:
+    """Series of a detail panel: every instance, or the worst N and any bands.
+
+    SEARCH results are wrapped in ``SORT(..., MAX, DESC, N)`` (``MIN, ASC``
+    for headroom metrics) and referenced by id, so each panel still issues
+    one query. Backends with a server-side limit order and limit the query
+    itself, so their bands only cover the N instances returned.
+    """
+    period = expression_period(metric, options)
+    backend = options.backend_for(metric)
+    if options.top_n is None:
+        return [_expression(backend.instances(metric, account_ids, options.instance_token), period)]
+
+    if backend.server_side_limit:
+        query = backend.instances(metric, account_ids, options.instance_token, top_n=options.top_n)
+        if not options.bands:
+            return [_expression(query, period)]
+        instances = {"instances": _expression(query, period)}
+        series: List[Expression] = [_expression("instances", period, using_metrics=instances)]
+        # The query only returns the worst N, so that is all the bands summarize
+        band_label = f"Top {options.top_n} instances"
+    else:
+        instances = {"instances": _expression(backend.instances(metric, account_ids, options.instance_token), period)}
+        order = "MAX, DESC" if metric.higher_is_worse else "MIN, ASC"
+        series = [_expression(f"SORT(instances, {order}, {options.top_n})", period, using_metrics=instances)]
+        band_label = "All instances"
+
+    for function in options.bands:
+        series.append(
+            _expression(
+                f"{function}(instances)", period, label=f"{band_label} ({function.lower()})", using_metrics=instances
+            )
+        )
+    return series
+
+
+def section_header(title: str) -> Widget:
+    """Full-width markdown header that opens a section."""
+    return text_widget(f"# {title}", GRID_WIDTH, 1)
+
+
+def comparison_series(metric: MetricDefinition, options: RenderOptions) -> List[Expression]:
+    """Per-account series of the metric's statistic, plus its extra statistics.
+
+    Every statistic is a single query over all accounts, so extra statistics
+    cost one query each however many accounts are compared, which is why the
+    detail panels never show them. ``options.statistics_view`` draws them as
+    per-account series, as one worst-environment line per statistic, or not
+    at all.
+    """
+    period = expression_period(metric, options)
+    if not metric.extra_statistics or options.statistics_view == PRIMARY_STATISTIC:
+        return [_expression(comparison_expression(metric, options), period)]
+
+    series: List[Expression] = []
+    for statistic in (metric.statistic, *metric.extra_statistics):
+        query = comparison_expression(metric, options, statistic)
+        if options.statistics_view == SERIES_STATISTICS:
+            series.append(_expression(query, period, label=f"{statistic} ${{LABEL}}"))
+            continue
+        query_id = re.sub(r"\W", "_", statistic.lower())
+        worst = "MAX" if metric.higher_is_worse else "MIN"
+        series.append(
+            _expression(
+                f"{worst}({query_id})",
+                period,
+                label=f"{statistic} (worst environment)",
+                using_metrics={query_id: _expression(query, period)},
+            )
+        )
+    return series
+
+
+def anomaly_band_series(
+    metric: MetricDefinition, accounts: Dict[str, str], options: RenderOptions
+) -> List[Expression]:
+    """Expected-range band of the first ``options.anomaly_bands`` accounts.
+
+    Each band models one more per-account series, i.e. one more query and
+    anomaly detection model, so accounts beyond the limit get none.
+    """
+    if not metric.anomaly_band:
+        return []
+    period = expression_period(metric, options)
+    backend = options.backend_for(metric)
+    series = []
+    for index, (environment, account_id) in enumerate(list(accounts.items())[: options.anomaly_bands]):
+        # The band needs a single series, so it models the account aggregate
+        input_id = f"account_{index}"
+        account_series = _expression(backend.account_series(metric, account_id, options.instance_token), period)
+        series.append(
+            _expression(
+                f"ANOMALY_DETECTION_BAND({input_id}, {ANOMALY_BAND_STDDEVS})",
+                period,
+                label=f"{environment} expected range",
+                using_metrics={input_id: account_series},
+            )
+        )
+    return series
+
+
+def comparison_widget(metric: MetricDefinition, accounts: Dict[str, str], options: RenderOptions) -> Widget:
+    """24-wide graph with one series per account, plus any anomaly detection bands."""
+    return _graph(
+        metric,
+        options,
+        f"{metric.title} - Environment Comparison",
+        comparison_series(metric, options) + anomaly_band_series(metric, accounts, options),
+        GRID_WIDTH,
+        LEGEND_RIGHT,
+    )
+
+
+def pack_rows(count: int, max_per_row: int = MAX_PANELS_PER_ROW) -> Tuple[int, int]:
+    """Return (panels per row, panel width) for ``count`` panels on the 24-column grid.
+
+    Rows are balanced, so 5 accounts render as rows of 3 and 2 rather than
+    4 and 1, and every panel in the group keeps the same width.
+    """
+    rows = -(-count // max_per_row)
+    per_row = -(-count // rows)
+    return per_row, GRID_WIDTH // per_row
+
+
+def _chunk(widgets: List[Widget], per_row: int) -> List[List[Widget]]:
+    return [widgets[index:index + per_row] for index in range(0, len(widgets), per_row)]
+
+
+def detail_rows(
+    metric: MetricDefinition, accounts: Dict[str, str], options: RenderOptions
+) -> List[List[Widget]]:
+    """One graph per account, packed into rows of the 24-column grid."""
+    per_row, width = pack_rows(len(accounts))
+    widgets = [
+        _graph(
+            metric,
+            options,
+            environment,
+            detail_series(metric, [account_id], options),
+            width,
+            LEGEND_BOTTOM,
+        )
+        for environment, account_id in accounts.items()
+    ]
+    return _chunk(widgets, per_row)
+
+
+def shared_detail_widget(
+    metric: MetricDefinition, accounts: Dict[str, str], options: RenderOptions
+) -> Widget:
+    """24-wide graph with one series per instance across every account.
+
+    CloudWatch evaluates metric math per widget, so one SEARCH result cannot
+    feed several panels; the shared-query layout collapses the per-account
+    panels into this one to remove their queries.
+    """
+    return _graph(
+        metric,
+        options,
+        f"{metric.title} - All Environments",
+        detail_series(metric, list(accounts.values()), options),
+        GRID_WIDTH,
+        LEGEND_BOTTOM,
+    )
+
+
+def live_rows(metrics: Sequence[MetricDefinition], options: RenderOptions) -> List[List[Widget]]:
+    """Per-account comparison graphs pinned to 1-minute data over 3 hours.
+
+    The widget-level start and period keep this row at full resolution
+    whatever range the rest of the dashboard is opened at.
+    """
+    per_row, width = pack_rows(len(metrics))
+    widgets = [
+        _graph(
+            metric,
+            options,
+            metric.title,
+            [_expression(comparison_expression(metric, options), metric.period_seconds)],
+            width,
+            LEGEND_BOTTOM,
+            start=LIVE_ROW_START,
+            period_seconds=metric.period_seconds,
+        )
+        for metric in metrics
+    ]
+    return _chunk(widgets, per_row)
+
+
+def _decimal(value: float) -> str:
+    """``value`` in plain decimal notation: metric math has no exponents, e.g. ``1e-05``."""
+    text = format(Decimal(repr(float(value))), "f")
+    return text.rstrip("0").rstrip(".") if "." in text else text
+
+
+def derived_widget(
+    derived: DerivedMetric, accounts: Dict[str, str], options: RenderOptions
+) -> Optional[Widget]:
+    """24-wide graph of a derived metric with one series per account.
+
+    Metric math cannot combine two arrays of series, so every input is
+    reduced to one series per account before the ratio is taken. Inputs
+    always use SEARCH: a Metrics Insights ``SUM`` would also add up the
+    datapoints within each period. Accounts missing one of the metric's
+    constants get no series; ``None`` when that leaves none.
+    """
+    period = expression_period(derived, options)
+    series: List[Expression] = []
+    for index, (environment, account_id) in enumerate(accounts.items()):
+        constants = {
+            name: options.account_constants[name][environment]
+            for name in derived.constants
+            if environment in options.account_constants.get(name, {})
+        }
+        if len(constants) < len(derived.constants):
+            continue
+        # Input ids are suffixed per account, as they share one widget
+        using_metrics = {
+            f"{derived_input.id}_{index}": _expression(
+                f"{derived_input.aggregate}("
+                f"{search_expression(derived_input, [account_id], instance_token=options.instance_token)})",
+                period,
+            )
+            for derived_input in derived.inputs
+        }
+        expression = re.sub(
+            r"\b([a-z]\w*)\b",
+            lambda match: (
+                _decimal(constants[match.group(1)]) if match.group(1) in constants else f"{match.group(1)}_{index}"
+            ),
+            derived.expression,
+        )
+        series.append(_expression(expression, period, label=environment, using_metrics=using_metrics))
+    if not series:
+        return None
+    return _graph(derived, options, derived.title, series, GRID_WIDTH, LEGEND_RIGHT)
+
+
+def forecast_decline(
+    forecast: ForecastDefinition, account_ids: Sequence[str], options: RenderOptions, id_suffix: str = ""
+) -> Expression:
+    """Share of its headroom every instance loses per second.
+
+    ``x / -RATE(x)`` is ``-1 / RATE(LOG(x))``; metric math cannot divide one
+    array of series by another, so the days are taken from this single
+    array. The query is always a SEARCH: Metrics Insights only covers the
+    last 3 hours, too short to see a trend.
+    """
+    headroom = DerivedInput(f"headroom{id_suffix}", forecast.metric_name)
+    return _expression(
+        f"-RATE(LOG({headroom.id}))",
+        forecast.period_seconds,
+        using_metrics={
+            headroom.id: _expression(
+                search_expression(headroom, account_ids, instance_token=options.instance_token),
+                forecast.period_seconds,
+            )
+        },
+    )
+
+
+def _forecast_graph(
+    forecast: ForecastDefinition, account_ids: Sequence[str], title: str, width: int, options: RenderOptions
+) -> Widget:
+    # Instances whose headroom grows come out negative; the axis starts at 0 to leave them off
+    days = _expression(
+        f"1 / ({SECONDS_PER_DAY} * SORT(decline, AVG, DESC, {options.top_n or FORECAST_TOP_N}))",
+        forecast.period_seconds,
+        using_metrics={"decline": forecast_decline(forecast, account_ids, options)},
+    )
+    return graph_widget(
+        title,
+        [days],
+        width,
+        6,
+        FORECAST_UNIT_LABEL,
+        LEGEND_BOTTOM,
+        region=options.region or HOME_REGION,
+        start=FORECAST_START,
+        period_seconds=forecast.period_seconds,
+        left_min=0,
+    )
+
+
+def forecast_rows(
+    forecast: ForecastDefinition, accounts: Dict[str, str], options: RenderOptions
+) -> List[List[Widget]]:
+    """Days-to-exhaustion panels of one forecast, worst instances first.
+
+    The panels set their own hourly period and week-long range, as a rate
+    over 1-minute datapoints is mostly noise.
+    """
+    title = f"Days Until {forecast.resource} Runs Out"
+    if options.layout == SHARED_QUERY_LAYOUT:
+        return [[_forecast_graph(forecast, list(accounts.values()), f"{title} - All Environments", GRID_WIDTH, options)]]
+    per_row, width = pack_rows(len(accounts))
+    widgets = [
+        _forecast_graph(forecast, [account_id], f"{title} - {environment}", width, options)
+        for environment, account_id in accounts.items()
+    ]
+    return _chunk(widgets, per_row)
+
+
+def forecast_count_widget(forecasts: Sequence[ForecastDefinition], options: RenderOptions) -> Widget:
+    """Single value per forecast: instances of the fleet running out within its horizon."""
+    series = []
+    for index, forecast in enumerate(forecasts):
+        days = options.forecast_days or forecast.warning_days
+        # Under N days left means losing more than 1/N of the headroom per day
+        series.append(
+            _expression(
+                f"SUM({SECONDS_PER_DAY * days:.0f} * decline_{index} > 1)",
+                forecast.period_seconds,
+                label=f"Instances under {days:g} days of {forecast.resource.lower()}",
+                using_metrics={
+                    f"decline_{index}": forecast_decline(
+                        forecast, options.comparison_account_ids, options, id_suffix=f"_{index}"
+                    )
+                },
+            )
+        )
+    return single_value_widget(
+        "Instances Running Out of Capacity",
+        series,
+        GRID_WIDTH,
+        4,
+        region=options.region or HOME_REGION,
+        start=FORECAST_START,
+        period_seconds=max(forecast.period_seconds for forecast in forecasts),
+    )
+
+
+def log_query_groups(
+    query: LogQueryDefinition, accounts: Dict[str, str], options: RenderOptions
+) -> Dict[str, List[str]]:
+    """ARNs of the configured log groups ``query`` reads, by environment.
+
+    Log groups are named by ARN, never by prefix, so a refresh scans a known
+    set through the cross-account links. Shards scoped to an instance token
+    keep the log groups whose name contains it.
+    """
+    region = options.region or HOME_REGION
+    groups = {}
+    for environment, account_id in accounts.items():
+        arns = [
+            f"arn:aws:logs:{region}:{account_id}:log-group:{name}"
+            for name in options.log_groups.get(environment, ())
+            if name.endswith(query.log_group_suffix) and (not options.instance_token or options.instance_token in name)
+        ]
+        if arns:
+            groups[environment] = arns
+    return groups
+
+
+def _log_widget(query: LogQueryDefinition, title: str, arns: List[str], width: int, options: RenderOptions) -> Widget:
+    if len(arns) > MAX_LOG_GROUPS_PER_QUERY:
+        raise ValueError(
+            f"{title!r} would query {len(arns)} log groups, Logs Insights allows {MAX_LOG_GROUPS_PER_QUERY}"
+        )
+    return log_widget(
+        title,
+        arns,
+        (*query.query_lines, f"limit {query.limit}"),
+        width,
+        6,
+        region=options.region or HOME_REGION,
+    )
+
+
+def log_query_rows(
+    query: LogQueryDefinition, accounts: Dict[str, str], options: RenderOptions
+) -> List[List[Widget]]:
+    """Tables of one Logs Insights query; none when no account has a matching log group."""
+    groups = log_query_groups(query, accounts, options)
+    if not groups:
+        return []
+    if options.layout == SHARED_QUERY_LAYOUT:
+        arns = [arn for environment_arns in groups.values() for arn in environment_arns]
+        return [[_log_widget(query, f"{query.title} - All Environments", arns, GRID_WIDTH, options)]]
+    per_row, width = pack_rows(len(groups), MAX_LOG_PANELS_PER_ROW)
+    widgets = [
+        _log_widget(query, f"{query.title} - {environment}", arns, width, options)
+        for environment, arns in groups.items()
+    ]
+    return _chunk(widgets, per_row)
+
+
+def index_widget(title: str, links: Sequence[Tuple[str, str]]) -> Widget:
+    """Markdown list linking to other dashboards, given (label, dashboard name) pairs."""
+    lines = [f"# {title}", ""]
+    lines += [f"- [{label}](#dashboards:name={dashboard_name})" for label, dashboard_name in links]
+    return text_widget("\n".join(lines), GRID_WIDTH, 2 + len(links))
+
+
+def catalog_sections(options: RenderOptions, sections: Tuple[Section, ...] = SECTIONS) -> Tuple[Section, ...]:
+    """The sections ``options`` renders; the derived metric section is opt-in."""
+    if options.derived_metrics:
+        return sections
+    return tuple(section for section in sections if section.key != DERIVED_METRICS)
+
+
+def add_catalog_widgets(
+    dashboard: DashboardBody,
+    accounts: Dict[str, str],
+    options: RenderOptions = RenderOptions(),
+    sections: Tuple[Section, ...] = SECTIONS,
+    metrics: Tuple[MetricDefinition, ...] = METRICS,
+    derived: Tuple[DerivedMetric, ...] = DERIVED,
+    log_queries: Tuple[LogQueryDefinition, ...] = LOG_QUERIES,
+    forecasts: Tuple[ForecastDefinition, ...] = FORECASTS,
+) -> None:
+    """Render every catalog section onto ``dashboard``.
+
+    Each ``add_widgets`` call starts a new dashboard row, so headers,
+    comparison graphs and detail rows are added separately.
+    """
+    sections = catalog_sections(options, sections)
+    if options.instance_token:
+        metrics = tuple(metric for metric in metrics if identifier_dimension(metric.dimensions))
+    live_metrics = [metric for metric in metrics if metric.live]
+    if options.live_row and live_metrics:
+        dashboard.add_widgets(section_header(LIVE_ROW_TITLE))
+        for row in live_rows(live_metrics, options):
+            dashboard.add_widgets(*row)
+
+    for section, section_metrics in metrics_by_section(sections, metrics):
+        dashboard.add_widgets(section_header(section.title))
+        for metric in section_metrics:
+            dashboard.add_widgets(comparison_widget(metric, accounts, options))
+            if options.layout == SHARED_QUERY_LAYOUT:
+                dashboard.add_widgets(shared_detail_widget(metric, accounts, options))
+            else:
+                for row in detail_rows(metric, accounts, options):
+                    dashboard.add_widgets(*row)
+        for query in log_queries:
+            if query.section == section.key:
+                for row in log_query_rows(query, accounts, options):
+                    dashboard.add_widgets(*row)
+
+    forecast_section = next((section for section in sections if section.key == CAPACITY_FORECAST), None)
+    if forecast_section is not None and forecasts:
+        dashboard.add_widgets(section_header(forecast_section.title))
+        dashboard.add_widgets(forecast_count_widget(forecasts, options))
+        for forecast in forecasts:
+            for row in forecast_rows(forecast, accounts, options):
+                dashboard.add_widgets(*row)
+
+    derived_section = next((section for section in sections if section.key == DERIVED_METRICS), None)
+    if derived_section is None:
+        return
+    derived_widgets = [derived_widget(derived_metric, accounts, options) for derived_metric in derived]
+    derived_widgets = [widget for widget in derived_widgets if widget is not None]
+    if derived_widgets:
+        dashboard.add_widgets(section_header(derived_section.title))
+        for widget in derived_widgets:
+            dashboard.add_widgets(widget)
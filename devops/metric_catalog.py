@@ -0,0 +1,364 @@
+"""Declarative catalog of the RDS metrics rendered on the dashboard.
+
+Every dashboard section and metric lives here as plain data so the widget
+grid can be generated instead of hand-written. Adding a metric to the fleet
+dashboard is a one-line change to ``METRICS``; alerting on it is a one-line
+change to ``ALARMS``.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Dimension sets CloudWatch publishes AWS/RDS metrics under
+INSTANCE_DIMENSIONS = ("DBInstanceIdentifier",)
+CLUSTER_DIMENSIONS = ("DBClusterIdentifier",)
+CLUSTER_ROLE_DIMENSIONS = ("DBClusterIdentifier", "Role")
+ENGINE_DIMENSIONS = ("EngineName",)
+
+WRITER = "WRITER"
+READER = "READER"
+
+
+@dataclass(frozen=True)
+class Section:
+    """A titled group of metrics, rendered as a markdown header row."""
+
+    key: str
+    title: str
+
+
+@dataclass(frozen=True)
+class MetricDefinition:
+    """One RDS metric and how it is graphed.
+
+    ``period_seconds`` is the resolution used where a fixed period is wanted
+    (the live row and the high-res dashboard); ``live`` puts the metric on
+    the 1-minute live row. ``higher_is_worse`` is False for headroom metrics
+    such as free memory, where the lowest values are the ones to watch.
+    ``extra_statistics`` (e.g. ``p99``) are added to the comparison graph
+    next to ``statistic``. ``anomaly_band`` makes the metric eligible for
+    per-account anomaly detection bands on its comparison graph.
+
+    ``dimensions`` is the schema the metric is queried under: per instance by
+    default, or aggregated by CloudWatch per Aurora cluster, per cluster and
+    role, or per engine, so panels draw one series per cluster instead of
+    one per instance. ``role`` (``WRITER``/``READER``) keeps only that role's
+    series of a ``CLUSTER_ROLE_DIMENSIONS`` metric.
+    """
+
+    metric_name: str
+    title: str
+    unit_label: str
+    section: str
+    statistic: str = "Average"
+    period_seconds: int = 60
+    live: bool = False
+    higher_is_worse: bool = True
+    extra_statistics: Tuple[str, ...] = ()
+    anomaly_band: bool = False
+    dimensions: Tuple[str, ...] = INSTANCE_DIMENSIONS
+    role: Optional[str] = None
+
+
+# Tail latency is what pages on-call, so latency shows more than the mean
+LATENCY_STATISTICS = ("p90", "p99", "Maximum")
+
+
+@dataclass(frozen=True)
+class DerivedInput:
+    """An RDS metric summed or averaged over an account's instances.
+
+    ``id`` is how the derived metric's expression refers to it;
+    ``dimensions`` and ``role`` are as on ``MetricDefinition``.
+    """
+
+    id: str
+    metric_name: str
+    aggregate: str = "SUM"
+    statistic: str = "Average"
+    dimensions: Tuple[str, ...] = INSTANCE_DIMENSIONS
+    role: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class DerivedMetric:
+    """A per-account metric math expression over aggregated inputs.
+
+    ``constants`` name per-account numbers the expression uses besides its
+    inputs, such as an account's vCPU count; their values come from
+    ``RenderOptions.account_constants``, and accounts without one are left
+    off the graph.
+    """
+
+    key: str
+    title: str
+    unit_label: str
+    expression: str
+    inputs: Tuple[DerivedInput, ...]
+    period_seconds: int = 60
+    constants: Tuple[str, ...] = ()
+
+
+RESOURCE_UTILIZATION = "resource_utilization"
+IO_PERFORMANCE = "io_performance"
+PERFORMANCE_INSIGHTS = "performance_insights"
+NETWORK_THROUGHPUT = "network_throughput"
+REPLICATION = "replication"
+AURORA_SERVERLESS = "aurora_serverless"
+AURORA_CLUSTERS = "aurora_clusters"
+CAPACITY_FORECAST = "capacity_forecast"
+DERIVED_METRICS = "derived_metrics"
+
+SECTIONS: Tuple[Section, ...] = (
+    Section(RESOURCE_UTILIZATION, "Resource Utilization"),
+    Section(IO_PERFORMANCE, "I/O Performance"),
+    Section(PERFORMANCE_INSIGHTS, "Performance Insights DB Load"),
+    Section(NETWORK_THROUGHPUT, "Network Throughput"),
+    Section(REPLICATION, "Replication"),
+    Section(AURORA_SERVERLESS, "Aurora Serverless v2 Metrics (if applicable)"),
+    Section(AURORA_CLUSTERS, "Aurora Clusters and Engines"),
+    Section(CAPACITY_FORECAST, "Capacity Forecast"),
+    Section(DERIVED_METRICS, "Derived Efficiency Metrics"),
+)
+
+METRICS: Tuple[MetricDefinition, ...] = (
+    # Resource utilization
+    MetricDefinition("CPUUtilization", "CPU Utilization", "Percent", RESOURCE_UTILIZATION, live=True, anomaly_band=True),
+    MetricDefinition(
+        "DatabaseConnections", "Database Connections", "Count", RESOURCE_UTILIZATION, live=True, anomaly_band=True
+    ),
+    MetricDefinition("FreeableMemory", "Freeable Memory", "Bytes", RESOURCE_UTILIZATION, higher_is_worse=False),
+    MetricDefinition("FreeStorageSpace", "Free Storage Space", "Bytes", RESOURCE_UTILIZATION, higher_is_worse=False),
+    # I/O performance
+    MetricDefinition("ReadIOPS", "Read IOPS", "Count/Second", IO_PERFORMANCE),
+    MetricDefinition("WriteIOPS", "Write IOPS", "Count/Second", IO_PERFORMANCE),
+    MetricDefinition(
+        "ReadLatency", "Read Latency", "Seconds", IO_PERFORMANCE,
+        live=True, extra_statistics=LATENCY_STATISTICS, anomaly_band=True,
+    ),
+    MetricDefinition(
+        "WriteLatency", "Write Latency", "Seconds", IO_PERFORMANCE,
+        live=True, extra_statistics=LATENCY_STATISTICS, anomaly_band=True,
+    ),
+    # Performance Insights, average active sessions split by what they wait on
+    MetricDefinition("DBLoad", "DB Load", "Sessions", PERFORMANCE_INSIGHTS),
+    MetricDefinition("DBLoadCPU", "DB Load on CPU", "Sessions", PERFORMANCE_INSIGHTS),
+    MetricDefinition("DBLoadNonCPU", "DB Load Waiting (non-CPU)", "Sessions", PERFORMANCE_INSIGHTS),
+    # Network throughput
+    MetricDefinition("NetworkReceiveThroughput", "Network Receive Throughput", "Bytes/Second", NETWORK_THROUGHPUT),
+    MetricDefinition("NetworkTransmitThroughput", "Network Transmit Throughput", "Bytes/Second", NETWORK_THROUGHPUT),
+    # Replication; the worst replica is the one that serves stale reads
+    MetricDefinition("ReplicaLag", "Replica Lag", "Seconds", REPLICATION, statistic="Maximum"),
+    MetricDefinition("AuroraReplicaLag", "Aurora Replica Lag", "Milliseconds", REPLICATION, statistic="Maximum"),
+    MetricDefinition(
+        "AuroraBinlogReplicaLag", "Aurora Binlog Replica Lag", "Seconds", REPLICATION,
+        statistic="Maximum", dimensions=CLUSTER_ROLE_DIMENSIONS, role=WRITER,
+    ),
+    # Aurora Serverless v2, one series per cluster
+    MetricDefinition(
+        "ACUUtilization", "ACU Utilization", "Percent", AURORA_SERVERLESS, dimensions=CLUSTER_DIMENSIONS
+    ),
+    MetricDefinition(
+        "ServerlessDatabaseCapacity", "Serverless Database Capacity (ACUs)", "Count", AURORA_SERVERLESS,
+        dimensions=CLUSTER_DIMENSIONS,
+    ),
+    # Aurora clusters by role, and the fleet by engine
+    MetricDefinition(
+        "CPUUtilization", "Writer CPU Utilization", "Percent", AURORA_CLUSTERS,
+        dimensions=CLUSTER_ROLE_DIMENSIONS, role=WRITER,
+    ),
+    MetricDefinition(
+        "CPUUtilization", "Reader CPU Utilization", "Percent", AURORA_CLUSTERS,
+        dimensions=CLUSTER_ROLE_DIMENSIONS, role=READER,
+    ),
+    MetricDefinition(
+        "DatabaseConnections", "Connections by Cluster and Role", "Count", AURORA_CLUSTERS,
+        dimensions=CLUSTER_ROLE_DIMENSIONS,
+    ),
+    MetricDefinition(
+        "CPUUtilization", "CPU Utilization by Engine", "Percent", AURORA_CLUSTERS, dimensions=ENGINE_DIMENSIONS
+    ),
+)
+
+
+_READ_IOPS = DerivedInput("read_iops", "ReadIOPS")
+_WRITE_IOPS = DerivedInput("write_iops", "WriteIOPS")
+_CONNECTIONS = DerivedInput("connections", "DatabaseConnections")
+_DB_LOAD = DerivedInput("load", "DBLoad")
+
+DERIVED: Tuple[DerivedMetric, ...] = (
+    DerivedMetric(
+        "total_iops", "Total IOPS", "Count/Second", "read_iops + write_iops", (_READ_IOPS, _WRITE_IOPS)
+    ),
+    DerivedMetric(
+        "bytes_per_iop",
+        "Bytes per I/O",
+        "Bytes",
+        "(read_bytes + write_bytes) / (read_iops + write_iops)",
+        (DerivedInput("read_bytes", "ReadThroughput"), DerivedInput("write_bytes", "WriteThroughput"), _READ_IOPS, _WRITE_IOPS),
+    ),
+    # Little's law: I/Os in flight = latency x throughput
+    DerivedMetric(
+        "queue_depth_proxy",
+        "Queue Depth Proxy (latency x IOPS)",
+        "Count",
+        "read_latency * read_iops + write_latency * write_iops",
+        (
+            DerivedInput("read_latency", "ReadLatency", aggregate="AVG"),
+            _READ_IOPS,
+            DerivedInput("write_latency", "WriteLatency", aggregate="AVG"),
+            _WRITE_IOPS,
+        ),
+    ),
+    # SEARCH cannot tell Serverless v2 instances apart, so the connections are every
+    # instance's while only Serverless v2 instances report ACUs: a per-ACU load in
+    # accounts running Serverless v2 only, an upper bound wherever provisioned ones remain
+    DerivedMetric(
+        "fleet_connections_per_serverless_acu",
+        "Fleet Connections per Serverless ACU",
+        "Count",
+        "connections / acus",
+        (_CONNECTIONS, DerivedInput("acus", "ServerlessDatabaseCapacity")),
+    ),
+    DerivedMetric(
+        "cpu_per_connection",
+        "CPU per Connection",
+        "Percent",
+        "cpu / connections",
+        (DerivedInput("cpu", "CPUUtilization"), _CONNECTIONS),
+    ),
+    # Above 1 sessions queue for a vCPU; needs the account's vCPU count
+    DerivedMetric(
+        "load_per_vcpu",
+        "DB Load per vCPU",
+        "Sessions/vCPU",
+        "load / vcpus",
+        (_DB_LOAD,),
+        constants=("vcpus",),
+    ),
+    # High load that is mostly off-CPU is contention (locks, I/O), not saturation
+    DerivedMetric(
+        "cpu_share_of_load",
+        "CPU Share of DB Load",
+        "Percent",
+        "100 * load_cpu / load",
+        (DerivedInput("load_cpu", "DBLoadCPU"), _DB_LOAD),
+    ),
+)
+
+
+@dataclass(frozen=True)
+class ForecastDefinition:
+    """Days until each instance runs out of a headroom metric at its current rate of decline.
+
+    The rate is taken between ``period_seconds`` datapoints. ``warning_days``
+    is the horizon of the fleet-wide count of instances running out sooner.
+    """
+
+    key: str
+    resource: str
+    metric_name: str
+    warning_days: float
+    period_seconds: int = 3600
+
+
+FORECASTS: Tuple[ForecastDefinition, ...] = (
+    ForecastDefinition("storage_days_to_full", "Storage", "FreeStorageSpace", warning_days=14),
+    # Memory swings with the workload, so only a short horizon is worth acting on
+    ForecastDefinition("memory_days_to_exhaustion", "Memory", "FreeableMemory", warning_days=7),
+)
+
+
+@dataclass(frozen=True)
+class LogQueryDefinition:
+    """A Logs Insights query drawn as a table after a section's graphs.
+
+    It runs over the configured log groups whose name ends with
+    ``log_group_suffix`` and returns at most ``limit`` rows.
+    """
+
+    key: str
+    title: str
+    section: str
+    log_group_suffix: str
+    query_lines: Tuple[str, ...]
+    limit: int = 20
+
+
+# Slowest statements by total time, next to the latency graphs
+LOG_QUERIES: Tuple[LogQueryDefinition, ...] = (
+    LogQueryDefinition(
+        "mysql_slow_statements",
+        "Top Slow Statements (MySQL)",
+        IO_PERFORMANCE,
+        "/slowquery",
+        (
+            "parse @message /Query_time: (?<query_seconds>[0-9.]+)/",
+            "parse @message /(?<statement>(SELECT|INSERT|UPDATE|DELETE|REPLACE|CALL|WITH)\\b[^;]*)/",
+            "filter ispresent(query_seconds)",
+            "stats sum(query_seconds) as total_seconds, count(*) as calls, avg(query_seconds) as avg_seconds"
+            " by statement",
+            "sort total_seconds desc",
+        ),
+    ),
+    LogQueryDefinition(
+        "postgresql_slow_statements",
+        "Top Slow Statements (PostgreSQL)",
+        IO_PERFORMANCE,
+        "/postgresql",
+        (
+            "parse @message /duration: (?<duration_ms>[0-9.]+) ms\\s+(statement|execute [^:]*): (?<statement>.*)/",
+            "filter ispresent(duration_ms)",
+            "stats sum(duration_ms) / 1000 as total_seconds, count(*) as calls, avg(duration_ms) / 1000 as avg_seconds"
+            " by statement",
+            "sort total_seconds desc",
+        ),
+    ),
+)
+
+
+@dataclass(frozen=True)
+class AlarmDefinition:
+    """Per-account alarm on the worst instance of a catalog metric.
+
+    The comparison follows the metric's ``higher_is_worse``: the alarm fires
+    when the fleet maximum rises above ``threshold``, or for headroom metrics
+    when the fleet minimum drops below it.
+    """
+
+    metric_name: str
+    threshold: float
+    evaluation_periods: int = 3
+    datapoints_to_alarm: int = 3
+    period_seconds: int = 300
+
+
+ALARMS: Tuple[AlarmDefinition, ...] = (
+    AlarmDefinition("CPUUtilization", 80),
+    AlarmDefinition("FreeStorageSpace", 10 * 1024 ** 3, evaluation_periods=1, datapoints_to_alarm=1),
+    AlarmDefinition("ReadLatency", 0.02),
+    AlarmDefinition("WriteLatency", 0.02),
+    AlarmDefinition("ACUUtilization", 90),
+)
+
+
+def metrics_by_section(
+    sections: Tuple[Section, ...] = SECTIONS,
+    metrics: Tuple[MetricDefinition, ...] = METRICS,
+) -> Iterator[Tuple[Section, List[MetricDefinition]]]:
+    """Yield each section with its metrics, in catalog order.
+
+    Sections without any metric are skipped so they don't render an empty
+    header row. ``sections`` may be a subset of the catalog, in which case
+    metrics of the other catalog sections are left out.
+    """
+    grouped: Dict[str, List[MetricDefinition]] = {}
+    for metric in metrics:
+        grouped.setdefault(metric.section, []).append(metric)
+
+    unknown = set(grouped) - {section.key for section in (*SECTIONS, *sections)}
+    if unknown:
+        raise ValueError(f"Metrics reference unknown sections: {sorted(unknown)}")
+
+    for section in sections:
+        if section.key in grouped:
+            yield section, grouped[section.key]
@@ -0,0 +1,119 @@
+"""Metric Stream -> Firehose -> Lambda pipeline publishing the fleet rollups.
+
+``MetricStreamRollupStack`` streams the catalog's instance-level ``AWS/RDS``
+metrics, including those of the accounts linked through
+``observability``, to a Firehose delivery stream whose transformation
+Lambda is ``metric_stream_aggregator.handler``. The Lambda publishes the
+per-account and per-environment avg/max/p95 rollups the comparison graphs
+read with ``-c metricStreamRollups=true``, and drops the records; the
+bucket behind the delivery stream only receives the batches Firehose could
+not process, and expires them after a week.
+
+Deploy it to the monitoring account, in every region the dashboards read.
+"""
+import json
+import os
+from typing import Dict, List, Sequence
+
+from aws_cdk import (
+    Duration,
+    Stack,
+    aws_cloudwatch as cloudwatch,
+    aws_iam as iam,
+    aws_kinesisfirehose as firehose,
+    aws_lambda as lambda_,
+    aws_s3 as s3,
+)
+from constructs import Construct
+
+from metric_catalog import METRICS, MetricDefinition
+from metric_stream_aggregator import JSON_FORMAT, OUTPUT_FORMATS, ROLLUP_FOR_STATISTIC, SOURCE_NAMESPACE
+from query_backends import rollup_name
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+AGGREGATOR_MODULE = "metric_stream_aggregator.py"
+AGGREGATOR_HANDLER = "metric_stream_aggregator.handler"
+FAILED_BATCH_RETENTION = Duration.days(7)
+
+
+def rollup_metric_names(metrics: Sequence[MetricDefinition] = METRICS) -> List[str]:
+    """Catalog metrics the comparison graphs can read as rollups, i.e. the ones to stream."""
+    return sorted({
+        metric.metric_name
+        for metric in metrics
+        if any(rollup_name(metric, statistic) for statistic in ROLLUP_FOR_STATISTIC)
+    })
+
+
+class MetricStreamRollupStack(Stack):
+    """Metric stream of the catalog's RDS metrics and the Lambda rolling them up per account."""
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        accounts: Dict[str, str],
+        metrics: Sequence[MetricDefinition] = METRICS,
+        output_format: str = JSON_FORMAT,
+        **kwargs,
+    ) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown metric stream output format {output_format!r}")
+        self.metric_names = rollup_metric_names(metrics)
+
+        failed_batches = s3.Bucket(
+            self,
+            "FailedBatches",
+            block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+            encryption=s3.BucketEncryption.S3_MANAGED,
+            enforce_ssl=True,
+            lifecycle_rules=[s3.LifecycleRule(expiration=FAILED_BATCH_RETENTION)],
+        )
+
+        # Only the aggregator goes into the asset, not the CDK app around it
+        self.aggregator = lambda_.Function(
+            self,
+            "Aggregator",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            handler=AGGREGATOR_HANDLER,
+            code=lambda_.Code.from_asset(HERE, exclude=["*", ".*", f"!{AGGREGATOR_MODULE}"]),
+            timeout=Duration.minutes(1),
+            memory_size=256,
+            environment={
+                "ACCOUNT_ENVIRONMENTS": json.dumps(
+                    {account_id: environment for environment, account_id in accounts.items()}, sort_keys=True
+                ),
+                "ROLLUP_METRICS": ",".join(self.metric_names),
+                "OUTPUT_FORMAT": output_format,
+            },
+        )
+
+        self.delivery_stream = firehose.DeliveryStream(
+            self,
+            "DeliveryStream",
+            destination=firehose.S3Bucket(
+                failed_batches,
+                processors=[firehose.LambdaFunctionProcessor(self.aggregator, buffer_interval=Duration.minutes(1))],
+                error_output_prefix="failed/!{firehose:error-output-type}/",
+            ),
+        )
+
+        stream_role = iam.Role(
+            self, "StreamRole", assumed_by=iam.ServicePrincipal("streams.metrics.cloudwatch.amazonaws.com")
+        )
+        self.delivery_stream.grant_put_records(stream_role)
+        self.metric_stream = cloudwatch.CfnMetricStream(
+            self,
+            "MetricStream",
+            firehose_arn=self.delivery_stream.delivery_stream_arn,
+            role_arn=stream_role.role_arn,
+            output_format=output_format,
+            include_filters=[
+                cloudwatch.CfnMetricStream.MetricStreamFilterProperty(
+                    namespace=SOURCE_NAMESPACE, metric_names=self.metric_names
+                )
+            ],
+            include_linked_accounts_metrics=True,
+        )
+
@@ -0,0 +1,424 @@
+"""Metric Streams consumer that rolls the RDS fleet up per account.
+
+A CloudWatch Metric Stream delivers every ``AWS/RDS`` datapoint of the
+fleet to Firehose, which hands batches of records to ``handler`` as its
+transformation Lambda. Each record holds JSON lines or length-delimited
+OpenTelemetry 0.7 ``ExportMetricsServiceRequest`` messages, as the stream's
+output format (``OUTPUT_FORMAT``) says. For every catalog metric the instance-level
+datapoints of an account and minute are reduced to three rollups:
+
+* ``avg`` - mean of the instances' averages,
+* ``max`` - largest instance maximum,
+* ``p95`` - 95th percentile of the instances' averages,
+
+published through Embedded Metric Format log lines as
+``<MetricName>_<rollup>`` in ``ROLLUP_NAMESPACE``, once per account (with
+its environment) and once per environment. The comparison graphs then read
+one series per account instead of re-aggregating every instance.
+
+The handler streams: records are decoded one at a time and datapoints are
+folded into fixed-size accumulators, so memory grows with accounts x
+metrics x minutes in a batch, never with the number of instances or
+records. ``p95`` comes from a log-bucketed histogram with about 1%
+relative error. A minute split across two Firehose batches is published
+twice, as two partial rollups of that minute.
+
+Records are returned ``Dropped``: the rollups are the output, Firehose
+only keeps failed batches. Run it locally on recorded payloads (Firehose
+events, or raw JSON/OpenTelemetry stream files):
+
+    python metric_stream_aggregator.py event.json --registry accounts.json
+    python metric_stream_aggregator.py stream.bin --format opentelemetry0.7
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import struct
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+ROLLUP_NAMESPACE = "RDS/FleetRollups"
+ENVIRONMENT_DIMENSION = "Environment"
+ACCOUNT_DIMENSION = "AccountId"
+ROLLUPS = ("avg", "max", "p95")
+# Statistic of a per-account comparison series each rollup stands in for
+ROLLUP_FOR_STATISTIC = {"Average": "avg", "Maximum": "max", "p95": "p95"}
+
+JSON_FORMAT = "json"
+OPENTELEMETRY_FORMAT = "opentelemetry0.7"
+OUTPUT_FORMATS = (JSON_FORMAT, OPENTELEMETRY_FORMAT)
+
+SOURCE_NAMESPACE = "AWS/RDS"
+# Only per-instance datapoints are rolled up; cluster and engine series would count instances twice
+INSTANCE_DIMENSION = "DBInstanceIdentifier"
+
+# Histogram buckets grow by 2%, so a bucket midpoint is within 1% of its values
+HISTOGRAM_GROWTH = 1.02
+EMF_MAX_METRICS_PER_DIRECTIVE = 100
+EMF_UNITS = {
+    "Seconds", "Microseconds", "Milliseconds", "Bytes", "Kilobytes", "Megabytes", "Gigabytes", "Terabytes",
+    "Bits", "Kilobits", "Megabits", "Gigabits", "Terabits", "Percent", "Count", "Bytes/Second",
+    "Kilobytes/Second", "Megabytes/Second", "Gigabytes/Second", "Terabytes/Second", "Bits/Second",
+    "Kilobits/Second", "Megabits/Second", "Gigabits/Second", "Terabits/Second", "Count/Second", "None",
+}
+
+
+def rollup_metric_name(metric_name: str, rollup: str) -> str:
+    return f"{metric_name}_{rollup}"
+
+
+@dataclass(frozen=True)
+class Datapoint:
+    """One instance's statistics for one minute, as a metric stream delivers them."""
+
+    account_id: str
+    metric_name: str
+    dimensions: Tuple[Tuple[str, str], ...]
+    timestamp_ms: int
+    count: float
+    total: float
+    maximum: float
+    unit: str = "None"
+
+
+def _lines(payload: bytes) -> Iterator[bytes]:
+    start = 0
+    while start < len(payload):
+        end = payload.find(b"\n", start)
+        end = len(payload) if end < 0 else end
+        if payload[start:end].strip():
+            yield payload[start:end]
+        start = end + 1
+
+
+def json_datapoints(payload: bytes) -> Iterator[Datapoint]:
+    """Datapoints of a JSON-format record, one JSON object per line."""
+    for line in _lines(payload):
+        item = json.loads(line)
+        if item.get("namespace") != SOURCE_NAMESPACE:
+            continue
+        value = item["value"]
+        yield Datapoint(
+            account_id=str(item["account_id"]),
+            metric_name=item["metric_name"],
+            dimensions=tuple(sorted(item.get("dimensions", {}).items())),
+            timestamp_ms=int(item["timestamp"]),
+            count=float(value["count"]),
+            total=float(value["sum"]),
+            maximum=float(value["max"]),
+            unit=item.get("unit") or "None",
+        )
+
+
+# OpenTelemetry 0.7 protobuf, decoded with just the fields a metric stream sets
+
+
+def _varint(data: memoryview, position: int) -> Tuple[int, int]:
+    result, shift = 0, 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+
+def _fields(data: memoryview) -> Iterator[Tuple[int, Any]]:
+    """(field number, value) of a protobuf message; length-delimited values stay views."""
+    position = 0
+    while position < len(data):
+        key, position = _varint(data, position)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, position = _varint(data, position)
+        elif wire_type == 1:
+            value, position = data[position:position + 8], position + 8
+        elif wire_type == 2:
+            length, position = _varint(data, position)
+            value, position = data[position:position + length], position + length
+        elif wire_type == 5:
+            value, position = data[position:position + 4], position + 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+        yield number, value
+
+
+def _string(value: memoryview) -> str:
+    return bytes(value).decode("utf-8")
+
+
+def _double(value: memoryview) -> float:
+    return struct.unpack("<d", value)[0]
+
+
+def _fixed64(value: memoryview) -> int:
+    return struct.unpack("<Q", value)[0]
+
+
+def _attributes(resource: memoryview) -> Dict[str, str]:
+    """String attributes of a Resource (``KeyValue``s with a string ``AnyValue``)."""
+    attributes = {}
+    for number, key_value in _fields(resource):
+        if number != 1:
+            continue
+        key, text = "", ""
+        for kv_number, kv_value in _fields(key_value):
+            if kv_number == 1:
+                key = _string(kv_value)
+            elif kv_number == 2:
+                text = next((_string(value) for any_number, value in _fields(kv_value) if any_number == 1), "")
+        attributes[key] = text
+    return attributes
+
+
+def _summary_datapoints(account_id: str, metric: memoryview) -> Iterator[Datapoint]:
+    name, unit, summary = "", "None", None
+    for number, value in _fields(metric):
+        if number == 1:
+            name = _string(value)
+        elif number == 3:
+            unit = _string(value) or "None"
+        elif number == 11:
+            summary = value
+    if summary is None:
+        return
+    for number, point in _fields(summary):
+        if number != 1:
+            continue
+        labels: Dict[str, str] = {}
+        timestamp_ns, count, total, maximum = 0, 0.0, 0.0, -math.inf
+        for point_number, value in _fields(point):
+            if point_number == 1:
+                pair = dict((label_number, _string(text)) for label_number, text in _fields(value))
+                labels[pair.get(1, "")] = pair.get(2, "")
+            elif point_number == 3:
+                timestamp_ns = _fixed64(value)
+            elif point_number == 4:
+                count = float(_fixed64(value))
+            elif point_number == 5:
+                total = _double(value)
+            elif point_number == 6:
+                quantile = dict(_fields(value))
+                if 1 in quantile and _double(quantile[1]) == 1.0:
+                    maximum = _double(quantile[2]) if 2 in quantile else 0.0
+        # Metric names are amazonaws.com/<Namespace>/<MetricName>; labels repeat both
+        namespace = labels.pop("Namespace", name.rsplit("/", 1)[0].replace("amazonaws.com/", "", 1))
+        metric_name = labels.pop("MetricName", name.rsplit("/", 1)[-1])
+        if namespace != SOURCE_NAMESPACE:
+            continue
+        yield Datapoint(
+            account_id=account_id,
+            metric_name=metric_name,
+            dimensions=tuple(sorted(labels.items())),
+            timestamp_ms=timestamp_ns // 1_000_000,
+            count=count,
+            total=total,
+            maximum=maximum if maximum > -math.inf else (total / count if count else 0.0),
+            unit=unit,
+        )
+
+
+def opentelemetry_datapoints(payload: bytes) -> Iterator[Datapoint]:
+    """Datapoints of an OpenTelemetry 0.7 record: length-delimited ``ExportMetricsServiceRequest``s."""
+    data = memoryview(payload)
+    position = 0
+    while position < len(data):
+        length, position = _varint(data, position)
+        request, position = data[position:position + length], position + length
+        for number, resource_metrics in _fields(request):
+            if number != 1:
+                continue
+            account_id, libraries = "", []
+            for rm_number, value in _fields(resource_metrics):
+                if rm_number == 1:
+                    account_id = _attributes(value).get("cloud.account.id", "")
+                elif rm_number == 2:
+                    libraries.append(value)
+            for library in libraries:
+                for library_number, metric in _fields(library):
+                    if library_number == 2:
+                        yield from _summary_datapoints(account_id, metric)
+
+
+def record_datapoints(payload: bytes, output_format: str = JSON_FORMAT) -> Iterator[Datapoint]:
+    """Datapoints of one record in the stream's ``output_format``.
+
+    The format is not sniffed: a length-delimited OpenTelemetry record may
+    well start with the byte of ``{``.
+    """
+    if output_format == JSON_FORMAT:
+        return json_datapoints(payload)
+    if output_format == OPENTELEMETRY_FORMAT:
+        return opentelemetry_datapoints(payload)
+    raise ValueError(f"Unknown metric stream output format {output_format!r}")
+
+
+@dataclass
+class Rollup:
+    """Running avg, max and p95 over the instances of one account, metric and minute."""
+
+    unit: str = "None"
+    instances: int = 0
+    total: float = 0.0
+    maximum: float = -math.inf
+    # Histogram of instance averages by log bucket; non-positive values share bucket None
+    buckets: Dict[Optional[int], int] = field(default_factory=dict)
+
+    def add(self, average: float, maximum: float) -> None:
+        self.instances += 1
+        self.total += average
+        self.maximum = max(self.maximum, maximum)
+        bucket = math.floor(math.log(average, HISTOGRAM_GROWTH)) if average > 0 else None
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, percentile: float) -> float:
+        rank = max(1, math.ceil(percentile / 100 * self.instances))
+        seen = self.buckets.get(None, 0)
+        if seen >= rank:
+            return 0.0
+        for bucket in sorted(key for key in self.buckets if key is not None):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.maximum, HISTOGRAM_GROWTH ** (bucket + 0.5))
+        return self.maximum
+
+    def values(self) -> Dict[str, float]:
+        return {"avg": self.total / self.instances, "max": self.maximum, "p95": self.percentile(95)}
+
+
+class Aggregator:
+    """Folds datapoints into per-account rollups and renders them as EMF documents.
+
+    ``environments`` maps account id to environment (accounts missing from
+    it are published under their id); ``metric_names`` restricts the
+    rollups to the catalog metrics, all ``AWS/RDS`` metrics if empty.
+    ``output_format`` is the metric stream's, which every record is in.
+    """
+
+    def __init__(
+        self, environments: Dict[str, str], metric_names: Sequence[str] = (), output_format: str = JSON_FORMAT
+    ) -> None:
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown metric stream output format {output_format!r}")
+        self.environments = environments
+        self.metric_names = set(metric_names)
+        self.output_format = output_format
+        self.rollups: Dict[Tuple[str, int], Dict[str, Rollup]] = {}
+        self.datapoints = 0
+
+    def add(self, datapoint: Datapoint) -> None:
+        if self.metric_names and datapoint.metric_name not in self.metric_names:
+            return
+        if tuple(name for name, _ in datapoint.dimensions) != (INSTANCE_DIMENSION,) or not datapoint.count:
+            return
+        minute = datapoint.timestamp_ms // 60_000 * 60_000
+        metrics = self.rollups.setdefault((datapoint.account_id, minute), {})
+        rollup = metrics.get(datapoint.metric_name)
+        if rollup is None:
+            rollup = metrics[datapoint.metric_name] = Rollup(unit=datapoint.unit)
+        rollup.add(datapoint.total / datapoint.count, datapoint.maximum)
+        self.datapoints += 1
+
+    def add_payload(self, payload: bytes) -> None:
+        for datapoint in record_datapoints(payload, self.output_format):
+            self.add(datapoint)
+
+    def emf_documents(self) -> Iterator[Dict[str, Any]]:
+        """One EMF document per account and minute, in account and time order."""
+        for (account_id, minute), metrics in sorted(self.rollups.items()):
+            document: Dict[str, Any] = {
+                ENVIRONMENT_DIMENSION: self.environments.get(account_id, account_id),
+                ACCOUNT_DIMENSION: account_id,
+            }
+            definitions = []
+            for metric_name, rollup in sorted(metrics.items()):
+                unit = rollup.unit if rollup.unit in EMF_UNITS else "None"
+                for rollup_name, value in rollup.values().items():
+                    name = rollup_metric_name(metric_name, rollup_name)
+                    document[name] = value
+                    definitions.append({"Name": name, "Unit": unit})
+            document["_aws"] = {
+                "Timestamp": minute,
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": ROLLUP_NAMESPACE,
+                        "Dimensions": [[ENVIRONMENT_DIMENSION, ACCOUNT_DIMENSION], [ENVIRONMENT_DIMENSION]],
+                        "Metrics": definitions[index:index + EMF_MAX_METRICS_PER_DIRECTIVE],
+                    }
+                    for index in range(0, len(definitions), EMF_MAX_METRICS_PER_DIRECTIVE)
+                ],
+            }
+            yield document
+
+
+def _aggregator_from_environment() -> Aggregator:
+    metric_names = [name for name in os.environ.get("ROLLUP_METRICS", "").split(",") if name]
+    return Aggregator(
+        json.loads(os.environ.get("ACCOUNT_ENVIRONMENTS", "{}")),
+        metric_names,
+        os.environ.get("OUTPUT_FORMAT", JSON_FORMAT),
+    )
+
+
+def handler(event: Dict[str, Any], context: Any = None) -> Dict[str, Any]:
+    """Firehose transformation entry point: publish the batch's rollups, drop its records."""
+    aggregator = _aggregator_from_environment()
+    for record in event["records"]:
+        aggregator.add_payload(base64.b64decode(record["data"]))
+    # Lambda ships stdout to CloudWatch Logs, which extracts the EMF metrics
+    for document in aggregator.emf_documents():
+        print(json.dumps(document, separators=(",", ":")))
+    return {
+        "records": [
+            {"recordId": record["recordId"], "result": "Dropped", "data": record["data"]}
+            for record in event["records"]
+        ]
+    }
+
+
+def _payloads(path: str) -> Iterator[bytes]:
+    """Record payloads of a Firehose event file, or the file itself as one raw record."""
+    with open(path, "rb") as f:
+        content = f.read()
+    if content.lstrip()[:1] == b"{":
+        try:
+            document = json.loads(content)
+        except json.JSONDecodeError:
+            document = None
+        if isinstance(document, dict) and "records" in document:
+            for record in document["records"]:
+                yield base64.b64decode(record["data"])
+            return
+    yield content
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("payloads", nargs="+", help="Firehose event JSON, or raw JSON/OpenTelemetry stream records")
+    parser.add_argument("--registry", help="account registry naming the environments")
+    parser.add_argument("--metrics", help="comma-separated metric names to roll up (default: all)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=JSON_FORMAT, help="the stream's output format")
+    args = parser.parse_args()
+
+    environments: Dict[str, str] = {}
+    if args.registry:
+        from account_registry import load_accounts
+
+        environments = {account_id: environment for environment, account_id in load_accounts(args.registry).items()}
+    aggregator = Aggregator(environments, [name for name in (args.metrics or "").split(",") if name], args.format)
+    for path in args.payloads:
+        for payload in _payloads(path):
+            aggregator.add_payload(payload)
+    documents: List[Dict[str, Any]] = list(aggregator.emf_documents())
+    for document in documents:
+        print(json.dumps(document, separators=(",", ":")))
+    print(f"{aggregator.datapoints} instance datapoints -> {len(documents)} EMF documents", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
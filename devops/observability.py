@@ -0,0 +1,118 @@
+"""CloudWatch cross-account observability: the OAM sink and its links.
+
+Every SEARCH and Metrics Insights query on the dashboard filters on
+``aws.AccountId``, which only returns the source accounts' data once they
+share it with the monitoring account through Observability Access Manager.
+``ObservabilitySinkStack`` creates the sink in the monitoring account, with
+a policy that lets exactly the registered accounts link to it and only for
+metrics and log groups. ``ObservabilityLinkStack`` creates the link in one
+source account, additionally filtered to the ``AWS/RDS`` namespace and the
+RDS log groups.
+
+A sink's ARN ends in an id generated at deploy time. Links take it from
+``sink_arn`` or the ``observabilitySinkArn`` context once the sink stack has
+been deployed; until then each link stack has a ``SinkArn`` parameter to
+pass at deploy time. Sinks and links are regional, so a multi-region fleet
+gets one sink and one set of links per region.
+"""
+from typing import Dict, List, Optional, Sequence
+
+from aws_cdk import CfnOutput, CfnParameter, Environment, Stack, aws_oam as oam
+from constructs import Construct
+
+from account_registry import environment_slug
+
+OAM_RESOURCE_TYPES = ("AWS::CloudWatch::Metric", "AWS::Logs::LogGroup")
+SINK_NAME = "rds-observability"
+
+# Link filters: the dashboard reads RDS metrics and RDS log groups, nothing else
+METRIC_FILTER = "Namespace IN ('AWS/RDS')"
+LOG_GROUP_FILTER = "LogGroupName LIKE '/aws/rds/%'"
+
+
+def sink_policy(account_ids: Sequence[str]) -> Dict:
+    """Sink policy allowing ``account_ids`` to link metrics and log groups only."""
+    return {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {"AWS": list(account_ids)},
+                "Action": ["oam:CreateLink", "oam:UpdateLink"],
+                "Resource": "*",
+                "Condition": {"ForAllValues:StringEquals": {"oam:ResourceTypes": list(OAM_RESOURCE_TYPES)}},
+            }
+        ],
+    }
+
+
+class ObservabilitySinkStack(Stack):
+    """OAM sink in the monitoring account that the source accounts link to."""
+
+    def __init__(self, scope: Construct, construct_id: str, account_ids: Sequence[str], **kwargs) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+        self.sink = oam.CfnSink(self, "Sink", name=SINK_NAME, policy=sink_policy(account_ids))
+        CfnOutput(self, "SinkArn", value=self.sink.attr_arn, description="observabilitySinkArn for the link stacks")
+
+
+class ObservabilityLinkStack(Stack):
+    """OAM link sharing one source account's RDS metrics and log groups with the sink."""
+
+    def __init__(self, scope: Construct, construct_id: str, sink_arn: Optional[str] = None, **kwargs) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+        if sink_arn is None:
+            sink_arn = CfnParameter(
+                self, "SinkArn", description="ARN of the monitoring account's OAM sink (SinkArn output of its stack)"
+            ).value_as_string
+        self.link = oam.CfnLink(
+            self,
+            "Link",
+            resource_types=list(OAM_RESOURCE_TYPES),
+            sink_identifier=sink_arn,
+            label_template="$AccountName",
+            link_configuration=oam.CfnLink.LinkConfigurationProperty(
+                metric_configuration=oam.CfnLink.LinkFilterProperty(filter=METRIC_FILTER),
+                log_group_configuration=oam.CfnLink.LinkFilterProperty(filter=LOG_GROUP_FILTER),
+            ),
+        )
+
+
+def observability_stacks(
+    scope: Construct,
+    accounts: Dict[str, str],
+    monitoring_account: Optional[str] = None,
+    regions: Sequence[str] = (),
+    sink_arns: Optional[Dict[str, str]] = None,
+) -> List[Stack]:
+    """The sink stack and one link stack per registered account, per region.
+
+    ``sink_arns`` maps region to the ARN of the sink deployed there; the
+    ``""`` entry serves any other region, e.g. a single-region fleet. The
+    monitoring account gets no link to its own sink.
+    """
+    sink_arns = sink_arns or {}
+    stacks: List[Stack] = []
+    source_accounts = {
+        environment: account_id for environment, account_id in accounts.items() if account_id != monitoring_account
+    }
+    for region in regions or [None]:
+        suffix = f"-{region}" if region else ""
+        stacks.append(
+            ObservabilitySinkStack(
+                scope,
+                f"RdsObservabilitySink{suffix}",
+                account_ids=list(source_accounts.values()),
+                env=Environment(account=monitoring_account, region=region),
+            )
+        )
+        for environment, account_id in source_accounts.items():
+            stacks.append(
+                ObservabilityLinkStack(
+                    scope,
+                    f"RdsObservabilityLink-{environment_slug(environment)}{suffix}",
+                    sink_arn=sink_arns.get(region or "", sink_arns.get("")),
+                    env=Environment(account=account_id, region=region),
+                )
+            )
+    return stacks
+
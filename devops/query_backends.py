@@ -0,0 +1,250 @@
+"""Query backends that turn a catalog metric into a CloudWatch expression.
+
+* ``search`` - legacy ``SEARCH()`` expressions, aggregated with
+  ``GROUP BY aws.AccountId``.
+* ``metrics-insights`` - Metrics Insights SQL (``SELECT ... FROM SCHEMA``),
+  which aggregates, orders and limits server-side, so a top-N panel only
+  ever returns N series.
+
+Both backends produce plain strings; the widget generator decides how they
+are plotted.
+
+Queries use the schema of the metric's ``dimensions``: per instance, or the
+series CloudWatch already aggregates per Aurora cluster, per cluster and
+role, or per engine. An instance token scopes whichever identifier the
+schema has (instance or cluster); engine-level series belong to no
+identifier and cannot be scoped.
+
+``rollup_expression`` reads the per-account rollups ``metric_stream_aggregator``
+publishes instead of any instance series.
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from metric_catalog import INSTANCE_DIMENSIONS, DerivedInput, MetricDefinition
+from metric_stream_aggregator import (
+    ACCOUNT_DIMENSION,
+    ENVIRONMENT_DIMENSION,
+    ROLLUP_FOR_STATISTIC,
+    ROLLUP_NAMESPACE,
+    rollup_metric_name,
+)
+
+SEARCH_BACKEND = "search"
+METRICS_INSIGHTS_BACKEND = "metrics-insights"
+
+RDS_NAMESPACE = "AWS/RDS"
+RDS_INSTANCE_DIMENSION = "DBInstanceIdentifier"
+RDS_CLUSTER_DIMENSION = "DBClusterIdentifier"
+RDS_ROLE_DIMENSION = "Role"
+# Dimensions an instance token can match, most specific first
+IDENTIFIER_DIMENSIONS = (RDS_INSTANCE_DIMENSION, RDS_CLUSTER_DIMENSION)
+
+# Metrics Insights aggregate for each CloudWatch statistic it supports
+INSIGHTS_FUNCTIONS = {
+    "Average": "AVG",
+    "Maximum": "MAX",
+    "Minimum": "MIN",
+    "Sum": "SUM",
+    "SampleCount": "COUNT",
+}
+
+
+def identifier_dimension(dimensions: Sequence[str]) -> Optional[str]:
+    """The instance or cluster identifier among ``dimensions``, if any."""
+    return next((dimension for dimension in IDENTIFIER_DIMENSIONS if dimension in dimensions), None)
+
+
+def _token_dimension(dimensions: Tuple[str, ...], instance_token: str) -> str:
+    dimension = identifier_dimension(dimensions)
+    if dimension is None:
+        raise ValueError(
+            f"Cannot scope the {{{RDS_NAMESPACE},{','.join(dimensions)}}} schema to instance token {instance_token!r}"
+        )
+    return dimension
+
+
+def account_filter(account_ids: Sequence[str]) -> str:
+    """SEARCH term matching any of ``account_ids``."""
+    terms = [f'aws.AccountId="{account_id}"' for account_id in account_ids]
+    if len(terms) == 1:
+        return terms[0]
+    return "(" + " OR ".join(terms) + ")"
+
+
+def search_expression(
+    metric: Union[MetricDefinition, DerivedInput],
+    account_ids: Sequence[str] = (),
+    group_by_account: bool = False,
+    instance_token: Optional[str] = None,
+    statistic: Optional[str] = None,
+) -> str:
+    """Return the SEARCH expression for a metric.
+
+    ``account_ids`` restricts the search to those accounts and
+    ``instance_token`` to instance (or cluster) identifiers containing that
+    token (SEARCH matches whole tokens of ``-``/``_`` separated identifiers).
+    ``group_by_account`` aggregates the result to one series per account.
+    ``statistic`` overrides the metric's own statistic, e.g. ``p99``.
+    """
+    terms = [f"{{{RDS_NAMESPACE},{','.join(metric.dimensions)}}}", metric.metric_name]
+    if account_ids:
+        terms.append(f"AND {account_filter(account_ids)}")
+    if instance_token:
+        terms.append(f"AND {_token_dimension(metric.dimensions, instance_token)}={instance_token}")
+    if metric.role:
+        terms.append(f"AND {RDS_ROLE_DIMENSION}={metric.role}")
+    expression = f"SEARCH('{' '.join(terms)}', '{statistic or metric.statistic}')"
+    if group_by_account:
+        expression += " GROUP BY aws.AccountId"
+    return expression
+
+
+def rollup_name(metric: MetricDefinition, statistic: Optional[str] = None) -> Optional[str]:
+    """Metric stream rollup standing in for ``statistic`` of ``metric``, if one is published."""
+    if tuple(metric.dimensions) != INSTANCE_DIMENSIONS or metric.role:
+        return None
+    return ROLLUP_FOR_STATISTIC.get(statistic or metric.statistic)
+
+
+def rollup_expression(metric: MetricDefinition, rollup: str, account_ids: Sequence[str] = ()) -> str:
+    """SEARCH of a precomputed rollup: one series per account, whatever the instance count."""
+    terms = [
+        f"{{{ROLLUP_NAMESPACE},{ACCOUNT_DIMENSION},{ENVIRONMENT_DIMENSION}}}",
+        f'MetricName="{rollup_metric_name(metric.metric_name, rollup)}"',
+    ]
+    if account_ids:
+        accounts = [f'{ACCOUNT_DIMENSION}="{account_id}"' for account_id in account_ids]
+        terms.append(f"AND {accounts[0] if len(accounts) == 1 else '(' + ' OR '.join(accounts) + ')'}")
+    # A minute split across two Firehose batches has two partial max rollups
+    statistic = "Maximum" if rollup == "max" else "Average"
+    return f"SEARCH('{' '.join(terms)}', '{statistic}')"
+
+
+class QueryBackend(ABC):
+    """Builds the two query shapes the dashboard needs for a metric."""
+
+    name = ""
+    # Whether ``instances`` can order and limit server-side
+    server_side_limit = False
+    # Longest time range the backend can query back; None means any
+    max_range_seconds: Optional[int] = None
+
+    def supports(self, statistic: str) -> bool:
+        """Whether this backend can query ``statistic``."""
+        return True
+
+    @abstractmethod
+    def per_account(
+        self,
+        metric: MetricDefinition,
+        account_ids: Sequence[str] = (),
+        instance_token: Optional[str] = None,
+        statistic: Optional[str] = None,
+    ) -> str:
+        """One aggregated series per account, of ``statistic`` if given."""
+
+    @abstractmethod
+    def instances(
+        self,
+        metric: MetricDefinition,
+        account_ids: Sequence[str],
+        instance_token: Optional[str] = None,
+        top_n: Optional[int] = None,
+    ) -> str:
+        """One series per instance (or per schema group) in ``account_ids``, worst ``top_n`` first if supported."""
+
+    @abstractmethod
+    def account_series(
+        self, metric: MetricDefinition, account_id: str, instance_token: Optional[str] = None
+    ) -> str:
+        """A single series of the metric over every instance of one account.
+
+        Anomaly detection bands model one series, not the array a
+        ``per_account`` query returns.
+        """
+
+
+class SearchBackend(QueryBackend):
+    name = SEARCH_BACKEND
+
+    def per_account(self, metric, account_ids=(), instance_token=None, statistic=None):
+        return search_expression(
+            metric, account_ids, group_by_account=True, instance_token=instance_token, statistic=statistic
+        )
+
+    def instances(self, metric, account_ids, instance_token=None, top_n=None):
+        return search_expression(metric, account_ids, instance_token=instance_token)
+
+    def account_series(self, metric, account_id, instance_token=None):
+        # Sums and extremes combine across instances; anything else is averaged
+        function = {"Maximum": "MAX", "Minimum": "MIN", "Sum": "SUM"}.get(metric.statistic, "AVG")
+        return f"{function}({search_expression(metric, [account_id], instance_token=instance_token)})"
+
+
+class MetricsInsightsBackend(QueryBackend):
+    name = METRICS_INSIGHTS_BACKEND
+    server_side_limit = True
+    max_range_seconds = 3 * 3600
+
+    @staticmethod
+    def _select(metric: MetricDefinition, statistic: Optional[str] = None) -> str:
+        statistic = statistic or metric.statistic
+        try:
+            function = INSIGHTS_FUNCTIONS[statistic]
+        except KeyError:
+            raise ValueError(f"Metrics Insights cannot compute {statistic!r} for {metric.metric_name}") from None
+        schema = ", ".join((f'"{RDS_NAMESPACE}"', *metric.dimensions))
+        return f"SELECT {function}({metric.metric_name}) FROM SCHEMA({schema})"
+
+    @staticmethod
+    def _where(metric: MetricDefinition, account_ids: Sequence[str], instance_token: Optional[str]) -> str:
+        conditions = []
+        if account_ids:
+            terms = [f"AWS.AccountId = '{account_id}'" for account_id in account_ids]
+            conditions.append(terms[0] if len(terms) == 1 else "(" + " OR ".join(terms) + ")")
+        if instance_token:
+            conditions.append(f"{_token_dimension(metric.dimensions, instance_token)} LIKE '%{instance_token}%'")
+        if metric.role:
+            conditions.append(f"{RDS_ROLE_DIMENSION} = '{metric.role}'")
+        return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    def supports(self, statistic):
+        # No percentiles in Metrics Insights
+        return statistic in INSIGHTS_FUNCTIONS
+
+    def per_account(self, metric, account_ids=(), instance_token=None, statistic=None):
+        where = self._where(metric, account_ids, instance_token)
+        return f"{self._select(metric, statistic)}{where} GROUP BY AWS.AccountId"
+
+    def instances(self, metric, account_ids, instance_token=None, top_n=None):
+        where = self._where(metric, account_ids, instance_token)
+        query = f"{self._select(metric)}{where} GROUP BY {', '.join(metric.dimensions)}"
+        if top_n is not None:
+            order = "MAX() DESC" if metric.higher_is_worse else "MIN() ASC"
+            query += f" ORDER BY {order} LIMIT {top_n}"
+        return query
+
+    def account_series(self, metric, account_id, instance_token=None):
+        return self.aggregate(metric, [account_id], metric.statistic, instance_token)
+
+    def aggregate(self, metric, account_ids, statistic, instance_token=None):
+        """A single series of ``statistic`` over every instance (or cluster) in ``account_ids``.
+
+        Unlike SEARCH, a single-series Metrics Insights query can back an
+        alarm, so this is what the per-account alarms evaluate.
+        """
+        return f"{self._select(metric, statistic)}{self._where(metric, account_ids, instance_token)}"
+
+
+BACKENDS: Dict[str, QueryBackend] = {
+    SEARCH_BACKEND: SearchBackend(),
+    METRICS_INSIGHTS_BACKEND: MetricsInsightsBackend(),
+}
+
+
+def get_backend(name: str) -> QueryBackend:
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown query backend {name!r}, expected one of {tuple(BACKENDS)}") from None
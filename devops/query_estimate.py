@@ -0,0 +1,156 @@
+"""Offline estimate of the queries a rendered dashboard issues per refresh.
+
+The CloudWatch console sends one GetMetricData request per metric widget and
+evaluates every SEARCH expression and Metrics Insights query in it, so all
+counts follow directly from the dashboard body. No AWS credentials are
+needed.
+
+    python query_estimate.py
+"""
+import json
+import re
+import sys
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from metric_stream_aggregator import ACCOUNT_DIMENSION, ROLLUP_NAMESPACE
+
+SEARCH_PATTERN = re.compile(r"\bSEARCH\(")
+INSIGHTS_PATTERN = re.compile(r"\bSELECT\s")
+ACCOUNT_ID_PATTERN = re.compile(r"""aws\.AccountId\s*=\s*\\?["'](\d{12})\\?["']""", re.IGNORECASE)
+# Rollups carry the account as a plain dimension, one series per account
+ROLLUP_ACCOUNT_PATTERN = re.compile(rf"""(?<!aws\.){ACCOUNT_DIMENSION}\s*=\s*\\?["'](\d{{12}})\\?["']""")
+
+# GetMetricData list price (us-east-1); SEARCH is billed per metric it
+# returns and Metrics Insights per metric it analyzes
+PRICE_PER_1000_METRICS = 0.01
+
+DEFAULT_EXPECTED_INSTANCES_PER_ACCOUNT = 25
+
+
+@dataclass(frozen=True)
+class QueryStats:
+    """Per-refresh query load of one dashboard body."""
+
+    widgets: int
+    metric_widgets: int
+    get_metric_data_requests: int
+    search_expressions: int
+    insights_queries: int
+
+
+def resolve_dashboard_body(body: Any) -> Dict[str, Any]:
+    """Parse a synthesized ``DashboardBody`` into a dict.
+
+    CDK renders the body as an ``Fn::Join`` with ``{"Ref": ...}`` parts for
+    pseudo parameters such as the region and ``Fn::GetAtt`` parts for alarm
+    ARNs; those are replaced with ``${Ref}`` / ``${Resource.Attribute}``
+    placeholders so the result is plain JSON.
+    """
+    if isinstance(body, str):
+        return json.loads(body)
+    delimiter, parts = body["Fn::Join"]
+    rendered = []
+    for part in parts:
+        if isinstance(part, str):
+            rendered.append(part)
+        elif "Ref" in part:
+            rendered.append("${" + part["Ref"] + "}")
+        elif "Fn::GetAtt" in part:
+            rendered.append("${" + ".".join(part["Fn::GetAtt"]) + "}")
+        else:
+            # Escaped, as the placeholder always lands inside a JSON string
+            rendered.append(json.dumps("${" + json.dumps(part, sort_keys=True) + "}")[1:-1])
+    return json.loads(delimiter.join(rendered))
+
+
+def metric_expressions(widget: Dict[str, Any]) -> Iterator[str]:
+    """Yield every metric math expression of a metric widget."""
+    for row in widget.get("properties", {}).get("metrics", []):
+        options = row[-1] if row and isinstance(row[-1], dict) else {}
+        if "expression" in options:
+            yield options["expression"]
+
+
+def query_stats(body: Dict[str, Any]) -> QueryStats:
+    """Count the requests and queries a dashboard body issues."""
+    widgets: List[Dict[str, Any]] = body.get("widgets", [])
+    metric_widgets = [widget for widget in widgets if widget.get("type") == "metric"]
+    expressions = [expression for widget in metric_widgets for expression in metric_expressions(widget)]
+    searches = sum(len(SEARCH_PATTERN.findall(expression)) for expression in expressions)
+    insights = sum(len(INSIGHTS_PATTERN.findall(expression)) for expression in expressions)
+    return QueryStats(
+        widgets=len(widgets),
+        metric_widgets=len(metric_widgets),
+        get_metric_data_requests=len(metric_widgets),
+        search_expressions=searches,
+        insights_queries=insights,
+    )
+
+
+def scanned_metrics(expression: str, account_ids: Sequence[str], instances: Callable[[str], int]) -> int:
+    """Metrics one expression makes GetMetricData read, given each account's instance count.
+
+    A query scoped with ``aws.AccountId`` terms reads the instances of those
+    accounts, an unscoped one every instance in the fleet; plain metric math
+    over other queries reads nothing itself. A metric stream rollup reads one
+    series per account.
+    """
+    queries = len(SEARCH_PATTERN.findall(expression)) + len(INSIGHTS_PATTERN.findall(expression))
+    if not queries:
+        return 0
+    if ROLLUP_NAMESPACE in expression:
+        return queries * len(ROLLUP_ACCOUNT_PATTERN.findall(expression) or account_ids)
+    scoped = ACCOUNT_ID_PATTERN.findall(expression) or account_ids
+    return queries * sum(instances(account_id) for account_id in scoped)
+
+
+def estimated_cost_usd(metrics: int) -> float:
+    return metrics * PRICE_PER_1000_METRICS / 1000
+
+
+def dashboard_bodies(template: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Map logical id to parsed body for every dashboard in a template."""
+    return {
+        logical_id: resolve_dashboard_body(resource["Properties"]["DashboardBody"])
+        for logical_id, resource in template.get("Resources", {}).items()
+        if resource["Type"] == "AWS::CloudWatch::Dashboard"
+    }
+
+
+def total_stats(bodies: Iterable[Dict[str, Any]]) -> QueryStats:
+    """Query load of refreshing every one of ``bodies``, e.g. all shards of a dashboard."""
+    every = [query_stats(body) for body in bodies]
+    return QueryStats(**{field.name: sum(getattr(stats, field.name) for stats in every) for field in fields(QueryStats)})
+
+
+def estimate_layouts(accounts: Optional[Dict[str, str]] = None) -> Dict[str, QueryStats]:
+    """Render the dashboards under every layout and backend and count their queries.
+
+    Sharded or paired dashboards are summed, as each one is refreshed on its own.
+    """
+    from account_registry import load_accounts
+    from dashboard_generator import render_dashboards
+    from dashboard_widgets import LAYOUTS
+    from query_backends import BACKENDS
+
+    accounts = accounts if accounts is not None else load_accounts()
+    return {
+        f"{layout}/{backend}": total_stats(render_dashboards(accounts, layout=layout, backend=backend).values())
+        for layout in LAYOUTS
+        for backend in BACKENDS
+    }
+
+
+def main() -> int:
+    print(f"{'layout/backend':<30}{'widgets':>9}{'GetMetricData':>15}{'SEARCH':>8}{'Insights':>10}")
+    for name, stats in estimate_layouts().items():
+        print(
+            f"{name:<30}{stats.widgets:>9}{stats.get_metric_data_requests:>15}"
+            f"{stats.search_expressions:>8}{stats.insights_queries:>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
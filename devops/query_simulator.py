@@ -0,0 +1,970 @@
+"""Offline dashboard renderer: evaluate a dashboard body against local metrics.
+
+Every metric widget of a synthesized dashboard body is evaluated the way the
+CloudWatch console would: ``SEARCH()`` expressions (including ``GROUP BY
+aws.AccountId``), Metrics Insights queries and the metric math built on top
+of them (``SORT``, ``AVG``/``MAX``/``MIN``/``SUM``, ``RATE``, ``LOG``,
+arithmetic and comparisons) run against
+a ``MetricStore`` instead of a live account. ``ANOMALY_DETECTION_BAND`` has no
+trained model offline and is drawn as the mean plus and minus N standard
+deviations of its series over the evaluated range. For each widget the simulator
+reports the series drawn, the metrics the queries scanned, the datapoints
+fetched and the estimated GetMetricData cost per refresh.
+
+The store is loaded from a CSV or Parquet export with the columns
+``timestamp, namespace, metric_name, account_id, region, dimensions, value``
+(``dimensions`` as ``Name=Value;Name=Value``), seeded through the boto3-shaped
+``MetricStore.put_metric_data`` like a moto stand-in, or generated with
+``--synthetic``. With ``--context metricStreamRollups=true`` the store also
+gets the per-account rollups ``metric_stream_aggregator`` would publish from
+its instance series. Parquet needs pyarrow, which is only imported for
+``.parquet`` files.
+
+    python query_simulator.py --synthetic 25
+    python query_simulator.py --store metrics.csv --template cdk.out/RdsDashboardStack.template.json
+    python query_simulator.py --store metrics.parquet --context dashboardTopN=10 --series
+"""
+import argparse
+import csv
+import json
+import math
+import operator
+import random
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from metric_stream_aggregator import (
+    ACCOUNT_DIMENSION,
+    ENVIRONMENT_DIMENSION,
+    ROLLUP_NAMESPACE,
+    SOURCE_NAMESPACE,
+    Aggregator,
+    Datapoint,
+)
+from query_estimate import dashboard_bodies, estimated_cost_usd
+
+# CloudWatch opens a dashboard at 3 hours unless it sets its own start
+DEFAULT_START = "-PT3H"
+# Metrics Insights only queries the most recent 3 hours
+INSIGHTS_MAX_RANGE_SECONDS = 3 * 3600
+
+# Console period picker, used to approximate the auto period
+AUTO_PERIODS_SECONDS = (60, 300, 900, 3600, 21600, 86400)
+AUTO_PERIOD_MAX_DATAPOINTS = 500
+
+SYNTHETIC_ENGINES = ("aurora-mysql", "aurora-postgresql")
+
+DURATION_PATTERN = re.compile(
+    r"^-P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+@dataclass(frozen=True)
+class MetricKey:
+    """Identity of one stored metric."""
+
+    namespace: str
+    metric_name: str
+    account_id: str = ""
+    region: str = ""
+    dimensions: Tuple[Tuple[str, str], ...] = ()
+
+    def dimension(self, name: str) -> Optional[str]:
+        return dict(self.dimensions).get(name)
+
+
+@dataclass
+class Series:
+    """One evaluated time series: period start (epoch seconds) to value."""
+
+    label: str
+    values: Dict[float, float] = field(default_factory=dict)
+
+
+Value = Union[float, str, List[Series]]
+
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def _dimensions(value: Any) -> Dict[str, str]:
+    if isinstance(value, dict):
+        return {str(name): str(dimension) for name, dimension in value.items()}
+    pairs = [pair.split("=", 1) for pair in (value or "").split(";") if pair]
+    return {name.strip(): dimension.strip() for name, dimension in pairs}
+
+
+class MetricStore:
+    """In-memory metric datapoints, queried by the simulator."""
+
+    def __init__(self) -> None:
+        self._datapoints: Dict[MetricKey, List[Tuple[float, float]]] = {}
+
+    def add(
+        self,
+        namespace: str,
+        metric_name: str,
+        dimensions: Dict[str, str],
+        timestamp: Any,
+        value: float,
+        account_id: str = "",
+        region: str = "",
+    ) -> None:
+        key = MetricKey(namespace, metric_name, account_id, region, tuple(sorted(dimensions.items())))
+        self._datapoints.setdefault(key, []).append((_timestamp(timestamp), float(value)))
+
+    def put_metric_data(self, Namespace: str, MetricData: List[Dict[str, Any]], account_id: str = "", region: str = "") -> None:
+        """Same request shape as ``boto3.client("cloudwatch").put_metric_data``."""
+        for datum in MetricData:
+            dimensions = {dimension["Name"]: dimension["Value"] for dimension in datum.get("Dimensions", [])}
+            timestamp = datum.get("Timestamp", time.time())
+            values = datum.get("Values") or [datum["Value"]]
+            for value in values:
+                self.add(Namespace, datum["MetricName"], dimensions, timestamp, value, account_id, region)
+
+    def metrics(self) -> Iterable[MetricKey]:
+        return self._datapoints.keys()
+
+    def datapoints(self, key: MetricKey, start: float, end: float) -> List[Tuple[float, float]]:
+        return [(timestamp, value) for timestamp, value in self._datapoints[key] if start <= timestamp <= end]
+
+    @property
+    def end(self) -> float:
+        """Latest timestamp in the store."""
+        return max((timestamp for points in self._datapoints.values() for timestamp, _ in points), default=time.time())
+
+    @classmethod
+    def load(cls, path: str) -> "MetricStore":
+        """Load a CSV or Parquet export."""
+        if path.endswith(".parquet"):
+            try:
+                import pyarrow.parquet
+            except ImportError:
+                raise ImportError(f"pyarrow is required to read {path}; install it or export to CSV") from None
+            rows: Iterable[Dict[str, Any]] = pyarrow.parquet.read_table(path).to_pylist()
+        else:
+            with open(path, newline="") as f:
+                rows = list(csv.DictReader(f))
+
+        store = cls()
+        for row in rows:
+            store.add(
+                row["namespace"],
+                row["metric_name"],
+                _dimensions(row.get("dimensions")),
+                row["timestamp"],
+                row["value"],
+                str(row.get("account_id") or ""),
+                str(row.get("region") or ""),
+            )
+        return store
+
+
+def synthetic_store(
+    accounts: Dict[str, str],
+    instances_per_account: int,
+    metric_names: Sequence[str],
+    hours: int = 3,
+    period_seconds: int = 60,
+    end: Optional[float] = None,
+    seed: int = 0,
+    instances_per_cluster: int = 2,
+) -> MetricStore:
+    """Random-walk RDS metrics for ``instances_per_account`` instances in every account.
+
+    Instances form Aurora clusters of ``instances_per_cluster``, a writer
+    and its readers, with alternating engines. Like CloudWatch, every metric
+    is also published per cluster, per cluster and role and per engine, as
+    the average of the instances in the group.
+    """
+    rng = random.Random(seed)
+    end = end if end is not None else time.time() // period_seconds * period_seconds
+    steps = hours * 3600 // period_seconds
+    store = MetricStore()
+    for environment, account_id in accounts.items():
+        groups: Dict[Tuple[str, Tuple[Tuple[str, str], ...], float], List[float]] = {}
+        for index in range(instances_per_account):
+            cluster_index = index // instances_per_cluster
+            cluster = f"{environment.lower()}-cluster-{cluster_index + 1}"
+            role = "WRITER" if index % instances_per_cluster == 0 else "READER"
+            group_dimensions = (
+                (("DBClusterIdentifier", cluster),),
+                (("DBClusterIdentifier", cluster), ("Role", role)),
+                (("EngineName", SYNTHETIC_ENGINES[cluster_index % len(SYNTHETIC_ENGINES)]),),
+            )
+            dimensions = {"DBInstanceIdentifier": f"{environment.lower()}-db-{index + 1}"}
+            for metric_name in metric_names:
+                value = rng.uniform(10, 90)
+                for step in range(steps):
+                    value = min(100.0, max(0.0, value + rng.gauss(0, 2)))
+                    timestamp = end - (steps - 1 - step) * period_seconds
+                    store.add("AWS/RDS", metric_name, dimensions, timestamp, value, account_id)
+                    for group in group_dimensions:
+                        groups.setdefault((metric_name, group, timestamp), []).append(value)
+        for (metric_name, group, timestamp), values in groups.items():
+            store.add("AWS/RDS", metric_name, dict(group), timestamp, sum(values) / len(values), account_id)
+    return store
+
+
+def add_rollups(store: MetricStore, environments: Dict[str, str]) -> None:
+    """Publish into ``store`` the rollups the metric stream aggregator makes of its instance series."""
+    aggregator = Aggregator(environments)
+    for key in list(store.metrics()):
+        if key.namespace != SOURCE_NAMESPACE:
+            continue
+        for timestamp, value in store.datapoints(key, -math.inf, math.inf):
+            aggregator.add(
+                Datapoint(key.account_id, key.metric_name, key.dimensions, int(timestamp * 1000), 1, value, value)
+            )
+    for document in aggregator.emf_documents():
+        dimensions = {name: document[name] for name in (ENVIRONMENT_DIMENSION, ACCOUNT_DIMENSION)}
+        for directive in document["_aws"]["CloudWatchMetrics"]:
+            for metric in directive["Metrics"]:
+                store.add(
+                    ROLLUP_NAMESPACE,
+                    metric["Name"],
+                    dimensions,
+                    document["_aws"]["Timestamp"] / 1000,
+                    document[metric["Name"]],
+                    document[ACCOUNT_DIMENSION],
+                )
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percentile / 100 * len(ordered)) - 1)]
+
+
+STATISTICS: Dict[str, Callable[[List[float]], float]] = {
+    "Average": lambda values: sum(values) / len(values),
+    "Maximum": max,
+    "Minimum": min,
+    "Sum": sum,
+    "SampleCount": lambda values: float(len(values)),
+}
+
+
+def statistic_function(statistic: str) -> Callable[[List[float]], float]:
+    if statistic in STATISTICS:
+        return STATISTICS[statistic]
+    match = re.fullmatch(r"p(\d+(?:\.\d+)?)", statistic)
+    if match:
+        return lambda values: _percentile(values, float(match.group(1)))
+    raise ValueError(f"Unsupported statistic {statistic!r}")
+
+
+# Metrics Insights aggregates, keyed by SQL function
+INSIGHTS_AGGREGATES = {"AVG": "Average", "MAX": "Maximum", "MIN": "Minimum", "SUM": "Sum", "COUNT": "SampleCount"}
+
+
+def parse_relative_start(start: str) -> float:
+    """Seconds covered by an ISO 8601 relative start such as ``-PT3H``."""
+    match = DURATION_PATTERN.match(start)
+    if not match or not any(match.groupdict().values()):
+        raise ValueError(f"Only relative starts like '-PT3H' can be simulated, got {start!r}")
+    parts = {name: int(value or 0) for name, value in match.groupdict().items()}
+    return (
+        parts["weeks"] * 604800 + parts["days"] * 86400 + parts["hours"] * 3600 + parts["minutes"] * 60 + parts["seconds"]
+    )
+
+
+def auto_period_seconds(range_seconds: float) -> int:
+    """Smallest console period keeping a series under ``AUTO_PERIOD_MAX_DATAPOINTS``."""
+    for period in AUTO_PERIODS_SECONDS:
+        if range_seconds / period <= AUTO_PERIOD_MAX_DATAPOINTS:
+            return period
+    return AUTO_PERIODS_SECONDS[-1]
+
+
+@dataclass
+class WidgetReport:
+    """What one metric widget costs and returns per refresh."""
+
+    title: str
+    series: int = 0
+    metrics_scanned: int = 0
+    datapoints: int = 0
+    search_expressions: int = 0
+    insights_queries: int = 0
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def estimated_cost_usd(self) -> float:
+        return estimated_cost_usd(self.metrics_scanned)
+
+
+class _Window:
+    """Time range, default period and scope one widget is evaluated over."""
+
+    def __init__(self, store: MetricStore, start: float, end: float, period: int, region: Optional[str]) -> None:
+        self.store = store
+        self.start = start
+        self.end = end
+        self.period = period
+        self.region = region
+
+    def bucket(self, points: List[Tuple[float, float]], statistic: str, period: int) -> Dict[float, float]:
+        buckets: Dict[float, List[float]] = {}
+        for timestamp, value in points:
+            buckets.setdefault(timestamp - (timestamp - self.start) % period, []).append(value)
+        function = statistic_function(statistic)
+        return {timestamp: function(values) for timestamp, values in sorted(buckets.items())}
+
+    def candidates(self, namespace: Optional[str] = None) -> List[MetricKey]:
+        return [
+            key
+            for key in self.store.metrics()
+            if (namespace is None or key.namespace == namespace) and (not self.region or not key.region or key.region == self.region)
+        ]
+
+
+def _key_attribute(key: MetricKey, name: str) -> Optional[str]:
+    lowered = name.lower()
+    if lowered == "metricname":
+        return key.metric_name
+    if lowered == "namespace":
+        return key.namespace
+    if lowered == "aws.accountid":
+        return key.account_id
+    if lowered == "aws.region":
+        return key.region
+    return key.dimension(name)
+
+
+def _token_match(term: str, value: Optional[str], exact: bool) -> bool:
+    """SEARCH matches whole values, or whole tokens of them unless quoted."""
+    if value is None:
+        return False
+    if exact or value == term:
+        return value == term
+    return term in re.split(r"[^A-Za-z0-9]+", value)
+
+
+SEARCH_TOKEN = re.compile(r'\s*(\(|\)|(?:AND|OR|NOT)(?=[\s()]|$)|[^\s()=]+=(?:"[^"]*"|[^\s()]+)|"[^"]*"|[^\s()]+)')
+
+Predicate = Callable[[MetricKey], bool]
+
+
+def _tokens(pattern: re.Pattern, text: str) -> List[str]:
+    tokens, position = [], 0
+    text = text.strip()
+    while position < len(text):
+        match = pattern.match(text, position)
+        if not match:
+            raise ValueError(f"Cannot parse {text[position:]!r}")
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+class _BooleanParser:
+    """``a AND (b OR NOT c)`` over predicates; adjacent terms are ANDed."""
+
+    def __init__(self, tokens: List[str], term: Callable[[str], Predicate]) -> None:
+        self.tokens = tokens
+        self.term = term
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self) -> str:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self) -> Predicate:
+        if not self.tokens:
+            return lambda key: True
+        predicate = self.any_of()
+        if self.peek() is not None:
+            raise ValueError(f"Unexpected {self.peek()!r}")
+        return predicate
+
+    def any_of(self) -> Predicate:
+        predicates = [self.all_of()]
+        while self.peek() and self.peek().upper() == "OR":
+            self.take()
+            predicates.append(self.all_of())
+        return lambda key: any(predicate(key) for predicate in predicates)
+
+    def all_of(self) -> Predicate:
+        predicates = [self.negation()]
+        while self.peek() is not None and self.peek() != ")" and self.peek().upper() != "OR":
+            if self.peek().upper() == "AND":
+                self.take()
+            predicates.append(self.negation())
+        return lambda key: all(predicate(key) for predicate in predicates)
+
+    def negation(self) -> Predicate:
+        if self.peek() and self.peek().upper() == "NOT":
+            self.take()
+            inner = self.negation()
+            return lambda key: not inner(key)
+        if self.peek() == "(":
+            self.take()
+            inner = self.any_of()
+            if self.take() != ")":
+                raise ValueError("Unbalanced parentheses")
+            return inner
+        return self.term(self.take())
+
+
+def _search_term(token: str) -> Predicate:
+    if "=" in token and not token.startswith('"'):
+        name, term = token.split("=", 1)
+        exact = term.startswith('"')
+        term = term.strip('"')
+        return lambda key: _token_match(term, _key_attribute(key, name), exact)
+    exact = token.startswith('"')
+    term = token.strip('"')
+    return lambda key: any(
+        _token_match(term, value, exact) for value in (key.metric_name, key.namespace, *dict(key.dimensions).values())
+    )
+
+
+def search_metrics(window: _Window, query: str) -> List[MetricKey]:
+    """Metrics matched by the search string of a ``SEARCH()`` expression."""
+    schema = re.match(r"\s*\{([^}]*)\}", query)
+    namespace, dimension_names = None, None
+    if schema:
+        namespace, *names = [part.strip().strip('"') for part in schema.group(1).split(",")]
+        dimension_names = set(names)
+        query = query[schema.end():]
+    predicate = _BooleanParser(_tokens(SEARCH_TOKEN, query), _search_term).parse()
+    return [
+        key
+        for key in window.candidates(namespace)
+        if (dimension_names is None or {name for name, _ in key.dimensions} == dimension_names) and predicate(key)
+    ]
+
+
+def _series_label(key: MetricKey) -> str:
+    return " ".join(value for _, value in key.dimensions) or key.metric_name
+
+
+def _aggregate_groups(
+    window: _Window,
+    report: WidgetReport,
+    keys: List[MetricKey],
+    statistic: str,
+    period: int,
+    start: float,
+    group_by: Sequence[str],
+    label: str = "",
+) -> List[Series]:
+    """Fetch ``keys`` and aggregate their raw datapoints per group and period."""
+    groups: Dict[Tuple[Optional[str], ...], List[Tuple[float, float]]] = {}
+    for key in keys:
+        points = window.store.datapoints(key, start, window.end)
+        report.metrics_scanned += 1
+        report.datapoints += len(window.bucket(points, statistic, period))
+        groups.setdefault(tuple(_key_attribute(key, name) for name in group_by), []).extend(points)
+    return [
+        Series(" ".join(value or "" for value in group) or label, window.bucket(points, statistic, period))
+        for group, points in sorted(groups.items(), key=lambda item: tuple(value or "" for value in item[0]))
+    ]
+
+
+def evaluate_search(
+    window: _Window,
+    report: WidgetReport,
+    query: str,
+    statistic: str,
+    period: Optional[int] = None,
+    group_by: Optional[str] = None,
+) -> List[Series]:
+    report.search_expressions += 1
+    keys = search_metrics(window, query)
+    period = period or window.period
+    if group_by:
+        return _aggregate_groups(window, report, keys, statistic, period, window.start, [group_by], statistic)
+    series = []
+    for key in keys:
+        report.metrics_scanned += 1
+        values = window.bucket(window.store.datapoints(key, window.start, window.end), statistic, period)
+        report.datapoints += len(values)
+        series.append(Series(_series_label(key), values))
+    return series
+
+
+INSIGHTS_QUERY = re.compile(
+    r"^\s*SELECT\s+(?P<function>\w+)\((?P<metric>\w+)\)\s+FROM\s+"
+    r"(?:SCHEMA\((?P<schema>[^)]*)\)|(?P<namespace>\"[^\"]+\"|\S+))"
+    r"(?:\s+WHERE\s+(?P<where>.+?))?"
+    r"(?:\s+GROUP\s+BY\s+(?P<group_by>.+?))?"
+    r"(?:\s+ORDER\s+BY\s+(?P<order_function>\w+)\(\)\s*(?P<order>ASC|DESC)?)?"
+    r"(?:\s+LIMIT\s+(?P<limit>\d+))?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+INSIGHTS_TOKEN = re.compile(r"\s*(\(|\)|!=|=|'(?:[^']|'')*'|[^\s()=!']+)")
+
+
+def _insights_conditions(tokens: List[str]) -> List[str]:
+    """Fold ``name op 'literal'`` triples into single condition tokens."""
+    folded, index = [], 0
+    while index < len(tokens):
+        token = tokens[index]
+        if token.upper() in ("AND", "OR", "NOT", "(", ")"):
+            folded.append(token)
+            index += 1
+            continue
+        operator_ = tokens[index + 1]
+        if operator_.upper() == "NOT":
+            operator_ += " " + tokens[index + 2]
+            index += 1
+        folded.append("\0".join((token, operator_.upper(), tokens[index + 2])))
+        index += 3
+    return folded
+
+
+def _insights_term(condition: str) -> Predicate:
+    name, operator_, literal = condition.split("\0")
+    value = literal.strip("'").replace("''", "'")
+    if operator_ in ("LIKE", "NOT LIKE"):
+        pattern = re.compile(re.escape(value).replace("%", ".*").replace("_", "."))
+        matches: Predicate = lambda key: bool(pattern.fullmatch(_key_attribute(key, name) or ""))
+    else:
+        matches = lambda key: _key_attribute(key, name) == value
+    if operator_ in ("!=", "NOT LIKE"):
+        return lambda key: not matches(key)
+    return matches
+
+
+def evaluate_insights(window: _Window, report: WidgetReport, query: str, period: Optional[int] = None) -> List[Series]:
+    report.insights_queries += 1
+    match = INSIGHTS_QUERY.match(query)
+    if not match:
+        raise ValueError(f"Cannot parse Metrics Insights query {query!r}")
+    statistic = INSIGHTS_AGGREGATES[match.group("function").upper()]
+
+    if match.group("schema"):
+        namespace, *names = [part.strip().strip('"') for part in match.group("schema").split(",")]
+        dimension_names: Optional[set] = set(names)
+    else:
+        namespace, dimension_names = match.group("namespace").strip('"'), None
+    where = _BooleanParser(_insights_conditions(_tokens(INSIGHTS_TOKEN, match.group("where") or "")), _insights_term).parse()
+    keys = [
+        key
+        for key in window.candidates(namespace)
+        if key.metric_name == match.group("metric")
+        and (dimension_names is None or {name for name, _ in key.dimensions} <= dimension_names)
+        and where(key)
+    ]
+
+    start = window.start
+    if window.end - start > INSIGHTS_MAX_RANGE_SECONDS:
+        start = window.end - INSIGHTS_MAX_RANGE_SECONDS
+        report.warnings.append("Metrics Insights only returns the last 3 hours")
+    group_by = [name.strip() for name in (match.group("group_by") or "").split(",") if name.strip()]
+    series = _aggregate_groups(
+        window, report, keys, statistic, period or window.period, start, group_by, match.group("metric")
+    )
+
+    if match.group("order_function"):
+        order = statistic_function(INSIGHTS_AGGREGATES[match.group("order_function").upper()])
+        descending = (match.group("order") or "ASC").upper() == "DESC"
+        series.sort(key=lambda item: order(list(item.values.values())) if item.values else -math.inf, reverse=descending)
+    if match.group("limit"):
+        series = series[: int(match.group("limit"))]
+    return series
+
+
+def _combine(function: Callable[[List[float]], float], name: str, series: Value) -> Value:
+    if isinstance(series, float):
+        return series
+    timestamps = sorted({timestamp for item in series for timestamp in item.values})
+    return [
+        Series(
+            name,
+            {
+                timestamp: function([item.values[timestamp] for item in series if timestamp in item.values])
+                for timestamp in timestamps
+            },
+        )
+    ]
+
+
+def _sort(series: List[Series], function: str, order: str = "ASC", limit: float = math.inf) -> List[Series]:
+    if function.upper() == "LABEL":
+        ranked = sorted(series, key=lambda item: item.label)
+    else:
+        reduce = statistic_function(INSIGHTS_AGGREGATES[function.upper()])
+        ranked = sorted(series, key=lambda item: reduce(list(item.values.values())) if item.values else -math.inf)
+    if order.upper() == "DESC":
+        ranked.reverse()
+    return ranked[: int(limit)] if limit != math.inf else ranked
+
+
+def _anomaly_band(series: Value, stddevs: float = 2) -> Value:
+    if isinstance(series, float):
+        return series
+    band = []
+    for item in series:
+        values = list(item.values.values())
+        if not values:
+            continue
+        mean = sum(values) / len(values)
+        deviation = math.sqrt(sum((value - mean) ** 2 for value in values) / len(values))
+        band.append(Series(f"{item.label} (upper)", {timestamp: mean + stddevs * deviation for timestamp in item.values}))
+        band.append(Series(f"{item.label} (lower)", {timestamp: mean - stddevs * deviation for timestamp in item.values}))
+    return band
+
+
+def _rate(series: Value) -> Value:
+    """Change per second between consecutive datapoints, at the later one."""
+    if isinstance(series, float):
+        return 0.0
+    rates = []
+    for item in series:
+        points = sorted(item.values.items())
+        rates.append(Series(item.label, {t: (v - pv) / (t - pt) for (pt, pv), (t, v) in zip(points, points[1:])}))
+    return rates
+
+
+def _log(series: Value) -> Value:
+    if isinstance(series, float):
+        return math.log(series) if series > 0 else math.nan
+    return [Series(item.label, {t: math.log(v) for t, v in item.values.items() if v > 0}) for item in series]
+
+
+MATH_FUNCTIONS: Dict[str, Callable[..., Value]] = {
+    "ANOMALY_DETECTION_BAND": _anomaly_band,
+    "AVG": lambda series: _combine(STATISTICS["Average"], "AVG", series),
+    "LOG": _log,
+    "MAX": lambda series: _combine(max, "MAX", series),
+    "MIN": lambda series: _combine(min, "MIN", series),
+    "RATE": _rate,
+    "SUM": lambda series: _combine(sum, "SUM", series),
+    "SORT": _sort,
+}
+
+OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    # Comparisons yield 1 or 0 per datapoint
+    "<": lambda a, b: float(a < b),
+    ">": lambda a, b: float(a > b),
+}
+MATH_TOKEN = re.compile(r"\s*(\d+(?:\.\d+)?|'(?:[^'\\]|\\.)*'|[A-Za-z_][A-Za-z0-9_.]*|[-+*/(),\[\]<>])")
+
+
+def _apply(symbol: str, left: Value, right: Value) -> Value:
+    function = OPERATORS[symbol]
+
+    def safe(a: float, b: float) -> float:
+        try:
+            return function(a, b)
+        except ZeroDivisionError:
+            return math.nan
+
+    if isinstance(left, float) and isinstance(right, float):
+        return safe(left, right)
+    if isinstance(left, float):
+        return [Series(item.label, {t: safe(left, v) for t, v in item.values.items()}) for item in right]
+    if isinstance(right, float):
+        return [Series(item.label, {t: safe(v, right) for t, v in item.values.items()}) for item in left]
+    if len(left) != len(right) and 1 not in (len(left), len(right)):
+        raise ValueError(f"Cannot combine {len(left)} series with {len(right)} series")
+    pairs = zip(left * len(right) if len(left) == 1 else left, right * len(left) if len(right) == 1 else right)
+    return [
+        Series(a.label, {t: safe(a.values[t], b.values[t]) for t in a.values if t in b.values}) for a, b in pairs
+    ]
+
+
+class _MathEvaluator:
+    """Recursive-descent evaluator for one metric math expression."""
+
+    def __init__(self, window: _Window, report: WidgetReport, text: str, resolve: Callable[[str], Optional[Value]], period: Optional[int]) -> None:
+        self.window = window
+        self.report = report
+        self.tokens = _tokens(MATH_TOKEN, text)
+        self.resolve = resolve
+        self.period = period
+        self.position = 0
+
+    def peek(self, offset: int = 0) -> Optional[str]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def take(self, expected: Optional[str] = None) -> str:
+        token = self.tokens[self.position]
+        if expected is not None and token.upper() != expected:
+            raise ValueError(f"Expected {expected!r}, got {token!r}")
+        self.position += 1
+        return token
+
+    def evaluate(self) -> Value:
+        value = self.comparison()
+        if self.peek() is not None:
+            raise ValueError(f"Unexpected {self.peek()!r}")
+        return value
+
+    def comparison(self) -> Value:
+        value = self.sum()
+        while self.peek() in ("<", ">"):
+            symbol = self.take()
+            value = _apply(symbol, value, self.sum())
+        return value
+
+    def sum(self) -> Value:
+        value = self.product()
+        while self.peek() in ("+", "-"):
+            symbol = self.take()
+            value = _apply(symbol, value, self.product())
+        return value
+
+    def product(self) -> Value:
+        value = self.unary()
+        while self.peek() in ("*", "/"):
+            symbol = self.take()
+            value = _apply(symbol, value, self.unary())
+        return value
+
+    def unary(self) -> Value:
+        if self.peek() == "-":
+            self.take()
+            return _apply("*", -1.0, self.unary())
+        return self.primary()
+
+    def primary(self) -> Value:
+        token = self.take()
+        if token == "(":
+            value = self.comparison()
+            self.take(")")
+            return value
+        if token == "[":
+            items = [self.comparison()]
+            while self.peek() == ",":
+                self.take()
+                items.append(self.comparison())
+            self.take("]")
+            return [series for item in items for series in item]
+        if token.startswith("'"):
+            return token[1:-1].replace("\\'", "'")
+        if re.match(r"\d", token):
+            return float(token)
+        if self.peek() == "(":
+            return self.call(token.upper())
+        value = self.resolve(token)
+        # Bare words such as MAX and DESC are SORT arguments
+        return token if value is None else value
+
+    def arguments(self) -> List[Value]:
+        self.take("(")
+        arguments = []
+        while self.peek() != ")":
+            arguments.append(self.comparison())
+            if self.peek() == ",":
+                self.take()
+        self.take(")")
+        return arguments
+
+    def call(self, name: str) -> Value:
+        arguments = self.arguments()
+        if name == "SEARCH":
+            query, statistic, *period = arguments
+            group_by = None
+            if (self.peek() or "").upper() == "GROUP" and (self.peek(1) or "").upper() == "BY":
+                self.position += 2
+                group_by = self.take()
+            return evaluate_search(
+                self.window, self.report, query, statistic, int(period[0]) if period else self.period, group_by
+            )
+        try:
+            function = MATH_FUNCTIONS[name]
+        except KeyError:
+            raise ValueError(f"Unsupported metric math function {name}") from None
+        return function(*arguments)
+
+
+def _row_options(row: List[Any]) -> Tuple[List[Any], Dict[str, Any]]:
+    if row and isinstance(row[-1], dict):
+        return list(row[:-1]), row[-1]
+    return list(row), {}
+
+
+def evaluate_widget(
+    widget: Dict[str, Any],
+    store: MetricStore,
+    end: float,
+    dashboard_start: str = DEFAULT_START,
+    region: Optional[str] = None,
+) -> Tuple[WidgetReport, List[Series]]:
+    """Evaluate every query of a metric widget; return its report and visible series."""
+    properties = widget.get("properties", {})
+    range_seconds = parse_relative_start(properties.get("start", dashboard_start))
+    widget_period = properties.get("period")
+    widget_region = properties.get("region")
+    if widget_region and widget_region.startswith("${"):
+        widget_region = region
+    window = _Window(store, end - range_seconds, end, widget_period or auto_period_seconds(range_seconds), widget_region)
+    report = WidgetReport(properties.get("title", ""))
+
+    rows: Dict[str, Tuple[List[Any], Dict[str, Any]]] = {}
+    order: List[str] = []
+    previous: List[Any] = []
+    for index, row in enumerate(properties.get("metrics", [])):
+        parts, options = _row_options(row)
+        # "." repeats the value at the same position of the previous row
+        parts = [previous[position] if part == "." else part for position, part in enumerate(parts)]
+        previous = parts
+        row_id = options.get("id", f"m{index + 1}")
+        rows[row_id] = (parts, options)
+        order.append(row_id)
+
+    results: Dict[str, Value] = {}
+
+    def resolve(row_id: str) -> Optional[Value]:
+        if row_id not in rows:
+            return None
+        if row_id not in results:
+            parts, options = rows[row_id]
+            period = options.get("period", widget_period)
+            if "expression" in options and INSIGHTS_QUERY.match(options["expression"]):
+                results[row_id] = evaluate_insights(window, report, options["expression"], period)
+            elif "expression" in options:
+                results[row_id] = _MathEvaluator(window, report, options["expression"], resolve, period).evaluate()
+            else:
+                results[row_id] = _single_metric(window, report, parts, options, period)
+            value, label = results[row_id], options.get("label")
+            # ${LABEL} is the dynamic label for each series' own default label
+            if label and options.get("expression", "").startswith("ANOMALY_DETECTION_BAND("):
+                # One legend entry in the console; its two bounds share the label
+                results[row_id] = [Series(f"{label} ({item.label.rsplit('(', 1)[-1]}", item.values) for item in value]
+            elif label and isinstance(value, list) and ("${LABEL}" in label or len(value) == 1):
+                results[row_id] = [Series(label.replace("${LABEL}", item.label), item.values) for item in value]
+        return results[row_id]
+
+    visible: List[Series] = []
+    for row_id in order:
+        value = resolve(row_id)
+        if rows[row_id][1].get("visible", True) and isinstance(value, list):
+            visible.extend(value)
+    report.series = len(visible)
+    return report, visible
+
+
+def _single_metric(window: _Window, report: WidgetReport, parts: List[Any], options: Dict[str, Any], period: Optional[int]) -> List[Series]:
+    namespace, metric_name, *dimension_pairs = parts
+    dimensions = tuple(sorted(zip(dimension_pairs[::2], dimension_pairs[1::2])))
+    keys = [
+        key
+        for key in window.candidates(namespace)
+        if key.metric_name == metric_name
+        and key.dimensions == dimensions
+        and key.account_id == options.get("accountId", key.account_id)
+    ]
+    statistic = options.get("stat", "Average")
+    return _aggregate_groups(window, report, keys, statistic, period or window.period, window.start, [], metric_name)
+
+
+def simulate_dashboard(
+    body: Dict[str, Any], store: MetricStore, end: Optional[float] = None, region: Optional[str] = None
+) -> List[Tuple[WidgetReport, List[Series]]]:
+    """Evaluate every metric widget of a parsed dashboard body, in dashboard order."""
+    end = end if end is not None else store.end
+    dashboard_start = body.get("start", DEFAULT_START)
+    return [
+        evaluate_widget(widget, store, end, dashboard_start, region)
+        for widget in body.get("widgets", [])
+        if widget.get("type") == "metric"
+    ]
+
+
+def _synthesized_bodies(context: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    from aws_cdk import App
+
+    from app import RdsDashboardStack
+
+    app = App(context=context)
+    stack = RdsDashboardStack(app, "RdsDashboardStack")
+    return dashboard_bodies(app.synth().get_stack_by_name(stack.stack_name).template)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--store", help="CSV or Parquet metric export")
+    source.add_argument("--synthetic", type=int, metavar="INSTANCES", help="generate INSTANCES instances per registered account")
+    parser.add_argument("--template", help="synthesized template to read (default: synthesize RdsDashboardStack)")
+    parser.add_argument("--context", action="append", default=[], metavar="KEY=VALUE", help="CDK context for the synth")
+    parser.add_argument("--region", help="region substituted for the dashboard's own region")
+    parser.add_argument("--end", help="end of the evaluated range (default: latest datapoint)")
+    parser.add_argument("--series", action="store_true", help="also print every drawn series")
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+    args = parser.parse_args()
+
+    context = dict(pair.split("=", 1) for pair in args.context)
+    if args.template:
+        with open(args.template) as f:
+            bodies = dashboard_bodies(json.load(f))
+    else:
+        bodies = _synthesized_bodies(context)
+
+    if args.store:
+        store = MetricStore.load(args.store)
+    else:
+        from account_registry import load_accounts
+        from metric_catalog import DERIVED, METRICS
+
+        metric_names = [metric.metric_name for metric in METRICS]
+        metric_names += [item.metric_name for derived in DERIVED for item in derived.inputs]
+        store = synthetic_store(load_accounts(), args.synthetic, list(dict.fromkeys(metric_names)))
+    if str(context.get("metricStreamRollups")).lower() == "true":
+        from account_registry import load_accounts
+
+        add_rollups(store, {account_id: environment for environment, account_id in load_accounts().items()})
+    end = _timestamp(args.end) if args.end else None
+
+    results = {name: simulate_dashboard(body, store, end, args.region) for name, body in bodies.items()}
+    if args.json:
+        print(json.dumps(
+            {
+                name: [dict(asdict(report), estimated_cost_usd=report.estimated_cost_usd) for report, _ in widgets]
+                for name, widgets in results.items()
+            },
+            indent=1,
+        ))
+        return 0
+
+    for name, widgets in results.items():
+        print(name)
+        print(f"  {'widget':<48}{'series':>8}{'metrics':>9}{'datapoints':>12}{'cost $':>10}")
+        for report, series in widgets:
+            print(
+                f"  {report.title[:46]:<48}{report.series:>8}{report.metrics_scanned:>9}"
+                f"{report.datapoints:>12}{report.estimated_cost_usd:>10.5f}"
+            )
+            for warning in dict.fromkeys(report.warnings):
+                print(f"    ! {warning}")
+            if args.series:
+                for item in series:
+                    values = list(item.values.values())
+                    peak = max(values) if values else math.nan
+                    print(f"    - {item.label[:40]:<42}{len(values):>6} points  max {peak:.4g}")
+        reports = [report for report, _ in widgets]
+        print(
+            f"  {'total per refresh':<48}{sum(r.series for r in reports):>8}{sum(r.metrics_scanned for r in reports):>9}"
+            f"{sum(r.datapoints for r in reports):>12}{sum(r.estimated_cost_usd for r in reports):>10.5f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
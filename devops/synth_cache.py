@@ -0,0 +1,149 @@
+"""Content-addressed cache of rendered dashboard bodies.
+
+Turning the catalog into widgets is most of the construct tree a synth
+builds. The stack stores every dashboard it rendered (name and resolved
+``DashboardBody``, intrinsics included) under a key hashing all of its
+inputs: the metric catalog, the account map, the render settings,
+``IMAGE_TAG``, the aws-cdk-lib version and the source of every module in
+this directory. A later synth with the same key re-creates the dashboards from the
+stored fragments instead of instantiating their widgets.
+
+Only dashboards within the quota budget are stored, so a hit never skips a
+check that would have failed. Hits, misses and stores are appended, one
+line each, to ``stats.log`` next to the entries:
+
+    python synth_cache.py            # report
+    python synth_cache.py --clear
+"""
+import argparse
+import glob
+import hashlib
+import importlib.metadata
+import json
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(HERE, ".cache", "synth")
+STATS_FILE = "stats.log"
+COUNTERS = ("hits", "misses", "stores")
+
+
+def renderer_modules() -> List[str]:
+    """Every module next to this one; hashing them all keeps a new import from going unnoticed."""
+    return sorted(glob.glob(os.path.join(HERE, "*.py")))
+
+
+def cdk_version() -> str:
+    return importlib.metadata.version("aws-cdk-lib")
+
+
+def cache_key(**inputs: Any) -> str:
+    """SHA-256 over ``inputs`` (JSON, dataclasses by repr), the CDK version and the renderer source."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(inputs, sort_keys=True, default=repr).encode())
+    digest.update(cdk_version().encode())
+    for module in renderer_modules():
+        digest.update(os.path.basename(module).encode())
+        with open(module, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    entries: int
+    size_bytes: int
+    hits: int
+    misses: int
+    stores: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class SynthCache:
+    """Rendered dashboards on disk, one JSON file per key."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Stored dashboards for ``key``, or ``None`` on a miss."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            self._count("misses")
+            return None
+        with open(path) as f:
+            dashboards = json.load(f)
+        self._count("hits")
+        return dashboards
+
+    def put(self, key: str, dashboards: List[Dict[str, Any]]) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+            json.dump(dashboards, f)
+        os.replace(f.name, self._path(key))
+        self._count("stores")
+
+    def _counters(self) -> Dict[str, int]:
+        counters = dict.fromkeys(COUNTERS, 0)
+        path = os.path.join(self.cache_dir, STATS_FILE)
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip() in counters:
+                        counters[line.strip()] += 1
+        return counters
+
+    def _count(self, counter: str) -> None:
+        # Appending a line keeps a lookup from rewriting the stats, and concurrent synths from losing counts
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, STATS_FILE), "a") as f:
+            f.write(counter + "\n")
+
+    def stats(self) -> CacheStats:
+        entries = [
+            os.path.join(self.cache_dir, name)
+            for name in (os.listdir(self.cache_dir) if os.path.isdir(self.cache_dir) else [])
+            if name != STATS_FILE
+        ]
+        return CacheStats(
+            entries=len(entries),
+            size_bytes=sum(os.path.getsize(path) for path in entries),
+            **self._counters(),
+        )
+
+    def clear(self) -> None:
+        for name in os.listdir(self.cache_dir) if os.path.isdir(self.cache_dir) else []:
+            os.remove(os.path.join(self.cache_dir, name))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--clear", action="store_true", help="delete every entry and reset the counters")
+    args = parser.parse_args()
+
+    cache = SynthCache(args.cache_dir)
+    if args.clear:
+        cache.clear()
+    stats = cache.stats()
+    print(f"entries   {stats.entries:>8}  ({stats.size_bytes / 1024:.1f} KiB)")
+    print(f"hits      {stats.hits:>8}")
+    print(f"misses    {stats.misses:>8}")
+    print(f"stores    {stats.stores:>8}")
+    print(f"hit rate  {stats.hit_rate:>8.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
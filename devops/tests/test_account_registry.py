@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+
+import account_registry
+from account_registry import load_accounts
+
+ACCOUNTS = {"Production": "813627167089", "QA": "048136415067"}
+
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+
+def _entries(cache_dir):
+    return sorted(os.listdir(cache_dir)) if os.path.isdir(cache_dir) else []
+
+
+def test_json_mapping(tmp_path):
+    path = _write(tmp_path, "accounts.json", json.dumps({"accounts": ACCOUNTS}))
+    assert load_accounts(path, cache_dir=None) == ACCOUNTS
+
+
+def test_yaml_keeps_leading_zeros_of_unquoted_ids(tmp_path):
+    pytest.importorskip("yaml")
+    path = _write(tmp_path, "accounts.yaml", "Production: 813627167089\nQA: 048136415067\n")
+    assert load_accounts(path, cache_dir=None) == ACCOUNTS
+
+
+def test_organizations_export_keeps_active_accounts_by_name(tmp_path):
+    export = {
+        "Accounts": [
+            {"Id": "813627167089", "Name": "Production", "Status": "ACTIVE"},
+            {"Id": "957939121582", "Name": "Legacy", "Status": "SUSPENDED"},
+            {"Id": "048136415067", "Name": "QA", "Status": "ACTIVE"},
+        ]
+    }
+    path = _write(tmp_path, "org.json", json.dumps(export))
+    accounts = load_accounts(path, cache_dir=None)
+    assert accounts == ACCOUNTS
+    assert list(accounts) == ["Production", "QA"]
+
+
+def test_cache_hit_skips_parsing(tmp_path, monkeypatch):
+    path = _write(tmp_path, "accounts.json", json.dumps(ACCOUNTS))
+    cache_dir = str(tmp_path / "cache")
+    assert load_accounts(path, cache_dir) == ACCOUNTS
+    (entry,) = _entries(cache_dir)
+    assert entry.endswith(".json")
+
+    def fail(*args):
+        raise AssertionError("registry parsed on a cache hit")
+
+    monkeypatch.setattr(account_registry, "_parse", fail)
+    assert load_accounts(path, cache_dir) == ACCOUNTS
+
+
+def test_changed_content_misses_the_cache(tmp_path):
+    path = _write(tmp_path, "accounts.json", json.dumps(ACCOUNTS))
+    cache_dir = str(tmp_path / "cache")
+    load_accounts(path, cache_dir)
+    _write(tmp_path, "accounts.json", json.dumps({"Production": "813627167089"}))
+    assert load_accounts(path, cache_dir) == {"Production": "813627167089"}
+    assert len(_entries(cache_dir)) == 2
+
+
+def test_schema_version_invalidates_entries(tmp_path, monkeypatch):
+    path = _write(tmp_path, "accounts.json", json.dumps(ACCOUNTS))
+    cache_dir = str(tmp_path / "cache")
+    load_accounts(path, cache_dir)
+    monkeypatch.setattr(account_registry, "REGISTRY_SCHEMA_VERSION", account_registry.REGISTRY_SCHEMA_VERSION + 1)
+    load_accounts(path, cache_dir)
+    assert len(_entries(cache_dir)) == 2
+
+
+def test_cached_entries_are_validated_again(tmp_path):
+    path = _write(tmp_path, "accounts.json", json.dumps(ACCOUNTS))
+    cache_dir = str(tmp_path / "cache")
+    load_accounts(path, cache_dir)
+    (entry,) = _entries(cache_dir)
+    with open(os.path.join(cache_dir, entry), "w") as f:
+        json.dump({"Production": "not-an-id"}, f)
+    with pytest.raises(ValueError, match="Invalid account id 'not-an-id'"):
+        load_accounts(path, cache_dir)
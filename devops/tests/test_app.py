@@ -0,0 +1,44 @@
+import pytest
+from aws_cdk import App
+from aws_cdk.assertions import Template
+
+from app import FAIL_ON_BUDGET, RdsDashboardStack
+from dashboard_generator import DASHBOARD_NAME
+
+
+@pytest.mark.parametrize("count", [0.0, -8.0])
+def test_non_positive_vcpu_counts_are_rejected(count):
+    with pytest.raises(ValueError, match="vcpus of Production must be positive"):
+        RdsDashboardStack(App(), "RdsDashboardStack", vcpus={"Production": count})
+
+
+def test_vcpu_counts_from_context_are_checked():
+    app = App(context={"dashboardVcpus": "Production=64,QA=0"})
+    with pytest.raises(ValueError, match="vcpus of QA must be positive"):
+        RdsDashboardStack(app, "RdsDashboardStack")
+
+
+# More accounts than one dashboard's unscoped SEARCH can cover at the default 25 instances each
+FLEET = {f"Team {index}": f"1000000000{index:02d}" for index in range(1, 7)}
+
+
+def _dashboard_names(stack):
+    dashboards = Template.from_stack(stack).find_resources("AWS::CloudWatch::Dashboard")
+    return sorted(dashboard["Properties"]["DashboardName"] for dashboard in dashboards.values())
+
+
+def test_fleets_beyond_one_dashboard_are_sharded_per_account_by_default():
+    stack = RdsDashboardStack(App(), "RdsDashboardStack", accounts=FLEET)
+    assert _dashboard_names(stack) == [DASHBOARD_NAME] + [f"{DASHBOARD_NAME}-Team-{index}" for index in range(1, 7)]
+
+
+def test_four_accounts_keep_a_single_dashboard():
+    stack = RdsDashboardStack(App(), "RdsDashboardStack", accounts=dict(list(FLEET.items())[:4]))
+    assert _dashboard_names(stack) == [DASHBOARD_NAME]
+
+
+def test_failing_on_budget_names_the_split_option():
+    stack = RdsDashboardStack(App(), "RdsDashboardStack", accounts=FLEET, on_budget_exceeded=FAIL_ON_BUDGET)
+    with pytest.raises(RuntimeError, match="SEARCH can match 150 series, limit 100") as error:
+        Template.from_stack(stack)
+    assert "-c onBudgetExceeded=split" in str(error.value)
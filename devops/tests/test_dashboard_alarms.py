@@ -0,0 +1,74 @@
+import json
+
+import pytest
+from aws_cdk import App
+from aws_cdk.assertions import Match, Template
+
+from app import RdsDashboardStack
+from metric_catalog import ALARMS
+
+ACCOUNTS = {"Acme Production": "813627167089", "QA": "417848721801"}
+
+
+def _template(**stack_props):
+    return Template.from_stack(RdsDashboardStack(App(), "RdsDashboardStack", accounts=ACCOUNTS, **stack_props))
+
+
+@pytest.fixture(scope="module")
+def template():
+    return _template()
+
+
+def test_one_alarm_per_catalog_alarm_and_account(template):
+    template.resource_count_is("AWS::CloudWatch::Alarm", len(ALARMS) * len(ACCOUNTS))
+    template.resource_count_is("AWS::CloudWatch::CompositeAlarm", len(ACCOUNTS))
+
+
+def test_alarm_reduces_the_account_to_its_worst_instance(template):
+    template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {
+            "AlarmName": "RDS-All-Environments-Acme-Production-CPUUtilization",
+            "ComparisonOperator": "GreaterThanThreshold",
+            "Threshold": 80,
+            "Metrics": [
+                Match.object_like({
+                    "Expression": "SELECT MAX(CPUUtilization) FROM SCHEMA(\"AWS/RDS\", DBInstanceIdentifier)"
+                    " WHERE AWS.AccountId = '813627167089'",
+                    "Period": 300,
+                })
+            ],
+        },
+    )
+    template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {
+            "AlarmName": "RDS-All-Environments-QA-FreeStorageSpace",
+            "ComparisonOperator": "LessThanThreshold",
+            "Threshold": 10 * 1024 ** 3,
+            "Metrics": [Match.object_like({"Expression": Match.string_like_regexp(r"^SELECT MIN\(FreeStorageSpace\)")})],
+        },
+    )
+
+
+def test_thresholds_can_be_overridden():
+    _template(alarm_thresholds={"CPUUtilization": 95}).has_resource_properties(
+        "AWS::CloudWatch::Alarm", {"AlarmName": "RDS-All-Environments-QA-CPUUtilization", "Threshold": 95}
+    )
+
+
+def test_composite_alarm_fires_on_any_alarm_of_its_environment(template):
+    alarms = template.find_resources("AWS::CloudWatch::Alarm")
+    children = sorted(logical_id for logical_id in alarms if logical_id.startswith("QA"))
+    (composite,) = template.find_resources(
+        "AWS::CloudWatch::CompositeAlarm", {"Properties": {"AlarmName": "RDS-All-Environments-QA"}}
+    ).values()
+    rule = json.dumps(composite["Properties"]["AlarmRule"])
+    assert sorted(logical_id for logical_id in alarms if f'["{logical_id}", "Arn"]' in rule) == children
+    assert rule.count(" OR ALARM(") == len(ALARMS) - 1
+
+
+def test_alarms_can_be_turned_off():
+    template = _template(alarms=False)
+    template.resource_count_is("AWS::CloudWatch::Alarm", 0)
+    template.resource_count_is("AWS::CloudWatch::CompositeAlarm", 0)
@@ -0,0 +1,86 @@
+import pytest
+from aws_cdk import App
+
+from app import FAIL_ON_BUDGET, SPLIT_ON_BUDGET, RdsDashboardStack
+from dashboard_budget import DashboardBudget, measure_dashboard
+from dashboard_generator import DASHBOARD_NAME
+
+PRODUCTION, QA = "813627167089", "417848721801"
+ACCOUNTS = {"Production": PRODUCTION, "QA": QA}
+CPU_SEARCH = "SEARCH('{AWS/RDS,DBInstanceIdentifier} CPUUtilization', 'Average')"
+
+
+def _graph(title, *expressions):
+    metrics = [[{"expression": expression, "id": f"e{index}"}] for index, expression in enumerate(expressions)]
+    return {"type": "metric", "width": 24, "height": 6, "properties": {"title": title, "metrics": metrics}}
+
+
+def _measure(budget, *widgets):
+    return measure_dashboard({"widgets": list(widgets)}, [PRODUCTION, QA], budget)
+
+
+def test_within_budget():
+    report = _measure(DashboardBudget(), _graph("CPU", CPU_SEARCH))
+    assert report.violations == []
+    assert (report.widgets, report.max_metrics_per_graph, report.worst_search_series) == (1, 1, 50)
+
+
+def test_body_size_violation():
+    report = _measure(DashboardBudget(max_body_bytes=100), _graph("CPU", CPU_SEARCH))
+    assert report.violations == [f"dashboard body is {report.body_bytes} bytes, limit 100"]
+
+
+def test_widget_count_violation():
+    report = _measure(DashboardBudget(max_widgets=1), _graph("CPU", CPU_SEARCH), _graph("Memory", CPU_SEARCH))
+    assert report.violations == ["dashboard has 2 widgets, limit 1"]
+
+
+def test_metrics_per_graph_violation():
+    report = _measure(DashboardBudget(max_metrics_per_graph=1), _graph("CPU", CPU_SEARCH, "MAX(e0)"))
+    assert report.violations == ["widget 'CPU' has 2 metrics, limit 1"]
+
+
+def test_search_series_count_the_accounts_it_is_scoped_to():
+    budget = DashboardBudget(expected_instances={PRODUCTION: 90, QA: 20})
+    scoped = CPU_SEARCH.replace("CPUUtilization", f'CPUUtilization AND aws.AccountId="{QA}"')
+    report = _measure(budget, _graph("CPU", CPU_SEARCH), _graph("QA CPU", scoped))
+    assert report.worst_search_series == 110
+    assert report.violations == ["widget 'CPU' SEARCH can match 110 series, limit 100"]
+
+
+def test_insights_series_are_capped_by_limit():
+    query = 'SELECT AVG(CPUUtilization) FROM SCHEMA("AWS/RDS", DBInstanceIdentifier) GROUP BY DBInstanceIdentifier'
+    budget = DashboardBudget(max_insights_series=10)
+    assert _measure(budget, _graph("Top", query + " ORDER BY MAX() DESC LIMIT 10")).violations == []
+    assert _measure(budget, _graph("All", query)).violations == [
+        "widget 'All' Metrics Insights query can return 50 series, limit 10"
+    ]
+
+
+def _dashboard_names(stack):
+    template = stack.node.root.synth().get_stack_by_name(stack.stack_name).template
+    return [
+        resource["Properties"]["DashboardName"]
+        for resource in template["Resources"].values()
+        if resource["Type"] == "AWS::CloudWatch::Dashboard"
+    ]
+
+
+def test_oversized_dashboard_is_split_per_section():
+    stack = RdsDashboardStack(
+        App(), "RdsDashboardStack", accounts=ACCOUNTS, budget=DashboardBudget(max_widgets=60),
+        on_budget_exceeded=SPLIT_ON_BUDGET,
+    )
+    names = _dashboard_names(stack)
+    assert names[-1] == DASHBOARD_NAME
+    assert f"{DASHBOARD_NAME}-resource-utilization" in names
+    assert not any(name.endswith(("-Production", "-QA")) for name in names)
+
+
+def test_oversized_dashboard_fails_the_synth():
+    stack = RdsDashboardStack(
+        App(), "RdsDashboardStack", accounts=ACCOUNTS, budget=DashboardBudget(max_widgets=60),
+        on_budget_exceeded=FAIL_ON_BUDGET,
+    )
+    with pytest.raises(RuntimeError, match=r"widgets, limit 60[\s\S]*-c onBudgetExceeded=split"):
+        _dashboard_names(stack)
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from dashboard_diff import main, named_widgets, widget_changes
+from dashboard_generator import render_dashboards
+from dashboard_widgets import SERIES_STATISTICS
+
+ACCOUNTS = {"Production": "813627167089", "QA": "417848721801"}
+
+
+def _graph(title, width, *expressions, **properties):
+    metrics = [[{"expression": expression, "id": f"e{index}"}] for index, expression in enumerate(expressions)]
+    return {"type": "metric", "width": width, "height": 6, "properties": {"title": title, "metrics": metrics, **properties}}
+
+
+def test_widgets_are_named_by_section_and_the_graph_above_them():
+    body = {
+        "widgets": [
+            {"type": "text", "width": 24, "height": 1, "properties": {"markdown": "# Resource Utilization"}},
+            _graph("CPU Utilization - Environment Comparison", 24, "a"),
+            _graph("Production", 12, "b"),
+            _graph("QA", 12, "c"),
+            _graph("QA", 12, "d"),
+        ]
+    }
+    assert list(named_widgets(body)) == [
+        "Resource Utilization (header)",
+        "Resource Utilization / CPU Utilization - Environment Comparison",
+        "Resource Utilization / CPU Utilization - Environment Comparison / Production",
+        "Resource Utilization / CPU Utilization - Environment Comparison / QA",
+        "Resource Utilization / CPU Utilization - Environment Comparison / QA #2",
+    ]
+
+
+def test_widget_changes_ignore_position():
+    old = dict(_graph("CPU", 24, "a", "b", period=60), x=0, y=3)
+    new = dict(_graph("CPU", 12, "b", "c", period=300), x=12, y=9)
+    assert widget_changes(old, new) == [
+        "width 24 -> 12",
+        "metrics: + c",
+        "metrics: - a",
+        "metrics: b: id \"e1\" -> \"e0\"",
+        "period: 60 -> 300",
+    ]
+    assert widget_changes(_graph("CPU", 24, "a", "b"), _graph("CPU", 24, "a", "b")) == []
+
+
+def _write(tmp_path, name, document):
+    path = tmp_path / name
+    path.write_text(json.dumps(document))
+    return str(path)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return _write(tmp_path, "accounts.json", ACCOUNTS)
+
+
+def test_cost_increase_beyond_the_limit_fails(tmp_path, monkeypatch, capsys, registry):
+    old = _write(tmp_path, "old.json", render_dashboards(ACCOUNTS))
+    new = _write(tmp_path, "new.json", render_dashboards(ACCOUNTS, statistics_view=SERIES_STATISTICS))
+    argv = ["dashboard_diff.py", old, new, "--registry", registry, "--max-cost-increase", "0"]
+    monkeypatch.setattr("sys.argv", argv)
+    assert main() == 1
+    assert "more than $0.00000" in capsys.readouterr().err
+
+    monkeypatch.setattr("sys.argv", ["dashboard_diff.py", old, old, "--registry", registry, "--max-cost-increase", "0"])
+    assert main() == 0
@@ -0,0 +1,35 @@
+import pytest
+
+from dashboard_body import PERIOD_OVERRIDE_INHERIT
+from dashboard_generator import DASHBOARD_NAME, dashboard_views, main
+from dashboard_widgets import AUTO_PERIOD, FIXED_PERIOD, PER_ACCOUNT_LAYOUT, RANGE_SCALED_PERIOD
+from metric_catalog import METRICS
+from query_backends import METRICS_INSIGHTS_BACKEND, SEARCH_BACKEND
+
+
+def test_range_scaled_dashboard_opens_on_the_range_it_was_scaled_for():
+    ((name, options, body_props),) = dashboard_views(DASHBOARD_NAME, PER_ACCOUNT_LAYOUT, RANGE_SCALED_PERIOD, False, {})
+    assert name == DASHBOARD_NAME
+    assert body_props == {
+        "start": f"-PT{options.time_range_seconds // 3600}H",
+        "period_override": PERIOD_OVERRIDE_INHERIT,
+    }
+
+
+@pytest.mark.parametrize("period_policy", [AUTO_PERIOD, FIXED_PERIOD])
+def test_other_policies_keep_the_dashboard_defaults(period_policy):
+    ((_, _, body_props),) = dashboard_views(DASHBOARD_NAME, PER_ACCOUNT_LAYOUT, period_policy, False, {})
+    assert body_props == {}
+
+
+def test_generator_rejects_non_positive_vcpus(monkeypatch):
+    monkeypatch.setattr("sys.argv", ["dashboard_generator.py", "--vcpus", "Production=0,QA=-4"])
+    with pytest.raises(ValueError, match="vcpus of Production must be positive"):
+        main()
+
+
+def test_week_long_view_queries_search_instead_of_metrics_insights():
+    series_options = {"backend": METRICS_INSIGHTS_BACKEND}
+    (_, low_res, _), (_, high_res, _) = dashboard_views(DASHBOARD_NAME, PER_ACCOUNT_LAYOUT, AUTO_PERIOD, True, series_options)
+    assert {low_res.backend_for(metric).name for metric in METRICS} == {SEARCH_BACKEND}
+    assert {high_res.backend_for(metric).name for metric in METRICS} == {METRICS_INSIGHTS_BACKEND}
@@ -0,0 +1,47 @@
+import pytest
+
+from dashboard_shards import SHARD_BY_ACCOUNT, SHARD_BY_PREFIX, SHARD_BY_REGION, SHARD_BY_SECTION, plan_shards
+from metric_catalog import SECTIONS
+
+ACCOUNTS = {"Acme Production": "813627167089", "QA": "417848721801"}
+
+
+def test_account_shards_scope_comparisons_to_their_account():
+    shards = plan_shards(SHARD_BY_ACCOUNT, ACCOUNTS)
+    assert [(shard.suffix, shard.title) for shard in shards] == [("Acme-Production", "Acme Production"), ("QA", "QA")]
+    assert [shard.accounts for shard in shards] == [{"Acme Production": "813627167089"}, {"QA": "417848721801"}]
+    assert [shard.comparison_account_ids for shard in shards] == [("813627167089",), ("417848721801",)]
+    assert all(shard.sections == SECTIONS for shard in shards)
+
+
+def test_section_shards_keep_the_live_row_on_the_first():
+    shards = plan_shards(SHARD_BY_SECTION, ACCOUNTS)
+    assert [shard.sections for shard in shards] == [(section,) for section in SECTIONS]
+    assert shards[0].suffix == SECTIONS[0].key.replace("_", "-")
+    assert [shard.live_row for shard in shards] == [True] + [False] * (len(SECTIONS) - 1)
+    assert all(shard.accounts == ACCOUNTS for shard in shards)
+
+
+def test_prefix_shards_scope_searches_to_the_token():
+    shards = plan_shards(SHARD_BY_PREFIX, ACCOUNTS, instance_prefixes=["orders", "billing_v2"])
+    assert [(shard.suffix, shard.instance_token) for shard in shards] == [("orders", "orders"), ("billing_v2", "billing_v2")]
+
+
+@pytest.mark.parametrize("prefix", ["orders db", "orders/1", "", "bill.ing"])
+def test_prefixes_must_be_valid_dashboard_name_suffixes(prefix):
+    with pytest.raises(ValueError, match="may only contain letters, digits"):
+        plan_shards(SHARD_BY_PREFIX, ACCOUNTS, instance_prefixes=[prefix])
+
+
+def test_region_shards_query_their_region():
+    shards = plan_shards(SHARD_BY_REGION, ACCOUNTS, regions=["us-east-1", "eu-west-1"])
+    assert [(shard.suffix, shard.region) for shard in shards] == [("us-east-1", "us-east-1"), ("eu-west-1", "eu-west-1")]
+
+
+@pytest.mark.parametrize(
+    "shard_by, message",
+    [(SHARD_BY_PREFIX, "at least one instance identifier prefix"), (SHARD_BY_REGION, "at least one region"), ("team", "Unknown")],
+)
+def test_shard_modes_need_their_inputs(shard_by, message):
+    with pytest.raises(ValueError, match=message):
+        plan_shards(shard_by, ACCOUNTS)
@@ -0,0 +1,83 @@
+import pytest
+
+from dashboard_body import DashboardBody
+from dashboard_widgets import (
+    WORST_STATISTICS,
+    RenderOptions,
+    add_catalog_widgets,
+    comparison_series,
+    derived_widget,
+    detail_series,
+    forecast_count_widget,
+    forecast_rows,
+)
+from metric_catalog import DERIVED, DERIVED_METRICS, FORECASTS, METRICS, SECTIONS
+from query_backends import METRICS_INSIGHTS_BACKEND, SEARCH_BACKEND
+
+CPU = next(metric for metric in METRICS if metric.metric_name == "CPUUtilization")
+READ_LATENCY = next(metric for metric in METRICS if metric.metric_name == "ReadLatency")
+STORAGE_FORECAST = next(forecast for forecast in FORECASTS if forecast.metric_name == "FreeStorageSpace")
+LOAD_PER_VCPU = next(derived for derived in DERIVED if derived.key == "load_per_vcpu")
+DERIVED_HEADER = "# " + next(section.title for section in SECTIONS if section.key == DERIVED_METRICS)
+ACCOUNTS = {"Production": "813627167089", "QA": "417848721801"}
+
+
+@pytest.mark.parametrize(
+    "backend, label",
+    [(SEARCH_BACKEND, "All instances (avg)"), (METRICS_INSIGHTS_BACKEND, "Top 5 instances (avg)")],
+)
+def test_bands_are_labelled_with_the_instances_they_summarize(backend, label):
+    options = RenderOptions(top_n=5, bands=("AVG",), backend=backend)
+    _, band = detail_series(CPU, ["813627167089"], options)
+    assert band.label == label
+
+
+@pytest.mark.parametrize("vcpus, expression", [(64.0, "load_0 / 64"), (1e-05, "load_0 / 0.00001"), (2.5, "load_0 / 2.5")])
+def test_derived_constants_are_written_in_plain_decimals(vcpus, expression):
+    options = RenderOptions(account_constants={"vcpus": {"Production": vcpus}})
+    widget = derived_widget(LOAD_PER_VCPU, ACCOUNTS, options)
+    (series, _) = widget["properties"]["metrics"]
+    assert series == [{"label": "Production", "expression": expression}]
+
+
+def _text(options):
+    dashboard = DashboardBody()
+    add_catalog_widgets(dashboard, ACCOUNTS, options)
+    return [widget["properties"]["markdown"] for widget in dashboard.to_json()["widgets"] if widget["type"] == "text"]
+
+
+def test_derived_section_is_opt_in():
+    assert DERIVED_HEADER not in _text(RenderOptions())
+    assert DERIVED_HEADER in _text(RenderOptions(derived_metrics=True))
+
+
+def test_comparison_graphs_query_only_the_primary_statistic_by_default():
+    (series,) = comparison_series(READ_LATENCY, RenderOptions())
+    assert series.expression.startswith("SEARCH(")
+
+
+def test_worst_view_draws_the_worst_environment_per_statistic():
+    series = comparison_series(READ_LATENCY, RenderOptions(statistics_view=WORST_STATISTICS))
+    assert [line.expression for line in series] == ["MAX(average)", "MAX(p90)", "MAX(p99)", "MAX(maximum)"]
+    assert series[1].label == "p90 (worst environment)"
+
+
+def _expressions(widget):
+    return [row[-1]["expression"] for row in widget["properties"]["metrics"]]
+
+
+def test_forecast_graphs_divide_a_day_by_the_sorted_decline():
+    ((widget, _),) = forecast_rows(STORAGE_FORECAST, ACCOUNTS, RenderOptions())
+    assert _expressions(widget) == [
+        "1 / (86400 * SORT(decline, AVG, DESC, 10))",
+        "-RATE(LOG(headroom))",
+        "SEARCH('{AWS/RDS,DBInstanceIdentifier} FreeStorageSpace AND aws.AccountId=\"813627167089\"', 'Average')",
+    ]
+    assert widget["properties"]["title"] == "Days Until Storage Runs Out - Production"
+
+
+def test_forecast_count_sums_instances_under_the_horizon():
+    widget = forecast_count_widget(FORECASTS, RenderOptions(forecast_days=30, top_n=5))
+    counts = [expression for expression in _expressions(widget) if expression.startswith("SUM(")]
+    assert counts == ["SUM(2592000 * decline_0 > 1)", "SUM(2592000 * decline_1 > 1)"]
+    assert "-RATE(LOG(headroom_1))" in _expressions(widget)
@@ -0,0 +1,14 @@
+import json
+
+import pytest
+
+from check_expressions import VARIANTS, golden_path, synthesized_expressions
+from query_backends import BACKENDS
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_expressions_match_the_snapshot(backend, variant):
+    with open(golden_path(backend, variant)) as f:
+        golden = json.load(f)
+    assert synthesized_expressions(backend, **VARIANTS[variant]) == golden
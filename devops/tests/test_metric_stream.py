@@ -0,0 +1,75 @@
+import os
+
+import pytest
+from aws_cdk import App
+from aws_cdk.assertions import Match, Template
+
+from account_registry import load_accounts
+from metric_stream import AGGREGATOR_HANDLER, AGGREGATOR_MODULE, MetricStreamRollupStack
+from metric_stream_aggregator import OUTPUT_FORMATS, SOURCE_NAMESPACE
+
+
+@pytest.fixture(params=OUTPUT_FORMATS)
+def synthesized(request):
+    app = App()
+    accounts = load_accounts(cache_dir=None)
+    stack = MetricStreamRollupStack(app, "RdsMetricStreamRollups", accounts, output_format=request.param)
+    return app, stack, Template.from_stack(stack), request.param
+
+
+def test_stream_includes_catalog_metrics_and_linked_accounts(synthesized):
+    _, stack, template, output_format = synthesized
+    template.has_resource_properties(
+        "AWS::CloudWatch::MetricStream",
+        {
+            "OutputFormat": output_format,
+            "IncludeLinkedAccountsMetrics": True,
+            "IncludeFilters": [{"Namespace": SOURCE_NAMESPACE, "MetricNames": stack.metric_names}],
+        },
+    )
+
+
+def test_aggregator_reads_the_stream_format(synthesized):
+    _, stack, template, output_format = synthesized
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": AGGREGATOR_HANDLER,
+            "Environment": {
+                "Variables": Match.object_like(
+                    {"ROLLUP_METRICS": ",".join(stack.metric_names), "OUTPUT_FORMAT": output_format}
+                )
+            },
+        },
+    )
+
+
+def test_delivery_stream_transforms_records_with_the_aggregator(synthesized):
+    _, _, template, _ = synthesized
+    template.has_resource_properties(
+        "AWS::KinesisFirehose::DeliveryStream",
+        {
+            "ExtendedS3DestinationConfiguration": Match.object_like(
+                {"ProcessingConfiguration": Match.object_like({"Enabled": True})}
+            )
+        },
+    )
+
+
+def test_failed_batches_expire(synthesized):
+    _, _, template, _ = synthesized
+    template.has_resource_properties(
+        "AWS::S3::Bucket", {"LifecycleConfiguration": {"Rules": [Match.object_like({"ExpirationInDays": 7})]}}
+    )
+
+
+def test_asset_holds_the_aggregator_only(synthesized):
+    app = synthesized[0]
+    directory = app.synth().directory
+    (asset,) = [name for name in os.listdir(directory) if name.startswith("asset.")]
+    assert os.listdir(os.path.join(directory, asset)) == [AGGREGATOR_MODULE]
+
+
+def test_unknown_output_format_is_rejected():
+    with pytest.raises(ValueError, match="output format"):
+        MetricStreamRollupStack(App(), "RdsMetricStreamRollups", {"Production": "813627167089"}, output_format="csv")
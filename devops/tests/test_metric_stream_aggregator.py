@@ -0,0 +1,84 @@
+import base64
+import json
+import os
+
+import pytest
+
+from metric_stream_aggregator import (
+    ACCOUNT_DIMENSION,
+    ENVIRONMENT_DIMENSION,
+    JSON_FORMAT,
+    OPENTELEMETRY_FORMAT,
+    ROLLUP_NAMESPACE,
+    Aggregator,
+    handler,
+    record_datapoints,
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Stream records of two accounts with three instances each; the JSON one adds cluster-level series
+RECORDED = {JSON_FORMAT: "metric_stream.json", OPENTELEMETRY_FORMAT: "metric_stream.otel"}
+ENVIRONMENTS = {"813627167089": "Production", "417848721801": "QA"}
+
+
+def _recorded(output_format):
+    with open(os.path.join(FIXTURES, RECORDED[output_format]), "rb") as f:
+        return f.read()
+
+
+def _ld(number, payload):
+    """Length-delimited protobuf field, for payloads under 128 bytes."""
+    assert len(payload) < 128
+    return bytes([number << 3 | 2, len(payload)]) + payload
+
+
+def _request_of_length(length):
+    """OpenTelemetry request of ``length`` bytes holding only a resource attribute."""
+    padding = length - len(_ld(1, _ld(1, _ld(1, _ld(1, b"cloud.region") + _ld(2, _ld(1, b""))))))
+    return _ld(1, _ld(1, _ld(1, _ld(1, b"cloud.region") + _ld(2, _ld(1, b"x" * padding)))))
+
+
+@pytest.mark.parametrize("output_format", [JSON_FORMAT, OPENTELEMETRY_FORMAT])
+def test_recorded_record_rolls_up_instances_per_account(output_format):
+    aggregator = Aggregator(ENVIRONMENTS, ["CPUUtilization"], output_format)
+    aggregator.add_payload(_recorded(output_format))
+
+    # The cluster-level datapoints are left out
+    assert aggregator.datapoints == 6
+    production, qa = sorted(aggregator.emf_documents(), key=lambda document: document[ENVIRONMENT_DIMENSION])
+    assert production[ACCOUNT_DIMENSION] == "813627167089"
+    assert production["CPUUtilization_avg"] == pytest.approx(20.0)
+    assert production["CPUUtilization_max"] == pytest.approx(35.0)
+    assert production["CPUUtilization_p95"] == pytest.approx(30.0, rel=0.01)
+    assert qa["CPUUtilization_avg"] == pytest.approx(50.0)
+    assert qa["CPUUtilization_max"] == pytest.approx(65.0)
+    assert production["_aws"]["Timestamp"] == 1760000040000
+    (directive,) = production["_aws"]["CloudWatchMetrics"]
+    assert directive["Namespace"] == ROLLUP_NAMESPACE
+    assert {"Name": "CPUUtilization_avg", "Unit": "Percent"} in directive["Metrics"]
+
+
+def test_opentelemetry_record_starting_with_a_brace_is_not_read_as_json():
+    payload = _request_of_length(ord("{"))
+    payload = bytes([len(payload)]) + payload + _recorded(OPENTELEMETRY_FORMAT)
+    assert payload[:1] == b"{"
+
+    assert len(list(record_datapoints(payload, OPENTELEMETRY_FORMAT))) == 6
+
+
+def test_handler_drops_records_in_the_configured_format(monkeypatch, capsys):
+    monkeypatch.setenv("OUTPUT_FORMAT", OPENTELEMETRY_FORMAT)
+    monkeypatch.setenv("ACCOUNT_ENVIRONMENTS", json.dumps(ENVIRONMENTS))
+    monkeypatch.setenv("ROLLUP_METRICS", "CPUUtilization")
+    data = base64.b64encode(_recorded(OPENTELEMETRY_FORMAT)).decode()
+
+    result = handler({"records": [{"recordId": "1", "data": data}]})
+
+    assert result == {"records": [{"recordId": "1", "result": "Dropped", "data": data}]}
+    documents = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [document[ENVIRONMENT_DIMENSION] for document in documents] == ["QA", "Production"]
+
+
+def test_unknown_output_format_is_rejected():
+    with pytest.raises(ValueError, match="output format"):
+        Aggregator(ENVIRONMENTS, output_format="csv")
@@ -0,0 +1,58 @@
+import pytest
+from aws_cdk import App
+from aws_cdk.assertions import Template
+
+from account_registry import load_accounts
+from observability import (
+    LOG_GROUP_FILTER,
+    METRIC_FILTER,
+    OAM_RESOURCE_TYPES,
+    SINK_NAME,
+    observability_stacks,
+    sink_policy,
+)
+
+ACCOUNTS = {"Acme Production": "100000000001", "Acme Staging": "100000000002", "Monitoring": "100000000003"}
+MONITORING_ACCOUNT = "100000000003"
+
+
+@pytest.fixture(params=[ACCOUNTS, None], ids=["organizations-names", "registry"])
+def accounts(request):
+    return request.param or load_accounts(cache_dir=None)
+
+
+def test_sink_admits_registered_accounts_for_metrics_and_logs_only(accounts):
+    stacks = observability_stacks(App(), accounts, MONITORING_ACCOUNT)
+    source_ids = [account_id for account_id in accounts.values() if account_id != MONITORING_ACCOUNT]
+    Template.from_stack(stacks[0]).has_resource_properties(
+        "AWS::Oam::Sink", {"Name": SINK_NAME, "Policy": sink_policy(source_ids)}
+    )
+
+
+def test_one_link_stack_per_source_account(accounts):
+    stacks = observability_stacks(App(), accounts, MONITORING_ACCOUNT)
+    assert len(stacks) - 1 == len([a for a in accounts.values() if a != MONITORING_ACCOUNT])
+
+
+def test_links_share_metrics_and_logs_filtered_to_rds(accounts):
+    for stack in observability_stacks(App(), accounts, MONITORING_ACCOUNT)[1:]:
+        Template.from_stack(stack).has_resource_properties(
+            "AWS::Oam::Link",
+            {
+                "ResourceTypes": list(OAM_RESOURCE_TYPES),
+                "SinkIdentifier": {"Ref": "SinkArn"},
+                "LinkConfiguration": {
+                    "MetricConfiguration": {"Filter": METRIC_FILTER},
+                    "LogGroupConfiguration": {"Filter": LOG_GROUP_FILTER},
+                },
+            },
+        )
+
+
+def test_link_stacks_are_named_after_environment_slugs():
+    stacks = observability_stacks(App(), ACCOUNTS, MONITORING_ACCOUNT, regions=["eu-west-1"])
+    assert [stack.stack_name for stack in stacks] == [
+        "RdsObservabilitySink-eu-west-1",
+        "RdsObservabilityLink-Acme-Production-eu-west-1",
+        "RdsObservabilityLink-Acme-Staging-eu-west-1",
+    ]
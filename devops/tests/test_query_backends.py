@@ -0,0 +1,68 @@
+import pytest
+
+from metric_catalog import METRICS
+from query_backends import BACKENDS, METRICS_INSIGHTS_BACKEND, SEARCH_BACKEND, QueryBackend, get_backend
+
+
+def test_backends_implement_every_query_shape():
+    with pytest.raises(TypeError):
+        QueryBackend()
+
+    class PerAccountOnly(QueryBackend):
+        def per_account(self, metric, account_ids=(), instance_token=None, statistic=None):
+            return ""
+
+    with pytest.raises(TypeError):
+        PerAccountOnly()
+    assert all(isinstance(backend, QueryBackend) for backend in BACKENDS.values())
+
+
+CPU = next(metric for metric in METRICS if metric.metric_name == "CPUUtilization")
+WRITER_LAG = next(metric for metric in METRICS if metric.metric_name == "AuroraBinlogReplicaLag")
+PRODUCTION, QA = "813627167089", "417848721801"
+
+
+def test_search_queries():
+    search = get_backend(SEARCH_BACKEND)
+    assert search.per_account(CPU, [PRODUCTION, QA]) == (
+        "SEARCH('{AWS/RDS,DBInstanceIdentifier} CPUUtilization"
+        ' AND (aws.AccountId="813627167089" OR aws.AccountId="417848721801")\', \'Average\') GROUP BY aws.AccountId'
+    )
+    assert search.instances(CPU, [PRODUCTION], instance_token="orders", top_n=5) == (
+        "SEARCH('{AWS/RDS,DBInstanceIdentifier} CPUUtilization"
+        ' AND aws.AccountId="813627167089" AND DBInstanceIdentifier=orders\', \'Average\')'
+    )
+    assert search.account_series(CPU, PRODUCTION) == (
+        "AVG(SEARCH('{AWS/RDS,DBInstanceIdentifier} CPUUtilization AND aws.AccountId=\"813627167089\"', 'Average'))"
+    )
+    assert search.per_account(WRITER_LAG, statistic="p99") == (
+        "SEARCH('{AWS/RDS,DBClusterIdentifier,Role} AuroraBinlogReplicaLag AND Role=WRITER', 'p99')"
+        " GROUP BY aws.AccountId"
+    )
+
+
+def test_metrics_insights_queries():
+    insights = get_backend(METRICS_INSIGHTS_BACKEND)
+    assert insights.per_account(CPU, [PRODUCTION, QA]) == (
+        'SELECT AVG(CPUUtilization) FROM SCHEMA("AWS/RDS", DBInstanceIdentifier)'
+        " WHERE (AWS.AccountId = '813627167089' OR AWS.AccountId = '417848721801') GROUP BY AWS.AccountId"
+    )
+    assert insights.instances(CPU, [PRODUCTION], instance_token="orders", top_n=5) == (
+        'SELECT AVG(CPUUtilization) FROM SCHEMA("AWS/RDS", DBInstanceIdentifier)'
+        " WHERE AWS.AccountId = '813627167089' AND DBInstanceIdentifier LIKE '%orders%'"
+        " GROUP BY DBInstanceIdentifier ORDER BY MAX() DESC LIMIT 5"
+    )
+    assert insights.account_series(CPU, PRODUCTION) == (
+        "SELECT AVG(CPUUtilization) FROM SCHEMA(\"AWS/RDS\", DBInstanceIdentifier) WHERE AWS.AccountId = '813627167089'"
+    )
+    assert insights.per_account(WRITER_LAG) == (
+        'SELECT MAX(AuroraBinlogReplicaLag) FROM SCHEMA("AWS/RDS", DBClusterIdentifier, Role)'
+        " WHERE Role = 'WRITER' GROUP BY AWS.AccountId"
+    )
+
+
+def test_metrics_insights_has_no_percentiles():
+    insights = get_backend(METRICS_INSIGHTS_BACKEND)
+    assert not insights.supports("p99")
+    with pytest.raises(ValueError, match="cannot compute 'p99'"):
+        insights.per_account(CPU, statistic="p99")
@@ -0,0 +1,25 @@
+from dashboard_generator import render_dashboards
+from dashboard_shards import SHARD_BY_ACCOUNT
+from query_estimate import QueryStats, estimate_layouts, query_stats, total_stats
+
+ACCOUNTS = {"Production": "813627167089", "QA": "417848721801"}
+
+
+def test_per_layout_counts():
+    assert estimate_layouts(ACCOUNTS) == {
+        "per-account/search": QueryStats(85, 75, 75, 76, 0),
+        "per-account/metrics-insights": QueryStats(85, 75, 75, 6, 70),
+        "shared-query/search": QueryStats(61, 51, 51, 52, 0),
+        "shared-query/metrics-insights": QueryStats(61, 51, 51, 4, 48),
+    }
+
+
+def test_sharded_dashboards_are_summed():
+    bodies = render_dashboards(ACCOUNTS, shard_by=SHARD_BY_ACCOUNT)
+    assert len(bodies) == 3
+    shard = query_stats(bodies["RDS-All-Environments-QA"])
+    # Plus the alarm status row and link list of the index dashboard
+    assert total_stats(bodies.values()) == QueryStats(
+        shard.widgets * 2 + 2, shard.metric_widgets * 2, shard.get_metric_data_requests * 2,
+        shard.search_expressions * 2, shard.insights_queries * 2,
+    )
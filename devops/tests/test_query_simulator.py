@@ -0,0 +1,108 @@
+import math
+
+import pytest
+
+from dashboard_widgets import RenderOptions, forecast_count_widget, forecast_rows
+from metric_catalog import FORECASTS
+from query_estimate import estimated_cost_usd
+from query_simulator import MetricStore, evaluate_widget
+
+PRODUCTION, QA = "813627167089", "417848721801"
+END = 36000.0
+MINUTES = 10
+# Instance identifier, account and constant CPU utilization
+INSTANCES = (("orders-1", PRODUCTION, 10.0), ("orders-2", PRODUCTION, 30.0), ("billing-1", QA, 50.0))
+INSTANCE_SEARCH = "SEARCH('{AWS/RDS,DBInstanceIdentifier} CPUUtilization', 'Average')"
+
+
+@pytest.fixture
+def store():
+    store = MetricStore()
+    for minute in range(MINUTES):
+        timestamp = END - (MINUTES - 1 - minute) * 60
+        for instance, account_id, cpu in INSTANCES:
+            dimensions = {"DBInstanceIdentifier": instance}
+            store.add("AWS/RDS", "CPUUtilization", dimensions, timestamp, cpu, account_id)
+            # A counter growing by 120 a minute, i.e. 2 per second
+            store.add("AWS/RDS", "Queries", dimensions, timestamp, 120.0 * minute, account_id)
+    return store
+
+
+def _evaluate(store, *expressions):
+    metrics = [[{"expression": expression, "id": f"e{index}"}] for index, expression in enumerate(expressions)]
+    return evaluate_widget({"type": "metric", "properties": {"metrics": metrics, "period": 60}}, store, END)
+
+
+def _values(series):
+    return {round(value, 6) for value in series.values.values()}
+
+
+def test_search_group_by_account(store):
+    report, series = _evaluate(store, INSTANCE_SEARCH + " GROUP BY aws.AccountId")
+    assert [(item.label, _values(item)) for item in series] == [(QA, {50.0}), (PRODUCTION, {20.0})]
+    assert (report.search_expressions, report.metrics_scanned, report.datapoints) == (1, 3, 3 * MINUTES)
+
+
+def test_sort_keeps_the_hottest_instances(store):
+    _, series = _evaluate(store, f"SORT({INSTANCE_SEARCH}, MAX, DESC, 2)")
+    assert [item.label for item in series] == ["billing-1", "orders-2"]
+
+
+def test_insights_order_by_and_limit(store):
+    report, series = _evaluate(
+        store,
+        'SELECT AVG(CPUUtilization) FROM SCHEMA("AWS/RDS", DBInstanceIdentifier)'
+        f" WHERE AWS.AccountId = '{PRODUCTION}' GROUP BY DBInstanceIdentifier ORDER BY MAX() ASC LIMIT 1",
+    )
+    assert [(item.label, _values(item)) for item in series] == [("orders-1", {10.0})]
+    assert (report.insights_queries, report.metrics_scanned) == (1, 2)
+
+
+def test_rate_and_log(store):
+    _, (rate,) = _evaluate(store, "RATE(SEARCH('{AWS/RDS,DBInstanceIdentifier} Queries AND orders-1', 'Average'))")
+    assert _values(rate) == {2.0}
+    assert len(rate.values) == MINUTES - 1
+    _, (log,) = _evaluate(store, "LOG(SEARCH('{AWS/RDS,DBInstanceIdentifier} CPUUtilization AND billing-1', 'Average'))")
+    assert _values(log) == {round(math.log(50.0), 6)}
+
+
+def test_comparisons_count_matching_instances(store):
+    _, (above,) = _evaluate(store, f"SUM({INSTANCE_SEARCH} > 20)")
+    _, (below,) = _evaluate(store, f"SUM({INSTANCE_SEARCH} < 20)")
+    assert (_values(above), _values(below)) == ({2.0}, {1.0})
+
+
+def test_cost_report_counts_every_query(store):
+    report, _ = _evaluate(store, INSTANCE_SEARCH, f"MAX({INSTANCE_SEARCH})")
+    assert (report.search_expressions, report.metrics_scanned, report.datapoints) == (2, 6, 6 * MINUTES)
+    assert report.estimated_cost_usd == estimated_cost_usd(6)
+
+
+GIB = 1024 ** 3
+
+
+@pytest.fixture
+def shrinking_storage():
+    """A week of hourly free storage: 100 GiB losing 1 GiB a day, and 100 GiB losing 10 GiB a day."""
+    store = MetricStore()
+    for hour in range(7 * 24):
+        timestamp = END - (7 * 24 - 1 - hour) * 3600
+        for instance, per_day in (("orders-1", 1), ("orders-2", 10)):
+            free = (100 - per_day * hour / 24) * GIB
+            store.add("AWS/RDS", "FreeStorageSpace", {"DBInstanceIdentifier": instance}, timestamp, free, PRODUCTION)
+    return store
+
+
+def test_linear_decline_forecasts_the_days_left(shrinking_storage):
+    storage = next(forecast for forecast in FORECASTS if forecast.metric_name == "FreeStorageSpace")
+    ((widget,),) = forecast_rows(storage, {"Production": PRODUCTION}, RenderOptions())
+    _, (fast, slow) = evaluate_widget(widget, shrinking_storage, END)
+    # Free space left at the last hour, over the space lost per day
+    assert fast.values[max(fast.values)] == pytest.approx((100 - 10 * 167 / 24) / 10, rel=0.01)
+    assert slow.values[max(slow.values)] == pytest.approx(100 - 167 / 24, rel=0.01)
+
+
+def test_forecast_count_finds_the_instance_under_the_horizon(shrinking_storage):
+    widget = forecast_count_widget(FORECASTS, RenderOptions())
+    _, (storage, *_) = evaluate_widget(widget, shrinking_storage, END)
+    assert _values(storage) == {1.0}
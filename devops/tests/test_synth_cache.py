@@ -0,0 +1,56 @@
+from aws_cdk import App
+
+import synth_cache
+from app import RdsDashboardStack
+from synth_cache import SynthCache, cache_key
+
+ACCOUNTS = {"Production": "813627167089", "QA": "417848721801"}
+
+
+def _template(stack):
+    return stack.node.root.synth().get_stack_by_name(stack.stack_name).template
+
+
+def test_miss_then_hit(tmp_path):
+    cache = SynthCache(str(tmp_path))
+    assert cache.get("key") is None
+    cache.put("key", [{"id": "Dashboard", "name": "Dashboard", "body": "{}"}])
+    assert cache.get("key") == [{"id": "Dashboard", "name": "Dashboard", "body": "{}"}]
+    stats = cache.stats()
+    assert (stats.entries, stats.hits, stats.misses, stats.stores) == (1, 1, 1, 1)
+    assert stats.hit_rate == 0.5
+
+
+def test_clear_resets_entries_and_counters(tmp_path):
+    cache = SynthCache(str(tmp_path))
+    cache.put("key", [])
+    cache.get("key")
+    cache.clear()
+    stats = cache.stats()
+    assert (stats.entries, stats.hits, stats.misses, stats.stores) == (0, 0, 0, 0)
+
+
+def test_key_changes_with_inputs():
+    assert cache_key(accounts=ACCOUNTS) == cache_key(accounts=dict(ACCOUNTS))
+    assert cache_key(accounts=ACCOUNTS) != cache_key(accounts={"Production": "813627167089"})
+    assert cache_key(accounts=ACCOUNTS, settings=["per-account"]) != cache_key(accounts=ACCOUNTS, settings=["shared-query"])
+
+
+def test_key_covers_every_module(tmp_path, monkeypatch):
+    (tmp_path / "dashboard_widgets.py").write_text("TOP_N = 5\n")
+    monkeypatch.setattr(synth_cache, "HERE", str(tmp_path))
+    before = cache_key(accounts=ACCOUNTS)
+    (tmp_path / "query_estimate.py").write_text("PRICE = 0.01\n")
+    assert cache_key(accounts=ACCOUNTS) != before
+
+
+def test_stack_hit_renders_the_same_template(tmp_path):
+    cache = SynthCache(str(tmp_path))
+    miss = RdsDashboardStack(App(), "RdsDashboardStack", accounts=ACCOUNTS, synth_cache=cache)
+    hit = RdsDashboardStack(App(), "RdsDashboardStack", accounts=ACCOUNTS, synth_cache=cache)
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.stores) == (1, 1, 1)
+    assert _template(hit) == _template(miss)
+    assert hit.dashboards and [dashboard.node.path for dashboard in hit.dashboards] == [
+        dashboard.node.path for dashboard in miss.dashboards
+    ]